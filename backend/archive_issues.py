@@ -0,0 +1,45 @@
+"""
+Move old closed/resolved issues and their comments to the archive tables.
+
+    python archive_issues.py                   # untouched for ARCHIVE_AFTER_DAYS
+    python archive_issues.py --days 30
+    python archive_issues.py --dry-run         # only count the issues that would move
+
+Safe to run while the API is up (e.g. from cron); admins can also queue it
+with POST /internal/archive/.
+"""
+import argparse
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func, select
+from config.db import engine
+from config.settings import ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE
+from models.models import Issue
+from utility.archive import ARCHIVED_STATUSES, archive_issues
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive closed/resolved issues that haven't changed in a while.")
+    parser.add_argument("--days", type=float, default=ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    if args.dry_run:
+        cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=args.days)
+        with engine.connect() as connection:
+            count = connection.scalar(
+                select(func.count()).select_from(Issue).where(Issue.status.in_(ARCHIVED_STATUSES), Issue.updated_at < cutoff, Issue.project_id.is_not(None))
+            )
+        print(json.dumps({"issues": count}))
+        return
+
+    def progress(moved: dict):
+        print(f"{moved['issues']} issues, {moved['comments']} comments archived", file=sys.stderr)
+
+    print(json.dumps(archive_issues(args.days, args.batch_size, on_progress=progress)))
+
+
+if __name__ == "__main__":
+    main()
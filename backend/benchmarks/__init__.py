@@ -0,0 +1 @@
+"""Benchmark suite: dataset seeding, an in-process load driver and per-route reports."""
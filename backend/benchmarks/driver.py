@@ -0,0 +1,86 @@
+import asyncio
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+import httpx
+
+# A request is (method, url, httpx keyword arguments).
+Request = tuple[str, str, dict]
+
+
+@dataclass
+class RouteResult:
+    name: str
+    latencies: list = field(default_factory=list)
+    errors: int = 0
+    status_codes: dict = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    def summary(self) -> dict:
+        ordered = sorted(self.latencies)
+        count = len(ordered)
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "status_codes": dict(sorted(self.status_codes.items())),
+            "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+            "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+            "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+            "max_ms": round((ordered[-1] if ordered else 0.0) * 1000, 3),
+            "mean_ms": round((sum(ordered) / count if count else 0.0) * 1000, 3),
+            "throughput_rps": round(count / self.elapsed, 2) if self.elapsed else 0.0,
+        }
+
+
+def percentile(ordered: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def asgi_client(app, headers: Optional[dict] = None) -> httpx.AsyncClient:
+    """An httpx client that calls the app in process, with no sockets.
+
+    Unhandled errors come back as 500s, as they would from a server.
+    """
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app, raise_app_exceptions=False), base_url="http://bench", headers=headers or {})
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    name: str,
+    requests: list[Request],
+    concurrency: int,
+    expect: Callable[[int], bool] = lambda code: code < 400,
+    warmup: int = 0,
+) -> RouteResult:
+    """Send ``requests`` with up to ``concurrency`` in flight and time each one.
+
+    The first ``warmup`` requests are sent but not recorded.
+    """
+    for method, url, kwargs in requests[:warmup]:
+        await client.request(method, url, **kwargs)
+
+    result = RouteResult(name)
+    pending = iter(requests[warmup:])
+
+    async def worker():
+        for method, url, kwargs in pending:
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                code = response.status_code
+            except Exception:
+                code = 0
+            result.latencies.append(time.perf_counter() - start)
+            result.status_codes[code] = result.status_codes.get(code, 0) + 1
+            if not expect(code):
+                result.errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.elapsed = time.perf_counter() - start
+    return result
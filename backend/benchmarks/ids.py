@@ -0,0 +1,100 @@
+"""
+Insert throughput into issues and comments with the old and new id schemes.
+
+    DATABASE_URL=sqlite:///./ids.db python -m benchmarks.ids --rows 50000
+
+Each scheme gets a freshly created schema. The old scheme kept 4 hex
+characters of a uuid4; its duplicates are counted (each one was a failed
+insert in the app) and dropped before inserting, so both runs write unique
+keys. The report is JSON on stdout.
+"""
+import argparse
+import json
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import insert
+from config.db import Base, engine
+from models.models import User, Project, Issue, Comment
+from utility.id_genrater import new_id
+from benchmarks.seed import _batched
+
+
+def _legacy_id():
+    # what issuesIdGenrator / commentIdGenrator used to return
+    return str(uuid.uuid4()).split("-")[1]
+
+
+SCHEMES = {"legacy_hex4": _legacy_id, "time_ordered": new_id}
+
+
+def _unique_ids(generate, count: int) -> tuple[list[str], int]:
+    ids, seen, collisions = [], set(), 0
+    for _ in range(count):
+        value = generate()
+        if value in seen:
+            collisions += 1
+            continue
+        seen.add(value)
+        ids.append(value)
+    return ids, collisions
+
+
+def _timed_insert(table, rows, batch_size: int) -> float:
+    start = time.perf_counter()
+    with engine.begin() as connection:
+        for batch in _batched(rows, batch_size):
+            connection.execute(insert(table), batch)
+    return time.perf_counter() - start
+
+
+def bench_scheme(generate, rows: int, batch_size: int) -> dict:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    now = datetime.now(timezone.utc)
+    with engine.begin() as connection:
+        connection.execute(insert(User.__table__), [{
+            "id": "BENCHUSER", "username": "bench", "name": "bench", "email": "bench@example.com",
+            "role": "admin", "hashed_password": "x",
+        }])
+        connection.execute(insert(Project.__table__), [{
+            "id": "BENCHPROJECT", "title": "ids", "description": "ids", "created_at": now, "created_by": "BENCHUSER",
+        }])
+
+    issue_ids, issue_collisions = _unique_ids(generate, rows)
+    issues_seconds = _timed_insert(Issue.__table__, ({
+        "id": issue_id, "title": "t", "description": "d", "priority": "low", "status": "open",
+        "created_at": now, "updated_at": now, "project_id": "BENCHPROJECT", "reporter_id": "BENCHUSER",
+    } for issue_id in issue_ids), batch_size)
+
+    comment_ids, comment_collisions = _unique_ids(generate, rows)
+    comments_seconds = _timed_insert(Comment.__table__, ({
+        "id": comment_id, "text": "c", "created_at": now, "created_by": "BENCHUSER",
+        "issue_id": issue_ids[index % len(issue_ids)],
+    } for index, comment_id in enumerate(comment_ids)), batch_size)
+
+    return {
+        "issues": {"rows": len(issue_ids), "collisions": issue_collisions, "seconds": round(issues_seconds, 3),
+                   "rows_per_second": round(len(issue_ids) / issues_seconds, 1)},
+        "comments": {"rows": len(comment_ids), "collisions": comment_collisions, "seconds": round(comments_seconds, 3),
+                     "rows_per_second": round(len(comment_ids) / comments_seconds, 1)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare insert throughput of the old and new id schemes.")
+    parser.add_argument("--rows", type=int, default=20000, help="ids generated per table")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    report = {"dialect": engine.dialect.name, "rows": args.rows, "schemes": {}}
+    for name, generate in SCHEMES.items():
+        report["schemes"][name] = bench_scheme(generate, args.rows, args.batch_size)
+        print(f"{name}: {json.dumps(report['schemes'][name])}", file=sys.stderr)
+    Base.metadata.drop_all(bind=engine)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Load-test the API in process and report latency percentiles per route.
+
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.run --scale 10000 --output sqlite.json
+    DATABASE_URL=postgresql://... python -m benchmarks.run --scale 10000 --output pg.json --baseline sqlite.json
+
+The dataset is seeded first unless one is already there (``--reseed`` forces
+it). Every selected scenario sends ``--requests`` requests with
+``--concurrency`` in flight through an ASGI transport, so the numbers cover
+the app and the database, not the network. Results are written as JSON.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+import httpx
+from fastapi import FastAPI
+from config.db import engine, async_engine
+from config.settings import DB_ASYNC
+from routes.user_routes import user_route
+from routes.project_routes import project_route
+from routes.comment_routes import comment_route
+from routes.issue_routes import issues_route
+from utility.token_genrater import create_access_token
+from utility.hashed_password import shutdown_hashing
+from benchmarks.driver import asgi_client, drive
+from benchmarks.scenarios import SCENARIOS, Context
+from benchmarks.seed import seed, load_manifest
+
+
+def build_app() -> FastAPI:
+    # the routers under test, mounted as in main.py
+    app = FastAPI()
+    app.include_router(user_route, prefix="/api", tags=["User"])
+    app.include_router(project_route, prefix="/api/project", tags=["Project"])
+    app.include_router(issues_route, prefix="/api/project/issue", tags=["Issue"])
+    app.include_router(comment_route, prefix="/api/project/issue/comment", tags=["Comment"])
+    return app
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _select(patterns: list[str]):
+    if not patterns:
+        return SCENARIOS
+    return [scenario for scenario in SCENARIOS if any(pattern in scenario.name for pattern in patterns)]
+
+
+async def run(requests: int, concurrency: int, warmup: int, patterns: list[str], log=None) -> dict:
+    manifest = load_manifest()
+    token = create_access_token({"sub": manifest["admin_username"], "id": manifest["admin_id"], "role": "admin"})
+    results = {}
+
+    try:
+        async with asgi_client(build_app(), {"Authorization": f"Bearer {token}"}) as client:
+            ctx = Context(client, manifest)
+            for scenario in _select(patterns):
+                try:
+                    batch = await scenario.build(ctx, requests + warmup)
+                except httpx.HTTPError as exc:
+                    # setup requests failed; report it and carry on with the rest
+                    results[scenario.name] = {"setup_error": str(exc)}
+                    if log:
+                        log(f"{scenario.name:<38} setup failed: {exc}")
+                    continue
+                result = await drive(client, scenario.name, batch, concurrency, warmup=warmup)
+                results[scenario.name] = result.summary()
+                if log:
+                    log(_format_row(scenario.name, results[scenario.name]))
+    finally:
+        if async_engine is not None:
+            await async_engine.dispose()
+        shutdown_hashing()
+    return {"dataset": {"issues": manifest["issues"]}, "routes": results}
+
+
+def _format_row(name: str, summary: dict) -> str:
+    return (
+        f"{name:<38} n={summary['requests']:<6} err={summary['errors']:<4} "
+        f"p50={summary['p50_ms']:>9.2f}ms p95={summary['p95_ms']:>9.2f}ms p99={summary['p99_ms']:>9.2f}ms "
+        f"{summary['throughput_rps']:>9.1f} req/s"
+    )
+
+
+def compare(current: dict, baseline: dict) -> dict:
+    """Relative change of p50/p95/p99 and throughput per route (+0.10 = 10% higher)."""
+    changes = {}
+    for name, summary in current["routes"].items():
+        before = baseline.get("routes", {}).get(name)
+        if not before or "setup_error" in before or "setup_error" in summary:
+            continue
+        changes[name] = {
+            key: round(summary[key] / before[key] - 1, 4) if before[key] else None
+            for key in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps")
+        }
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-process load test of the bug tracker API.")
+    parser.add_argument("--scale", type=int, default=1000, help="issues to seed (10^3 .. 10^6)")
+    parser.add_argument("--reseed", action="store_true", help="drop all tables and seed again")
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per route")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=10, help="untimed requests per route")
+    parser.add_argument("--routes", nargs="*", default=[], help="only scenarios whose name contains one of these")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="earlier JSON report to compare against")
+    args = parser.parse_args()
+
+    def log(line: str):
+        print(line, file=sys.stderr)
+
+    try:
+        load_manifest()
+        seeded = False
+    except RuntimeError:
+        seeded = True
+    if seeded or args.reseed:
+        log(f"seeding {args.scale} issues into {engine.url.render_as_string(hide_password=True)}")
+        seed(args.scale, reset=True, log=log)
+
+    started = time.time()
+    report = asyncio.run(run(args.requests, args.concurrency, args.warmup, args.routes, log))
+    report["meta"] = {
+        "started_at": datetime.fromtimestamp(started, timezone.utc).isoformat(),
+        "duration_seconds": round(time.time() - started, 2),
+        "database": engine.url.render_as_string(hide_password=True),
+        "dialect": engine.dialect.name,
+        "async_sessions": DB_ASYNC,
+        "requests_per_route": args.requests,
+        "concurrency": args.concurrency,
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+    }
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline:
+            report["compared_to"] = {"file": args.baseline, "changes": compare(report, json.load(baseline))}
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            output.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
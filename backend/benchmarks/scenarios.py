@@ -0,0 +1,220 @@
+import math
+import uuid
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+import httpx
+from config.settings import BULK_MAX_ITEMS
+from benchmarks.driver import Request
+
+BULK_SIZE = min(100, BULK_MAX_ITEMS)
+
+
+@dataclass
+class Context:
+    """Shared by every scenario of a run: the client, seeded ids and scratch state."""
+    client: httpx.AsyncClient
+    manifest: dict
+    run_id: str = field(default_factory=lambda: uuid.uuid4().hex[:8])
+    state: dict = field(default_factory=dict)
+
+    def pick(self, key: str, index: int) -> str:
+        values = self.manifest[key]
+        return values[index % len(values)]
+
+
+@dataclass
+class Scenario:
+    name: str
+    # builds the timed requests; may send untimed setup requests through ctx.client
+    build: Callable[[Context, int], Awaitable[list[Request]]]
+
+
+def _get(url: str, **kwargs) -> Request:
+    return ("GET", url, kwargs)
+
+
+async def _post_json(ctx: Context, url: str, payload) -> dict:
+    response = await ctx.client.post(url, json=payload)
+    response.raise_for_status()
+    return response.json()
+
+
+def scenario(name: str):
+    def register(build):
+        SCENARIOS.append(Scenario(name, build))
+        return build
+    return register
+
+
+SCENARIOS: list[Scenario] = []
+
+
+# ------------- user_routes --------------
+
+@scenario("user:register")
+async def _(ctx, n):
+    return [("POST", "/api/user/register/", {"json": {
+        "username": f"bench_reg_{ctx.run_id}_{i}", "name": "Bench", "email": f"bench_reg_{ctx.run_id}_{i}@example.com",
+        "role": "developer", "hashed_password": "secret123",
+    }}) for i in range(n)]
+
+
+@scenario("user:login")
+async def _(ctx, n):
+    form = {"username": ctx.manifest["admin_username"], "password": ctx.manifest["password"]}
+    return [("POST", "/api/user/login/", {"data": form})] * n
+
+
+@scenario("user:dashboard")
+async def _(ctx, n):
+    return [_get("/api/dashboard")] * n
+
+
+@scenario("user:list")
+async def _(ctx, n):
+    return [_get("/api/user/list/")] * n
+
+
+@scenario("user:search")
+async def _(ctx, n):
+    return [_get("/api/user/search/", params={"q": f"bench_user_{i % 50}"}) for i in range(n)]
+
+
+# ------------- project_routes --------------
+
+@scenario("project:show_all_project")
+async def _(ctx, n):
+    return [_get("/api/project/show_all_project/")] * n
+
+
+@scenario("project:show_all_project_summary")
+async def _(ctx, n):
+    return [_get("/api/project/show_all_project/summary/")] * n
+
+
+@scenario("project:stats")
+async def _(ctx, n):
+    return [_get("/api/project/stats/")] * n
+
+
+@scenario("project:show_project")
+async def _(ctx, n):
+    return [_get(f"/api/project/show_project/{ctx.pick('project_ids', i)}/") for i in range(n)]
+
+
+@scenario("project:add_project")
+async def _(ctx, n):
+    return [("POST", "/api/project/add_project/", {"json": {"title": f"Bench {i}", "description": "timed"}}) for i in range(n)]
+
+
+@scenario("project:update_project")
+async def _(ctx, n):
+    return [("PUT", f"/api/project/update_project/{ctx.pick('project_ids', i)}/", {"json": {"description": f"rev {i}"}}) for i in range(n)]
+
+
+@scenario("project:add_member")
+async def _(ctx, n):
+    # fresh projects so every (project, user) pair is new
+    users = ctx.manifest["user_ids"]
+    projects = [
+        (await _post_json(ctx, "/api/project/add_project/", {"title": "Bench members", "description": "setup"}))["id"]
+        for _ in range(math.ceil(n / len(users)))
+    ]
+    pairs = [(projects[i // len(users)], users[i % len(users)]) for i in range(n)]
+    ctx.state["member_pairs"] = pairs
+    return [("POST", f"/api/project/{project}/add_member/{user}", {}) for project, user in pairs]
+
+
+@scenario("project:delete_member")
+async def _(ctx, n):
+    pairs = ctx.state.get("member_pairs", [])[:n]
+    return [("DELETE", f"/api/project/{project}/delete_member/{user}", {}) for project, user in pairs]
+
+
+@scenario("project:delete_project")
+async def _(ctx, n):
+    projects = [
+        (await _post_json(ctx, "/api/project/add_project/", {"title": "Bench delete", "description": "setup"}))["id"]
+        for _ in range(n)
+    ]
+    return [("DELETE", f"/api/project/delete_project/{project}/", {}) for project in projects]
+
+
+# ------------- issue_routes --------------
+
+@scenario("issue:show_all_issues_in_project")
+async def _(ctx, n):
+    return [_get(f"/api/project/issue/show_all_issues_in_project/{ctx.pick('project_ids', i)}/") for i in range(n)]
+
+
+@scenario("issue:show_issue")
+async def _(ctx, n):
+    return [_get(f"/api/project/issue/show_issue/{ctx.pick('issue_ids', i)}/") for i in range(n)]
+
+
+@scenario("issue:add_issue")
+async def _(ctx, n):
+    return [
+        ("POST", f"/api/project/issue/add_issue/{ctx.pick('project_ids', i)}/", {"json": {"title": f"Timed {i}", "description": "bench"}})
+        for i in range(n)
+    ]
+
+
+@scenario("issue:update")
+async def _(ctx, n):
+    statuses = ["open", "in_progress", "resolved", "closed"]
+    return [
+        ("PUT", f"/api/project/issue/update/{ctx.pick('issue_ids', i)}/", {"json": {"status": statuses[i % 4]}})
+        for i in range(n)
+    ]
+
+
+@scenario("issue:bulk_add_issues")
+async def _(ctx, n):
+    items = [{"title": f"Bulk {i}", "description": "bench"} for i in range(BULK_SIZE)]
+    return [("POST", f"/api/project/issue/bulk_add_issues/{ctx.pick('project_ids', i)}/", {"json": items}) for i in range(n)]
+
+
+@scenario("issue:bulk_update")
+async def _(ctx, n):
+    project_id = ctx.manifest["project_ids"][0]
+    created = (await _post_json(ctx, f"/api/project/issue/bulk_add_issues/{project_id}/", [
+        {"title": f"Bulk target {i}", "description": "setup"} for i in range(BULK_SIZE)
+    ]))["issues"]
+    items = [{"id": issue["id"], "priority": "high"} for issue in created]
+    return [("PUT", f"/api/project/issue/bulk_update/{project_id}/", {"json": items})] * n
+
+
+@scenario("issue:delete")
+async def _(ctx, n):
+    project_id = ctx.manifest["project_ids"][0]
+    ids = []
+    while len(ids) < n:
+        batch = [{"title": "Bench delete", "description": "setup"}] * min(BULK_SIZE, n - len(ids))
+        ids += [issue["id"] for issue in (await _post_json(ctx, f"/api/project/issue/bulk_add_issues/{project_id}/", batch))["issues"]]
+    return [("DELETE", f"/api/project/issue/delete/{issue_id}/", {}) for issue_id in ids]
+
+
+# ------------- comment_routes --------------
+
+@scenario("comment:write_comment")
+async def _(ctx, n):
+    return [
+        ("POST", f"/api/project/issue/comment/{ctx.pick('issue_ids', i)}/write_comment/", {"json": {"text": f"Timed {i}"}})
+        for i in range(n)
+    ]
+
+
+@scenario("comment:show_comment")
+async def _(ctx, n):
+    # runs after write_comment, so the first issues all have comments
+    return [_get(f"/api/project/issue/comment/{ctx.pick('issue_ids', i)}/show_comment/") for i in range(n)]
+
+
+@scenario("comment:delete_comment")
+async def _(ctx, n):
+    ids = [
+        (await _post_json(ctx, f"/api/project/issue/comment/{ctx.pick('issue_ids', i)}/write_comment/", {"text": "setup"}))["id"]
+        for i in range(n)
+    ]
+    return [("DELETE", f"/api/project/issue/comment/delete/{comment_id}/", {}) for comment_id in ids]
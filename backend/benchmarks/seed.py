@@ -0,0 +1,174 @@
+"""
+Seed a database with a synthetic dataset for benchmarking.
+
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.seed --scale 100000
+
+``--scale`` is the number of issues (10^3 .. 10^6); users, projects,
+memberships and comments are sized from it. Rows are generated from a fixed
+random seed and written with multi-row inserts, ``--batch-size`` at a time.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import insert, inspect, select, func
+from config.db import Base, engine
+from models.models import User, Project, Issue, Comment, project_members, status_enum, priority_enum
+from utility.hashed_password import hash_password
+from utility.etag import install_revisions
+from utility.activity import install_timestamps
+from utility.deletion import install_cascades
+from utility.archive import install_archive
+from utility.search import install_search
+from utility.issue_stats import install_issue_stats
+
+BENCH_PREFIX = "bench_user_"
+BENCH_PASSWORD = "bench-password"
+MANIFEST_SAMPLE = 1000
+
+
+def plan(scale: int) -> dict:
+    """Row counts for a given number of issues."""
+    users = max(10, scale // 100)
+    projects = max(2, scale // 1000)
+    return {
+        "users": users,
+        "projects": projects,
+        "memberships_per_user": min(3, projects),
+        "issues": scale,
+        "comments": scale,
+    }
+
+
+def _batched(rows, size: int):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def seed(scale: int, batch_size: int = 5000, random_seed: int = 42, reset: bool = False, log=None) -> dict:
+    """Create the schema (optionally from scratch) and insert the dataset."""
+    counts = plan(scale)
+    rng = random.Random(random_seed)
+    base_time = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    # bcrypt once; every seeded user shares the hash
+    hashed = hash_password(BENCH_PASSWORD)
+
+    if reset:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    install_revisions(engine)
+    install_timestamps(engine)
+    install_cascades(engine)
+    install_archive(engine)
+    install_search(engine)
+
+    def users():
+        for n in range(counts["users"]):
+            yield {
+                "id": f"BU{n:08d}", "username": f"{BENCH_PREFIX}{n}", "name": f"Bench User {n}",
+                "email": f"{BENCH_PREFIX}{n}@example.com", "role": "admin" if n == 0 else "developer",
+                "hashed_password": hashed,
+            }
+
+    def projects():
+        # user 0 creates every project, so one token can reach all of the data
+        for n in range(counts["projects"]):
+            yield {
+                "id": f"BP{n:08d}", "title": f"Bench project {n}", "description": "Seeded for benchmarks.",
+                "created_at": base_time + timedelta(minutes=n), "created_by": "BU00000000",
+            }
+
+    def memberships():
+        for n in range(1, counts["users"]):
+            for project in rng.sample(range(counts["projects"]), counts["memberships_per_user"]):
+                yield {"project_id": f"BP{project:08d}", "user_id": f"BU{n:08d}"}
+
+    def issues():
+        for n in range(counts["issues"]):
+            created = base_time + timedelta(seconds=n)
+            yield {
+                "id": f"BI{n:08d}", "title": f"Issue {n} {rng.choice(['crash', 'slow', 'typo', 'layout', 'login'])}",
+                "description": f"Steps to reproduce issue {n}.", "priority": rng.choice(priority_enum.enums),
+                "status": rng.choice(status_enum.enums), "created_at": created, "updated_at": created,
+                "project_id": f"BP{rng.randrange(counts['projects']):08d}", "reporter_id": f"BU{rng.randrange(counts['users']):08d}",
+                "solver_id": None,
+            }
+
+    def comments():
+        for n in range(counts["comments"]):
+            yield {
+                "id": f"BC{n:08d}", "text": f"Comment {n}", "created_at": base_time + timedelta(seconds=n, milliseconds=500),
+                "created_by": f"BU{rng.randrange(counts['users']):08d}", "issue_id": f"BI{rng.randrange(counts['issues']):08d}",
+            }
+
+    tables = [
+        ("users", User.__table__, users),
+        ("projects", Project.__table__, projects),
+        ("memberships", project_members, memberships),
+        ("issues", Issue.__table__, issues),
+        ("comments", Comment.__table__, comments),
+    ]
+    timings = {}
+    for name, table, rows in tables:
+        start, written = time.perf_counter(), 0
+        with engine.begin() as connection:
+            for batch in _batched(rows(), batch_size):
+                connection.execute(insert(table), batch)
+                written += len(batch)
+        timings[name] = {"rows": written, "seconds": round(time.perf_counter() - start, 3)}
+        if log:
+            log(f"{name}: {written} rows in {timings[name]['seconds']}s")
+
+    install_issue_stats(engine)
+    return timings
+
+
+def load_manifest(sample: int = MANIFEST_SAMPLE) -> dict:
+    """Ids the load driver needs, read back from a seeded database."""
+    with engine.connect() as connection:
+        admin = None
+        if inspect(connection).has_table(User.__tablename__):
+            admin = connection.execute(select(User.id, User.username).where(User.username == f"{BENCH_PREFIX}0")).first()
+        if admin is None:
+            raise RuntimeError("No seeded data found; run benchmarks.seed first.")
+        user_ids = connection.scalars(
+            select(User.id).where(User.username.like(f"{BENCH_PREFIX}%"), User.id != admin.id).order_by(User.id).limit(sample)
+        ).all()
+        project_ids = connection.scalars(select(Project.id).where(Project.created_by == admin.id).order_by(Project.id).limit(sample)).all()
+        issue_ids = connection.scalars(
+            select(Issue.id).where(Issue.project_id.in_(project_ids)).order_by(Issue.id).limit(sample)
+        ).all()
+        issue_count = connection.scalar(select(func.count()).select_from(Issue))
+    return {
+        "admin_id": admin.id,
+        "admin_username": admin.username,
+        "password": BENCH_PASSWORD,
+        "user_ids": list(user_ids),
+        "project_ids": list(project_ids),
+        "issue_ids": list(issue_ids),
+        "issues": issue_count,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a benchmark dataset.")
+    parser.add_argument("--scale", type=int, default=1000, help="number of issues (10^3 .. 10^6)")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42, help="random seed")
+    parser.add_argument("--reset", action="store_true", help="drop and recreate every table first")
+    args = parser.parse_args()
+
+    timings = seed(args.scale, args.batch_size, args.seed, args.reset, log=lambda line: print(line, file=sys.stderr))
+    print(json.dumps({"scale": args.scale, "dialect": engine.dialect.name, "tables": timings}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
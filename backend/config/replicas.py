@@ -0,0 +1,276 @@
+import itertools
+import logging
+import threading
+import time
+from contextlib import AsyncExitStack
+from datetime import datetime, timezone
+from typing import Optional
+from fastapi import Request
+from sqlalchemy import create_engine, event, insert, select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from config.db import _async_url, _connect_args, _pool_args, client_key, engine, open_session
+from config.pool import InstrumentedQueuePool, InstrumentedAsyncQueuePool, pool_status
+from config.settings import (
+    DATABASE_REPLICA_URLS, DB_ASYNC, DB_ECHO,
+    DB_REPLICA_CHECK_SECONDS, DB_REPLICA_MAX_LAG_SECONDS, DB_STICKY_SECONDS,
+)
+from models.models import ReplicaHeartbeat
+from utility.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+heartbeat = ReplicaHeartbeat.__table__
+
+# clients remembered as recent writers
+_STICKY_CLIENTS = 10_000
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class Replica:
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.engine = create_engine(url, echo=DB_ECHO, connect_args=_connect_args(url), **_pool_args(url, InstrumentedQueuePool))
+        self.async_engine = None
+        if DB_ASYNC:
+            from sqlalchemy.ext.asyncio import create_async_engine
+
+            async_url = _async_url(url)
+            self.async_engine = create_async_engine(async_url, echo=DB_ECHO, **_pool_args(async_url, InstrumentedAsyncQueuePool))
+        # seconds behind the primary; None until a heartbeat has been seen
+        self.lag: Optional[float] = None
+        self.error: Optional[str] = None
+        self.checked_at: Optional[float] = None
+        self.reads = 0
+
+    def mark_down(self, error: str):
+        self.error = error
+        self.lag = None
+
+    def dispose(self):
+        self.engine.dispose()
+        if self.async_engine is not None:
+            self.async_engine.sync_engine.dispose(close=False)
+
+
+class ReplicaSet:
+    """Read replicas with health and lag tracking, plus read-your-writes.
+
+    Every ``check_seconds`` a heartbeat row is stamped on the primary and read
+    back from each replica: a replica that has the previous stamp is less than
+    one check behind, one that doesn't is as far behind as the stamp it has.
+    Replicas that fail, lag more than ``max_lag`` or haven't been checked
+    lately are skipped, so reads fall back to the primary.
+    """
+
+    def __init__(self, urls=(), max_lag: float = DB_REPLICA_MAX_LAG_SECONDS, sticky_seconds: float = DB_STICKY_SECONDS, check_seconds: float = DB_REPLICA_CHECK_SECONDS):
+        self.max_lag = max_lag
+        self.check_seconds = check_seconds
+        self.replicas: list[Replica] = []
+        self._writers = LRUCache(_STICKY_CLIENTS, ttl=sticky_seconds)
+        self._turn = itertools.count()
+        self._last_beat: Optional[datetime] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.configure(urls)
+
+    def configure(self, urls):
+        """Replace the replica list (at startup, or from tests)."""
+        for replica in self.replicas:
+            replica.dispose()
+        self.replicas = [Replica(f"replica{n}", url) for n, url in enumerate(urls)]
+        self.primary_reads = 0
+        self.sticky_reads = 0
+        self.failovers = 0
+        self._last_beat = None
+
+    # ------------- Routing --------------
+
+    def mark_write(self, key: str):
+        self._writers.set(key, True)
+
+    def recently_wrote(self, key: str) -> bool:
+        return bool(self._writers.get(key))
+
+    def usable(self, replica: Replica) -> bool:
+        fresh = replica.checked_at is not None and time.monotonic() - replica.checked_at < 3 * self.check_seconds
+        return fresh and replica.error is None and replica.lag is not None and replica.lag <= self.max_lag
+
+    def pick(self) -> Optional[Replica]:
+        """A usable replica, round robin; None means read from the primary."""
+        candidates = [replica for replica in self.replicas if self.usable(replica)]
+        if not candidates:
+            return None
+        return candidates[next(self._turn) % len(candidates)]
+
+    # ------------- Health --------------
+
+    def check(self, primary=engine):
+        now = _now()
+        for replica in self.replicas:
+            try:
+                with replica.engine.connect() as connection:
+                    beat = connection.scalar(select(heartbeat.c.beat_at).where(heartbeat.c.id == 1))
+            except Exception as exc:
+                logger.warning("replica %s failed its check: %s", replica.name, exc)
+                replica.mark_down(str(exc))
+            else:
+                replica.error = None
+                if beat is None:
+                    replica.lag = None
+                elif self._last_beat is not None and beat >= self._last_beat:
+                    replica.lag = 0.0
+                else:
+                    replica.lag = (now - beat).total_seconds()
+            replica.checked_at = time.monotonic()
+
+        with primary.begin() as connection:
+            if not connection.execute(update(heartbeat).where(heartbeat.c.id == 1).values(beat_at=now)).rowcount:
+                connection.execute(insert(heartbeat).values(id=1, beat_at=now))
+        self._last_beat = now
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.check()
+            except Exception:
+                logger.exception("replica check failed")
+            self._stop.wait(self.check_seconds)
+
+    def start(self):
+        if self._thread or not self.replicas:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="replica-check", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(self.check_seconds + 5)
+            self._thread = None
+
+    def stats(self) -> dict:
+        return {
+            "primary_reads": self.primary_reads,
+            "sticky_reads": self.sticky_reads,
+            "failovers": self.failovers,
+            "replicas": [{
+                "name": replica.name,
+                "usable": self.usable(replica),
+                "lag_seconds": replica.lag,
+                "error": replica.error,
+                "reads": replica.reads,
+                "pool": pool_status(replica.engine.pool),
+            } for replica in self.replicas],
+        }
+
+
+replicas = ReplicaSet(DATABASE_REPLICA_URLS)
+
+
+def start_replica_checks():
+    replicas.start()
+
+
+def stop_replica_checks():
+    replicas.stop()
+
+
+# ------------- Sessions --------------
+
+@event.listens_for(Session, "after_commit")
+def _remember_writer(session):
+    key = session.info.get("client_key")
+    if key:
+        replicas.mark_write(key)
+
+
+@event.listens_for(Session, "before_flush")
+def _refuse_replica_flush(session, flush_context, instances):
+    if session.info.get("replica"):
+        raise RuntimeError("Replica sessions are read-only; use get_db for handlers that write.")
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _refuse_replica_writes(orm_execute_state):
+    if orm_execute_state.session.info.get("replica") and (
+        orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete
+    ):
+        raise RuntimeError("Replica sessions are read-only; use get_db for handlers that write.")
+
+
+class FailoverSession:
+    """A replica session that moves to the primary when the replica fails.
+
+    Handlers behind ``get_read_db`` only read, so a statement that fails with
+    an ``OperationalError`` is run once more on a primary session, which then
+    serves the rest of the request.
+    """
+
+    def __init__(self, replica: Replica, db, stack: AsyncExitStack):
+        self.replica = replica
+        self.db = db
+        self._stack = stack
+
+    def __getattr__(self, name):
+        return getattr(self.db, name)
+
+    async def _run(self, method: str, *args, **kwargs):
+        try:
+            return await getattr(self.db, method)(*args, **kwargs)
+        except OperationalError as exc:
+            if self.replica is None:
+                raise
+            logger.warning("replica %s failed a read, retrying on the primary: %s", self.replica.name, exc)
+            self.replica.mark_down(str(exc))
+            self.replica = None
+            replicas.failovers += 1
+            self.db = await self._stack.enter_async_context(open_session())
+            return await getattr(self.db, method)(*args, **kwargs)
+
+    async def execute(self, statement, params=None, **kwargs):
+        return await self._run("execute", statement, params, **kwargs)
+
+    async def scalar(self, statement, params=None, **kwargs):
+        return await self._run("scalar", statement, params, **kwargs)
+
+    async def scalars(self, statement, params=None, **kwargs):
+        return await self._run("scalars", statement, params, **kwargs)
+
+    async def get(self, entity, ident, **kwargs):
+        return await self._run("get", entity, ident, **kwargs)
+
+
+async def get_read_db(request: Request):
+    """Session dependency for read-only handlers.
+
+    Reads go to a usable replica, except for a client that committed in the
+    last ``DB_STICKY_SECONDS``, which reads from the primary so it sees its
+    own writes. A replica whose connection fails is skipped until its next
+    good check, and the read that found it down is retried on the primary.
+    """
+    if replicas.recently_wrote(client_key(request)):
+        replicas.sticky_reads += 1
+        replica = None
+    else:
+        replica = replicas.pick()
+
+    if replica is None:
+        replicas.primary_reads += 1
+        async with open_session() as db:
+            yield db
+        return
+
+    replica.reads += 1
+    async with AsyncExitStack() as stack:
+        db = await stack.enter_async_context(open_session(replica))
+        db.sync_session.info["replica"] = replica.name
+        try:
+            yield FailoverSession(replica, db, stack)
+        except OperationalError as exc:
+            replica.mark_down(str(exc))
+            raise
@@ -0,0 +1,93 @@
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Point the app at a throwaway SQLite file before config.db is imported.
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test.db")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import config.db
+from config.db import Base, engine
+from routes.user_routes import user_route
+from routes.project_routes import project_route
+from routes.comment_routes import comment_route
+from routes.issue_routes import issues_route
+from routes.export_routes import export_route
+from routes.import_routes import import_route
+from routes.search_routes import search_route
+from routes.event_routes import event_route
+from routes.job_routes import job_route
+from routes.internal_routes import internal_route
+from utility.metrics import install_metrics
+from utility.sql_profiler import SQLProfilerMiddleware, install_sql_profiler
+from utility.search import install_search
+from utility.etag import install_revisions
+from utility.activity import install_timestamps
+from utility.deletion import install_cascades
+from utility.archive import install_archive
+from utility.issue_stats import install_issue_stats
+from utility.user_search import clear_user_search_cache, install_user_search
+import models.models  # noqa: F401  (register tables)
+from utility import project_access
+from utility.jobs import start_job_workers, stop_job_workers
+
+
+def build_app():
+    app = FastAPI()
+    app.include_router(user_route, prefix="/api", tags=["User"])
+    app.include_router(project_route, prefix="/api/project", tags=["Project"])
+    app.include_router(issues_route, prefix="/api/project/issue", tags=["Issue"])
+    app.include_router(comment_route, prefix="/api/project/issue/comment", tags=["Comment"])
+    app.include_router(export_route, prefix="/api/project/export", tags=["Export"])
+    app.include_router(import_route, prefix="/api/project/import", tags=["Import"])
+    app.include_router(search_route, prefix="/api/search", tags=["Search"])
+    app.include_router(event_route, prefix="/api/project/events", tags=["Events"])
+    app.include_router(job_route, prefix="/api/jobs", tags=["Jobs"])
+    app.include_router(internal_route, prefix="/internal", tags=["Internal"])
+    install_metrics(app)
+    install_sql_profiler()
+    app.add_middleware(SQLProfilerMiddleware)
+    app.add_event_handler("startup", start_job_workers)
+    app.add_event_handler("shutdown", stop_job_workers)
+    return app
+
+
+@pytest.fixture(params=["async", "threaded"])
+def client(request, monkeypatch):
+    # every route test runs on both session paths: AsyncSession and, with
+    # DB_ASYNC off, the sync Session wrapped in ThreadedSession
+    monkeypatch.setattr(config.db, "DB_ASYNC", request.param == "async")
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    install_revisions(engine)
+    install_timestamps(engine)
+    install_cascades(engine)
+    install_archive(engine)
+    install_search(engine)
+    install_issue_stats(engine)
+    install_user_search(engine)
+    project_access.clear_cache()
+    clear_user_search_cache()
+    with TestClient(build_app()) as test_client:
+        yield test_client
+
+
+@pytest.fixture()
+def register(client):
+    """Create a user and return (auth headers, user id)."""
+
+    def _register(username: str, role: str = "admin"):
+        client.post("/api/user/register/", json={
+            "username": username, "name": username, "email": f"{username}@example.com",
+            "role": role, "hashed_password": "secret123",
+        })
+        token = client.post("/api/user/login/", data={"username": username, "password": "secret123"}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        return headers, client.get("/api/dashboard", headers=headers).json()["id"]
+
+    return _register
@@ -0,0 +1,47 @@
+"""
+Bulk-import issues from a CSV or NDJSON file.
+
+    python import_issues.py issues.csv --project <project_id> --reporter <user_id>
+
+Columns / keys follow IssuesIn: title, description, priority, status.
+"""
+import argparse
+import json
+import sys
+from config.db import SessionLocal
+from models.models import Project, User
+from utility.issue_import import detect_format, import_issues
+from config.settings import IMPORT_CHUNK_SIZE
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-import issues into a project.")
+    parser.add_argument("file", help="CSV or NDJSON file, '-' for stdin")
+    parser.add_argument("--project", required=True, help="target project id")
+    parser.add_argument("--reporter", required=True, help="user id recorded as the reporter")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        if not db.get(Project, args.project):
+            parser.error(f"project {args.project} not found")
+        if not db.get(User, args.reporter):
+            parser.error(f"user {args.reporter} not found")
+
+    fmt = args.format or detect_format(args.file)
+
+    def progress(counts: dict):
+        print(f"processed={counts['processed']} inserted={counts['inserted']} rejected={counts['rejected']}", file=sys.stderr)
+
+    if args.file == "-":
+        report = import_issues(sys.stdin, fmt, args.project, args.reporter, args.chunk_size, progress)
+    else:
+        with open(args.file, newline="", encoding="utf-8") as text:
+            report = import_issues(text, fmt, args.project, args.reporter, args.chunk_size, progress)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
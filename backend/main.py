@@ -1,12 +1,32 @@
 from fastapi import FastAPI
-from config.db import Base, engine, SessionLocal
+from config.db import Base, engine
 from routes.user_routes import user_route
 from routes.project_routes import project_route
 from routes.comment_routes import comment_route
 from routes.issue_routes import issues_route
+from routes.export_routes import export_route
+from routes.import_routes import import_route
+from routes.search_routes import search_route
+from routes.event_routes import event_route
+from routes.job_routes import job_route
+from routes.internal_routes import internal_route
 from routes.ai_chat_bot import chat_bot
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
+from utility.hashed_password import shutdown_hashing
+from utility.events import start_events, stop_events
+from utility.jobs import start_job_workers, stop_job_workers
+from config.replicas import start_replica_checks, stop_replica_checks
+from utility.metrics import install_metrics
+from utility.sql_profiler import SQLProfilerMiddleware, install_sql_profiler
+from config.settings import METRICS_ENABLED, SQL_PROFILE_MODE
+from utility.search import install_search
+from utility.etag import install_revisions
+from utility.activity import install_timestamps
+from utility.deletion import install_cascades
+from utility.archive import install_archive
+from utility.issue_stats import install_issue_stats
+from utility.user_search import install_user_search
 
 app = FastAPI()
 
@@ -14,18 +34,59 @@ app.include_router(user_route, prefix="/api", tags=["User"])
 app.include_router(project_route, prefix="/api/project", tags=["Project"])
 app.include_router(issues_route, prefix="/api/project/issue", tags=["Issue"])
 app.include_router(comment_route, prefix="/api/project/issue/comment", tags=["Comment"])
+app.include_router(export_route, prefix="/api/project/export", tags=["Export"])
+app.include_router(import_route, prefix="/api/project/import", tags=["Import"])
+app.include_router(search_route, prefix="/api/search", tags=["Search"])
+app.include_router(event_route, prefix="/api/project/events", tags=["Events"])
+app.include_router(job_route, prefix="/api/jobs", tags=["Jobs"])
+app.include_router(internal_route, prefix="/internal", tags=["Internal"])
 app.include_router(chat_bot, prefix="/api/personal_ai", tags=["ChatBot"])
 
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 Base.metadata.create_all(bind=engine)
+install_revisions(engine)
+install_timestamps(engine)
+install_cascades(engine)
+install_archive(engine)
+install_search(engine)
+install_issue_stats(engine)
+install_user_search(engine)
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+if METRICS_ENABLED:
+    install_metrics(app)
+
+if SQL_PROFILE_MODE != "off":
+    install_sql_profiler()
+    app.add_middleware(SQLProfilerMiddleware)
+
+@app.on_event("startup")
+def start_event_backend():
+    start_events()
+
+@app.on_event("shutdown")
+def stop_hashing_pool():
+    shutdown_hashing()
+
+@app.on_event("shutdown")
+def stop_event_backend():
+    stop_events()
+
+@app.on_event("startup")
+def start_job_runner():
+    start_job_workers()
+
+@app.on_event("shutdown")
+def stop_job_runner():
+    stop_job_workers()
+
+@app.on_event("startup")
+def start_replica_health_checks():
+    start_replica_checks()
+
+@app.on_event("shutdown")
+def stop_replica_health_checks():
+    stop_replica_checks()
 
 @app.get("/")
 def check():
@@ -45,4 +106,6 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # paging and caching headers, readable by browser clients
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "ETag"],
 )
\ No newline at end of file
@@ -0,0 +1,36 @@
+"""
+Move existing issues and comments, live and archived, onto time-ordered ids.
+
+    python migrate_ids.py              # issues, comments and their archive tables
+    python migrate_ids.py --dry-run    # only count the rows that would change
+
+Rows created before the id scheme changed keep their short random ids until
+this is run. Stop the API while it runs.
+"""
+import argparse
+import json
+import sys
+from config.db import engine
+from utility.id_migration import MIGRATABLE, legacy_count, migrate_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rewrite old-style issue/comment ids as time-ordered ids.")
+    parser.add_argument("--tables", nargs="+", choices=list(MIGRATABLE), default=list(MIGRATABLE))
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    if args.dry_run:
+        with engine.connect() as connection:
+            print(json.dumps({name: legacy_count(connection, MIGRATABLE[name][0]) for name in args.tables}))
+        return
+
+    def progress(table: str, count: int):
+        print(f"{table}: {count} rows migrated", file=sys.stderr)
+
+    print(json.dumps(migrate_ids(args.tables, args.batch_size, on_progress=progress)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,39 @@
-from sqlalchemy import Column, Enum, String, Text, DateTime, ForeignKey, Table
+from sqlalchemy import Column, Enum, Integer, String, Text, DateTime, ForeignKey, Table, Index, JSON, PrimaryKeyConstraint, func
 from sqlalchemy.orm import relationship
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
 from config.db import Base
-from utility.id_genrater import idGenrate, projectIdGenrator, issuesIdGenrator, commentIdGenrator
-from datetime import timezone, datetime
+from utility.id_genrater import idGenrate, projectIdGenrator, issuesIdGenrator, commentIdGenrator, new_id
+
+
+class utc_now(FunctionElement):
+    """Current UTC time, evaluated by the database for every statement."""
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utc_now)
+def _utc_now_default(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utc_now, "postgresql")
+def _utc_now_postgresql(element, compiler, **kw):
+    # columns are timestamp without time zone, holding UTC
+    return "timezone('utc', statement_timestamp())"
+
+
+@compiles(utc_now, "sqlite")
+def _utc_now_sqlite(element, compiler, **kw):
+    # microsecond text, as SQLAlchemy writes datetimes, so values compare as strings
+    return "(strftime('%Y-%m-%d %H:%M:%f000', 'now'))"
 
 
 project_members = Table("project_members", Base.metadata, 
-                        Column("project_id", ForeignKey("projects.id"), primary_key=True), 
-                        Column("user_id", ForeignKey("users.id"), primary_key=True),
+                        Column("project_id", ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True), 
+                        Column("user_id", ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+                        # the primary key leads with project_id; this serves "projects of a user"
+                        Index("ix_project_members_user_id", "user_id"),
                         )
 
 
@@ -26,18 +52,32 @@ class User(Base):
     issues_solved = relationship("Issue", back_populates="solver", foreign_keys="Issue.solver_id")
     comments = relationship("Comment", back_populates="created", cascade="all, delete")
 
+    __table_args__ = (
+        # prefix matching for user search (LIKE 'abc%' on lower(column))
+        Index("ix_users_username_lower", func.lower(username).label("username_lower"), postgresql_ops={"username_lower": "text_pattern_ops"}),
+        Index("ix_users_name_lower", func.lower(name).label("name_lower"), postgresql_ops={"name_lower": "text_pattern_ops"}),
+        Index("ix_users_email_lower", func.lower(email).label("email_lower"), postgresql_ops={"email_lower": "text_pattern_ops"}),
+    )
+
 
 class Project(Base):
     __tablename__ = "projects"
     id = Column(String, default=projectIdGenrator, primary_key=True, unique=True, index=True)
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=False)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc))
+    created_at = Column(DateTime, nullable=False, server_default=utc_now())
     created_by = Column(String, ForeignKey("users.id"))
+    # ETag version tokens, see utility/etag.py
+    revision = Column(Integer, nullable=False, default=0, server_default="0")
+    issues_revision = Column(Integer, nullable=False, default=0, server_default="0")
 
     creator = relationship("User", back_populates="created_projects", foreign_keys=[created_by])
-    members = relationship("User", secondary=project_members, back_populates="projects")
-    issues = relationship("Issue", back_populates="project", cascade="all, delete")
+    # children are removed by ON DELETE CASCADE (and utility/deletion.py), never loaded to be deleted
+    members = relationship("User", secondary=project_members, back_populates="projects", passive_deletes=True)
+    issues = relationship("Issue", back_populates="project", cascade="all, delete", passive_deletes=True)
+
+    # read server-generated columns back with RETURNING on insert/update
+    __mapper_args__ = {"eager_defaults": True}
 
 
 status_enum = Enum(
@@ -58,29 +98,138 @@ class Issue(Base):
     description = Column(Text, nullable=False)
     priority = Column(priority_enum ,default="low", index=True)
     status = Column(status_enum, default="open", index=True)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc))
-    updated_at = Column(DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+    created_at = Column(DateTime, nullable=False, server_default=utc_now())
+    updated_at = Column(DateTime, nullable=False, server_default=utc_now(), onupdate=utc_now())
 
-    project_id = Column(String, ForeignKey("projects.id"))
+    project_id = Column(String, ForeignKey("projects.id", ondelete="CASCADE"))
     reporter_id = Column(String, ForeignKey("users.id"))
     solver_id = Column(String, ForeignKey("users.id"), nullable=True)
+    # ETag version tokens, see utility/etag.py
+    revision = Column(Integer, nullable=False, default=0, server_default="0")
+    comments_revision = Column(Integer, nullable=False, default=0, server_default="0")
 
     project = relationship("Project", back_populates="issues")
-    comments = relationship("Comment", back_populates="issue", cascade="all, delete")
+    comments = relationship("Comment", back_populates="issue", cascade="all, delete", passive_deletes=True)
 
     reporter = relationship("User", back_populates="issues_reported", foreign_keys=[reporter_id])
     solver = relationship("User", back_populates="issues_solved", foreign_keys=[solver_id])
 
+    __table_args__ = (
+        # keyset pagination of a project's issues
+        Index("ix_issues_project_created_id", "project_id", "created_at", "id"),
+        # time-range scans (activity feed); rows arrive in time order, so BRIN on Postgres
+        Index("ix_issues_created_at", "created_at", postgresql_using="brin"),
+        Index("ix_issues_updated_at", "updated_at", postgresql_using="brin"),
+    )
+    __mapper_args__ = {"eager_defaults": True}
+
 
 class Comment(Base):
     __tablename__ = "comments"
     id = Column(String, default=commentIdGenrator, primary_key=True, index=True)
     text = Column(Text, nullable=False)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc))
+    created_at = Column(DateTime, nullable=False, server_default=utc_now())
 
     created_by = Column(String, ForeignKey("users.id"), nullable=False)
-    issue_id = Column(String, ForeignKey("issues.id"), nullable=False)
+    issue_id = Column(String, ForeignKey("issues.id", ondelete="CASCADE"), nullable=False)
 
     created = relationship("User", back_populates="comments")
     issue = relationship("Issue", back_populates="comments")
 
+    __table_args__ = (
+        # keyset pagination of an issue's thread
+        Index("ix_comments_issue_created_id", "issue_id", "created_at", "id"),
+        Index("ix_comments_created_at", "created_at", postgresql_using="brin"),
+    )
+    __mapper_args__ = {"eager_defaults": True}
+
+
+# ------------- Archive --------------
+# Closed/resolved issues that haven't changed for ARCHIVE_AFTER_DAYS move here
+# with their comments (utility/archive.py), keeping the hot tables and their
+# indexes small. Same columns plus archived_at; on Postgres both tables are
+# hash partitioned by project, so the primary keys carry project_id.
+
+class ArchivedIssue(Base):
+    __tablename__ = "issues_archive"
+    id = Column(String, nullable=False)
+    title = Column(String(255), nullable=False)
+    description = Column(Text, nullable=False)
+    priority = Column(priority_enum)
+    status = Column(status_enum)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    project_id = Column(String, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    reporter_id = Column(String)
+    solver_id = Column(String, nullable=True)
+    revision = Column(Integer, nullable=False, default=0)
+    comments_revision = Column(Integer, nullable=False, default=0)
+    archived_at = Column(DateTime, nullable=False, server_default=utc_now())
+
+    __table_args__ = (
+        PrimaryKeyConstraint("id", "project_id"),
+        Index("ix_issues_archive_project_created_id", "project_id", "created_at", "id"),
+        {"postgresql_partition_by": "HASH (project_id)"},
+    )
+
+
+class ArchivedComment(Base):
+    __tablename__ = "comments_archive"
+    id = Column(String, nullable=False)
+    text = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    created_by = Column(String, nullable=False)
+    issue_id = Column(String, nullable=False)
+    project_id = Column(String, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    archived_at = Column(DateTime, nullable=False, server_default=utc_now())
+
+    __table_args__ = (
+        PrimaryKeyConstraint("id", "project_id"),
+        Index("ix_comments_archive_issue_created_id", "issue_id", "created_at", "id"),
+        {"postgresql_partition_by": "HASH (project_id)"},
+    )
+
+
+class IssueStats(Base):
+    """Per-project issue counts by status and priority, kept up to date when
+    ISSUE_STATS_TABLE is enabled (see utility/issue_stats.py)."""
+    __tablename__ = "issue_stats"
+    project_id = Column(String, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    status = Column(status_enum, primary_key=True)
+    priority = Column(priority_enum, primary_key=True)
+    issue_count = Column(Integer, nullable=False, default=0)
+
+
+class Job(Base):
+    """A unit of background work, claimed and run by utility/jobs.py."""
+    __tablename__ = "jobs"
+    id = Column(String, default=new_id, primary_key=True)
+    kind = Column(String(50), nullable=False)
+    owner_id = Column(String, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, succeeded, failed
+    payload = Column(JSON, nullable=False, default=dict)
+    progress = Column(JSON, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    # not picked up before this time (retry backoff)
+    run_after = Column(DateTime, nullable=False, server_default=utc_now())
+    locked_by = Column(String(100), nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, nullable=False, server_default=utc_now())
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # the claim query: oldest due job of a kind that has a free slot
+        Index("ix_jobs_status_run_after", "status", "run_after"),
+    )
+
+
+class ReplicaHeartbeat(Base):
+    """One row stamped on the primary and read back from each replica to
+    measure replication lag (config/replicas.py)."""
+    __tablename__ = "replica_heartbeat"
+    id = Column(Integer, primary_key=True)
+    beat_at = Column(DateTime, nullable=False)
@@ -1,79 +1,147 @@
-from fastapi import APIRouter, status, Depends, HTTPException
-from sqlalchemy.orm import Session
+import json
+from fastapi import APIRouter, status, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from schemas.comments import CommentIn, CommentOut
-from config.db import SessionLocal
+from config.db import get_db, open_session, stream_partitions
+from config.replicas import get_read_db
+from config.settings import EXPORT_CHUNK_SIZE
 from utility.token_genrater import decode_access_token
-from models.models import User, Project, Issue, Comment
-from typing import List
+from utility.project_access import issue_access
+from utility.etag import bump, make_etag, not_modified
+from utility.events import publish, comment_event
+from utility.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, encode_cursor, decode_cursor
+from models.models import Comment, Issue, ArchivedComment, ArchivedIssue
+from typing import List, Literal, Optional
 
 comment_route = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+def _comment_columns(source=Comment):
+    return [source.id, source.text, source.created_at, source.created_by, source.issue_id]
+
+
+COMMENT_COLUMNS = _comment_columns()
+
+
+def _thread_query(issue_id: str, order: str, cursor: Optional[str], source=Comment):
+    """One issue's comments in (created_at, id) order, seeking past ``cursor``
+    on ix_comments_issue_created_id (or its twin on ``ArchivedComment``)."""
+    query = select(*_comment_columns(source)).where(source.issue_id == issue_id)
+    key = tuple_(source.created_at, source.id)
+
+    if order == "newest":
+        if cursor:
+            query = query.where(key < tuple_(*decode_cursor(cursor)))
+        return query.order_by(source.created_at.desc(), source.id.desc())
+
+    if cursor:
+        query = query.where(key > tuple_(*decode_cursor(cursor)))
+    return query.order_by(source.created_at, source.id)
+
+
+async def _thread_size(db: AsyncSession, issue_id: str, source=Comment) -> int:
+    # answered from the index, no comment rows are read
+    return await db.scalar(select(func.count()).select_from(source).where(source.issue_id == issue_id))
+
+
+async def _ndjson_thread(query):
+    # the request's session is closed before the body streams, so use our own
+    async with open_session() as db:
+        async for rows in stream_partitions(db, query, EXPORT_CHUNK_SIZE):
+            for row in rows:
+                yield json.dumps({**row, "created_at": row["created_at"].isoformat()}) + "\n"
+
 
 @comment_route.post("/{issue_id}/write_comment/", status_code=status.HTTP_201_CREATED, response_model=CommentOut)
-def write_comment(issue_id: str, comment: CommentIn, db: Session = Depends(get_db), user: dict = Depends(decode_access_token)):
+async def write_comment(issue_id: str, comment: CommentIn, db: AsyncSession = Depends(get_db), user: dict = Depends(decode_access_token)):
     
-    issue = db.query(Issue).filter(Issue.id == issue_id).first()
+    project_id, allowed = await issue_access(db, issue_id, user.get("id"))
 
-    if not issue:
+    if not project_id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="issue not found.")
-    
-    project = db.query(Project).filter(Project.id == issue.project_id).first()
 
-    if not project:
+    if allowed is None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Facing an Error to finding the project")
-    
-    create_by = project.created_by == user.get("id")
-    is_member = any(member.id == user.get("id") for member in project.members)
 
-    if not create_by or is_member:
+    if not allowed:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="You are not able to see the issue or bug report for this project")
-    
-    comment_write = Comment(text=comment.text, created_by=user.get("id"), issue_id=issue.id)
+
+    comment_write = Comment(text=comment.text, created_by=user.get("id"), issue_id=issue_id)
 
     db.add(comment_write)
-    db.commit()
-    db.refresh(comment_write)
+    await bump(db, Issue.comments_revision, issue_id)
+    await db.commit()
+    await db.refresh(comment_write)
+    await publish(project_id, "comment.created", comment_event(comment_write))
 
     return comment_write
 
 
 @comment_route.get("/{issue_id}/show_comment/", status_code=status.HTTP_200_OK, response_model=List[CommentOut])
-def write_comment(issue_id: str, db: Session = Depends(get_db), user: dict = Depends(decode_access_token)):
-    
-    issue = db.query(Issue).filter(Issue.id == issue_id).first()
-
-    if not issue:
+async def show_comment(
+    issue_id: str,
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    order: Literal["oldest", "newest"] = "oldest",
+    format: Literal["json", "ndjson"] = "json",
+    include_archived: bool = False,
+    db: AsyncSession = Depends(get_read_db),
+    user: dict = Depends(decode_access_token),
+):
+    """Page through an issue's comments, oldest or newest first.
+
+    The thread's size is in the X-Total-Count header and the cursor for the
+    next page in X-Next-Cursor. ``format=ndjson`` streams every comment after
+    ``cursor`` instead, one JSON object per line, without a page limit.
+    Threads of archived issues are read with ``include_archived=true``.
+    """
+    project_id, allowed = await issue_access(db, issue_id, user.get("id"), include_archived)
+
+    if not project_id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="issue not found.")
-    
-    project = db.query(Project).filter(Project.id == issue.project_id).first()
 
-    if not project:
+    if allowed is None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Facing an Error to finding the project")
-    
-    create_by = project.created_by == user.get("id")
-    is_member = any(member.id == user.get("id") for member in project.members)
 
-    if not create_by or is_member:
+    if not allowed:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="You are not able to see the issue or bug report for this project")
-    
-    comment = db.query(Comment).filter(Comment.issue_id == issue.id).all()
 
-    if not comment:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="comment not found.")
-    
+    source, issue_source = Comment, Issue
+    comments_revision = await db.scalar(select(Issue.comments_revision).where(Issue.id == issue_id))
+
+    if comments_revision is None and include_archived:
+        source, issue_source = ArchivedComment, ArchivedIssue
+        comments_revision = await db.scalar(select(ArchivedIssue.comments_revision).where(ArchivedIssue.id == issue_id))
+
+    query = _thread_query(issue_id, order, cursor, source)
+
+    if format == "ndjson":
+        total = await _thread_size(db, issue_id, source)
+        return StreamingResponse(_ndjson_thread(query), media_type="application/x-ndjson", headers={TOTAL_COUNT_HEADER: str(total)})
+
+    cached = not_modified(request, response, make_etag("comments", issue_id, issue_source.__tablename__, comments_revision, cursor, limit, order))
+    if cached:
+        return cached
+
+    response.headers[TOTAL_COUNT_HEADER] = str(await _thread_size(db, issue_id, source))
+    comments = (await db.execute(query.limit(limit + 1))).mappings().all()
+
+    if len(comments) > limit:
+        comments = comments[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(comments[-1]["created_at"], comments[-1]["id"])
 
-    return comment 
+    return comments
 
 @comment_route.delete("/delete/{comment_id}/", status_code=status.HTTP_200_OK)
-def delete_comment(comment_id: str, db: Session = Depends(get_db), user: dict=Depends(decode_access_token)):
+async def delete_comment(comment_id: str, db: AsyncSession = Depends(get_db), user: dict=Depends(decode_access_token)):
 
-    comment = db.query(Comment).filter(Comment.id == comment_id).first()
+    comment = await db.get(Comment, comment_id)
 
     if not comment:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="comment not found.")
@@ -81,7 +149,11 @@ def delete_comment(comment_id: str, db: Session = Depends(get_db), user: dict=De
     if comment.created_by != user.get("id"):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="You are not able to delete this comment.")
     
-    db.delete(comment)
-    db.commit()
+    issue_id = comment.issue_id
+    project_id, _ = await issue_access(db, issue_id, user.get("id"))
+    await bump(db, Issue.comments_revision, issue_id)
+    await db.delete(comment)
+    await db.commit()
+    await publish(project_id, "comment.deleted", {"id": comment_id, "issue_id": issue_id})
 
     return {"Message": "comment delete successfully."}
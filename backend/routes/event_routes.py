@@ -0,0 +1,65 @@
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from config.db import get_db
+from config.settings import EVENTS_KEEPALIVE_SECONDS
+from utility.token_genrater import decode_access_token
+from utility.project_access import can_access_project
+from utility.events import broker, encode_event
+
+event_route = APIRouter()
+
+
+def _revokes_access(event: dict, user_id: str) -> bool:
+    return event["type"] == "project.deleted" or (event["type"] == "member.removed" and event["user_id"] == user_id)
+
+
+async def _event_stream(project_id: str, user_id: str):
+    subscription = broker.subscribe(project_id)
+    try:
+        # tells the client how long to wait before reconnecting
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), EVENTS_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                # keeps proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+                continue
+            if event is None:
+                yield "event: overflow\ndata: {}\n\n"
+                return
+            yield f"event: {event['type']}\ndata: {encode_event(event)}\n\n"
+            if _revokes_access(event, user_id):
+                # access was checked when the stream opened; it ends with the
+                # event that takes it away, and a reconnect is checked again
+                return
+    finally:
+        broker.unsubscribe(subscription)
+
+
+@event_route.get("/{project_id}/", status_code=status.HTTP_200_OK)
+async def project_events(project_id: str, db: AsyncSession = Depends(get_db), user: dict = Depends(decode_access_token)):
+    """Server-Sent Events for a project's issues and comments.
+
+    Event names are ``issue.created``, ``issue.updated``, ``issue.deleted``,
+    ``issues.created``, ``issues.updated``, ``comment.created`` and
+    ``comment.deleted``, plus ``member.removed`` and ``project.deleted``; the
+    data is the JSON event. The stream ends after a ``member.removed`` for the
+    caller or a ``project.deleted``. A client that can't keep up gets an
+    ``overflow`` event and the stream ends: reconnect and refetch.
+    """
+    allowed = await can_access_project(db, project_id, user.get("id"))
+
+    if allowed is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project Not found")
+
+    if not allowed:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="You are not able to see the issue or bug report for this project")
+
+    return StreamingResponse(
+        _event_stream(project_id, user.get("id")),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
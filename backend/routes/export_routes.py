@@ -0,0 +1,121 @@
+import csv
+import io
+import json
+from datetime import datetime
+from fastapi import APIRouter, Depends, status, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional
+from config.db import get_db, open_session, stream_partitions
+from config.settings import EXPORT_CHUNK_SIZE
+from models.models import Issue, Comment, status_enum
+from utility.token_genrater import decode_access_token
+from utility.project_access import can_access_project
+
+export_route = APIRouter()
+
+
+ISSUE_COLUMNS = [
+    Issue.id, Issue.title, Issue.description, Issue.priority, Issue.status,
+    Issue.created_at, Issue.updated_at, Issue.project_id, Issue.reporter_id, Issue.solver_id,
+]
+COMMENT_COLUMNS = [Comment.id, Comment.text, Comment.created_at, Comment.created_by, Comment.issue_id]
+
+
+def _jsonable(row) -> dict:
+    return {key: value.isoformat() if isinstance(value, datetime) else value for key, value in row.items()}
+
+
+async def _issue_records(project_id: str, include_comments: bool, statuses: Optional[List[str]], since: Optional[datetime], until: Optional[datetime]):
+    """Yield export records chunk by chunk from a server-side cursor.
+
+    Comments are fetched with one IN query per chunk of issues, not per issue.
+    """
+    query = select(*ISSUE_COLUMNS).where(Issue.project_id == project_id)
+    if statuses:
+        query = query.where(Issue.status.in_(statuses))
+    if since:
+        query = query.where(Issue.created_at >= since)
+    if until:
+        query = query.where(Issue.created_at < until)
+    query = query.order_by(Issue.created_at, Issue.id)
+
+    # The request's session is closed before the body streams, so use our own.
+    async with open_session() as db:
+        async for rows in stream_partitions(db, query, EXPORT_CHUNK_SIZE):
+            comments = {}
+            if include_comments:
+                comment_rows = (await db.execute(
+                    select(*COMMENT_COLUMNS)
+                    .where(Comment.issue_id.in_([row["id"] for row in rows]))
+                    .order_by(Comment.created_at, Comment.id)
+                )).mappings()
+                for comment in comment_rows:
+                    comments.setdefault(comment["issue_id"], []).append(_jsonable(comment))
+
+            for row in rows:
+                record = _jsonable(row)
+                if include_comments:
+                    record["comments"] = comments.get(row["id"], [])
+                yield record
+
+
+async def _ndjson(records):
+    async for record in records:
+        yield json.dumps(record) + "\n"
+
+
+async def _csv(records, include_comments: bool):
+    fields = [column.key for column in ISSUE_COLUMNS] + (["comments"] if include_comments else [])
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields)
+    writer.writeheader()
+
+    async for record in records:
+        if include_comments:
+            record["comments"] = json.dumps(record["comments"])
+        writer.writerow(record)
+        if buffer.tell() >= 64 * 1024:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+@export_route.get("/{project_id}/", status_code=status.HTTP_200_OK)
+async def export_issues(
+    project_id: str,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    include_comments: bool = False,
+    status_in: Optional[List[str]] = Query(None, alias="status"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db),
+    user: dict = Depends(decode_access_token),
+):
+    """Stream every issue of a project (optionally with comments) as NDJSON or CSV."""
+    allowed = await can_access_project(db, project_id, user.get("id"))
+
+    if allowed is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project Not found")
+
+    if not allowed:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="You are not able to see the issue or bug report for this project")
+
+    if status_in and not set(status_in) <= set(status_enum.enums):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"status must be one of {', '.join(status_enum.enums)}")
+
+    records = _issue_records(project_id, include_comments, status_in, since, until)
+
+    if format == "csv":
+        body, media_type = _csv(records, include_comments), "text/csv"
+    else:
+        body, media_type = _ndjson(records), "application/x-ndjson"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="project-{project_id}-issues.{format}"'},
+    )
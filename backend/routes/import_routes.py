@@ -0,0 +1,62 @@
+import io
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Request, Response, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from config.db import client_key, get_db
+from config.replicas import replicas
+from utility.issue_import import detect_format, import_issues
+from utility.jobs import enqueue, save_job_file
+from utility.project_access import can_access_project
+from utility.token_genrater import decode_access_token
+
+import_route = APIRouter()
+
+
+@import_route.post("/{project_id}/", status_code=status.HTTP_200_OK)
+async def import_project_issues(
+    project_id: str,
+    request: Request,
+    response: Response,
+    file: UploadFile = File(...),
+    format: Optional[Literal["csv", "ndjson"]] = None,
+    background: bool = False,
+    db: AsyncSession = Depends(get_db),
+    user: dict = Depends(decode_access_token),
+):
+    """Import issues from an uploaded CSV/NDJSON file.
+
+    The upload is spooled to disk and parsed line by line in a worker thread;
+    the response reports inserted and rejected rows. With ``background=true``
+    the file is saved and imported by a job instead: the response is 202 with
+    a handle to poll at /api/jobs/{job_id}/, whose result is that report.
+    """
+    allowed = await can_access_project(db, project_id, user.get("id"))
+
+    if allowed is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project Not found")
+
+    if not allowed:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="You are not able to create the issue or bug report for this project")
+
+    fmt = format or detect_format(file.filename, file.content_type)
+
+    if background:
+        path = await run_in_threadpool(save_job_file, file.file, f".{fmt}")
+        payload = {"path": path, "fmt": fmt, "project_id": project_id, "reporter_id": user.get("id")}
+        job_id = await enqueue(db, "import_issues", user.get("id"), payload)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {"Message": "Import queued.", "job_id": job_id, "status_url": f"/api/jobs/{job_id}/"}
+
+    text = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    try:
+        report = await run_in_threadpool(import_issues, text, fmt, project_id, user.get("id"))
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File must be UTF-8 encoded.")
+    finally:
+        text.detach()
+
+    # the rows went in on their own connection, not the session whose commit
+    # marks the client as a writer, so mark it here for read-your-writes
+    replicas.mark_write(client_key(request))
+    return report
@@ -0,0 +1,63 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from config.db import get_db, pool_engines
+from config.settings import ARCHIVE_AFTER_DAYS, ISSUE_STATS_TABLE
+from config.pool import pool_status
+from config.replicas import replicas
+from utility.hashed_password import hashing_stats
+from utility.token_genrater import decode_access_token, token_cache_stats
+from utility.events import broker, events_backend
+from utility.jobs import enqueue, runner
+
+internal_route = APIRouter()
+
+
+def require_admin(user: dict = Depends(decode_access_token)) -> dict:
+    if user.get("role") != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only admins can see internal stats.")
+    return user
+
+
+@internal_route.get("/pool/", status_code=status.HTTP_200_OK)
+def show_pool_stats(user: dict = Depends(require_admin)):
+    """Live connection pool occupancy, checkout wait histogram and timeouts."""
+    return {name: pool_status(engine.pool) for name, engine in pool_engines().items()}
+
+
+@internal_route.get("/replicas/", status_code=status.HTTP_200_OK)
+def show_replica_stats(user: dict = Depends(require_admin)):
+    """Read replicas with their lag and health, and how reads were routed."""
+    return replicas.stats()
+
+
+@internal_route.get("/caches/", status_code=status.HTTP_200_OK)
+def show_cache_stats(user: dict = Depends(require_admin)):
+    return {"token_cache": token_cache_stats(), "password_hashing": hashing_stats()}
+
+
+@internal_route.get("/events/", status_code=status.HTTP_200_OK)
+def show_event_stats(user: dict = Depends(require_admin)):
+    """Live event subscribers in this worker, deliveries and dropped slow consumers."""
+    return {"backend": events_backend().name, **broker.stats()}
+
+
+@internal_route.get("/jobs/", status_code=status.HTTP_200_OK)
+def show_job_stats(user: dict = Depends(require_admin)):
+    """Job worker threads in this process and the jobs they are running, by kind."""
+    return runner.stats()
+
+
+@internal_route.post("/archive/", status_code=status.HTTP_202_ACCEPTED)
+async def start_archive(older_than_days: float = ARCHIVE_AFTER_DAYS, db: AsyncSession = Depends(get_db), user: dict = Depends(require_admin)):
+    """Queue a job moving closed/resolved issues untouched for ``older_than_days`` to the archive."""
+    job_id = await enqueue(db, "archive_issues", user.get("id"), {"older_than_days": older_than_days})
+    return {"Message": "Archive queued.", "job_id": job_id, "status_url": f"/api/jobs/{job_id}/"}
+
+
+@internal_route.post("/issue_stats/", status_code=status.HTTP_202_ACCEPTED)
+async def start_issue_stats_recount(db: AsyncSession = Depends(get_db), user: dict = Depends(require_admin)):
+    """Queue a job rebuilding the issue_stats summary from the issues table."""
+    if not ISSUE_STATS_TABLE:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="The issue_stats table is switched off.")
+    job_id = await enqueue(db, "recount_issue_stats", user.get("id"), {})
+    return {"Message": "Issue stats recount queued.", "job_id": job_id, "status_url": f"/api/jobs/{job_id}/"}
@@ -1,62 +1,103 @@
-from fastapi import APIRouter, Depends, status, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Body, Depends, status, HTTPException, Query, Request, Response
+from sqlalchemy import select, insert, update, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from utility.token_genrater import decode_access_token
-from config.db import SessionLocal
-from models.models import Issue, Project 
-from schemas.issues import IssuesIn, IssuesOut, UpdateIssues
-from typing import List
+from utility.project_access import can_access_project, issue_access, invalidate_issue
+from utility.issue_stats import record_issue_changes
+from utility.etag import bump, make_etag, not_modified
+from utility.events import publish, issue_event
+from utility.deletion import delete_issue_rows
+from utility.archive import ARCHIVED_STATUSES, project_issues_query, restore_issue
+from config.db import get_db
+from config.replicas import get_read_db
+from models.models import Issue, Project, User, ArchivedIssue
+from schemas.issues import IssuesIn, IssuesOut, UpdateIssues, BulkUpdateIssues, BulkItemError, BulkIssuesOut, parse_issue_payload
+from config.settings import BULK_MAX_ITEMS
+from typing import List, Optional
+from utility.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, encode_cursor, decode_cursor
 
 issues_route = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
 
 
 # ------------- ISSUES ( Report BUGS ) ----------------
 
 @issues_route.post("/add_issue/{project_id}/", response_model=IssuesOut, status_code=status.HTTP_201_CREATED)
-def create_issue(project_id: str, issue_create: IssuesIn, db: Session = Depends(get_db), user: dict = Depends(decode_access_token)):
+async def create_issue(project_id: str, issue_create: IssuesIn, db: AsyncSession = Depends(get_db), user: dict = Depends(decode_access_token)):
 
-    project = db.query(Project).filter(Project.id == project_id).first()
+    allowed = await can_access_project(db, project_id, user.get("id"))
 
-    if not project:
+    if allowed is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project Not found")
-    
-    create_by = project.created_by == user.get("id")
-    is_member = any(member.id == user.get("id") for member in project.members)
 
-    if not (create_by or is_member):
+    if not allowed:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="You are not able to create the issue or bug report for this project")
-    
+
     issue = Issue(title=issue_create.title, description=issue_create.description, priority=issue_create.priority, status=issue_create.status, reporter_id=user.get("id"), project_id=project_id)
-    
+
 
     db.add(issue)
-    db.commit()
-    db.refresh(issue)
+    await db.flush()
+    await record_issue_changes(db, project_id, [(None, (issue.status, issue.priority))])
+    await bump(db, Project.issues_revision, project_id)
+    await db.commit()
+    await db.refresh(issue)
+    await publish(project_id, "issue.created", issue_event(issue))
 
     return issue
 
 # ----------------- find all issues in the project ---------------------------------
 
 @issues_route.get("/show_all_issues_in_project/{project_id}/", status_code=status.HTTP_200_OK, response_model=List[IssuesOut])
-def show_issues(project_id: str, db: Session = Depends(get_db), user: dict = Depends(decode_access_token)):
-    project = db.query(Project).filter(Project.id == project_id).first()
-
-    if not project:
+async def show_issues(
+    project_id: str,
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    include_archived: bool = False,
+    db: AsyncSession = Depends(get_read_db),
+    user: dict = Depends(decode_access_token),
+):
+    """Page through a project's issues ordered by (created_at, id).
+
+    Without ``limit`` or ``cursor`` every issue is returned, as before paging;
+    otherwise pages hold ``limit`` issues (100 by default) and the cursor for
+    the next page is returned in the X-Next-Cursor header.
+    ``include_archived=true`` merges in archived issues (with ``archived_at`` set).
+    """
+    allowed = await can_access_project(db, project_id, user.get("id"))
+
+    if allowed is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project Not found")
-    
-    create_by = project.created_by == user.get("id")
-    is_member = any(member.id == user.get("id") for member in project.members)
 
-    if not (create_by or is_member):
+    if not allowed:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="You are not able to see the issue or bug report for this project")
-    
-    issues = db.query(Issue).filter(Issue.project_id == project_id).all()
+
+    issues_revision = await db.scalar(select(Project.issues_revision).where(Project.id == project_id))
+    cached = not_modified(request, response, make_etag("issues", project_id, issues_revision, cursor, limit, include_archived))
+    if cached:
+        return cached
+
+    page_size = limit or (DEFAULT_PAGE_SIZE if cursor else None)
+    fetch = page_size + 1 if page_size else None
+
+    if include_archived:
+        query = project_issues_query(project_id, decode_cursor(cursor) if cursor else None, fetch)
+        issues = (await db.execute(query)).all()
+    else:
+        query = select(Issue).where(Issue.project_id == project_id)
+
+        if cursor:
+            # keyset seek on ix_issues_project_created_id, no OFFSET scan
+            query = query.where(tuple_(Issue.created_at, Issue.id) > tuple_(*decode_cursor(cursor)))
+
+        query = query.order_by(Issue.created_at, Issue.id).limit(fetch)
+        issues = (await db.scalars(query)).all()
+
+    if page_size and len(issues) > page_size:
+        issues = issues[:page_size]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(issues[-1].created_at, issues[-1].id)
 
     # Return empty list if no issues found instead of raising 404
     return issues
@@ -64,93 +105,220 @@ def show_issues(project_id: str, db: Session = Depends(get_db), user: dict = Dep
 # ----------------- find particular issue with the issue id ---------------------------------
 
 @issues_route.get("/show_issue/{issue_id}/", status_code=status.HTTP_200_OK, response_model=IssuesOut)
-def show_issues(issue_id: str, db: Session = Depends(get_db), user: dict = Depends(decode_access_token)):
+async def show_issue(issue_id: str, request: Request, response: Response, include_archived: bool = False, db: AsyncSession = Depends(get_read_db), user: dict = Depends(decode_access_token)):
 
-    issue = db.query(Issue).filter(Issue.id == issue_id).first()
+    project_id, allowed = await issue_access(db, issue_id, user.get("id"), include_archived)
 
-    if not issue:
+    if not project_id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Issue Not found")
-    
-    project = db.query(Project).filter(Project.id == issue.project_id).first()
 
-    if not project:
+    if allowed is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="There is no project found with this issue.")
 
-    create_by = project.created_by == user.get("id")
-    is_member = any(member.id == user.get("id") for member in project.members)
-
-    if not (create_by or is_member):
+    if not allowed:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="You are not able to see the issue or bug report for this project")
 
+    revision = await db.scalar(select(Issue.revision).where(Issue.id == issue_id))
+
+    if revision is None and include_archived:
+        archived = await db.scalar(select(ArchivedIssue).where(ArchivedIssue.id == issue_id))
+        if archived:
+            return archived
+
+    if revision is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Issue Not found")
+
+    cached = not_modified(request, response, make_etag("issue", issue_id, revision))
+    if cached:
+        return cached
+
+    issue = await db.get(Issue, issue_id)
+
+    if not issue:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Issue Not found")
+
     return issue
 
 
 @issues_route.delete("/delete/{issue_id}/", status_code=status.HTTP_200_OK)
-def delete_issue(issue_id: str, db: Session=Depends(get_db), user: dict = Depends(decode_access_token)):
-    print(f"🗑️ Delete issue request for issue_id: {issue_id}")
-    print(f"👤 User ID: {user.get('id')}")
-    
-    issue = db.query(Issue).filter(Issue.id == issue_id).first()
-    if not issue:
-        print(f"❌ Issue not found: {issue_id}")
+async def delete_issue(issue_id: str, db: AsyncSession=Depends(get_db), user: dict = Depends(decode_access_token)):
+    project_id, allowed = await issue_access(db, issue_id, user.get("id"))
+    if not project_id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Issue Not found")
-    
-    print(f"📋 Found issue: {issue.title} in project: {issue.project_id}")
-    
-    project = db.query(Project).filter(Project.id == issue.project_id).first()
-    if not project:
-        print(f"❌ Project not found: {issue.project_id}")
+
+    if allowed is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="There is no project found with this issue.")
 
-    print(f"🏗️ Found project: {project.title}")
-    print(f"👑 Project creator: {project.created_by}")
-    print(f"👥 Project members: {[member.id for member in project.members]}")
-    
-    create_by = project.created_by == user.get("id")
-    is_member = any(member.id == user.get("id") for member in project.members)
-    
-    print(f"✅ Is creator: {create_by}")
-    print(f"✅ Is member: {is_member}")
-    
-    if not (create_by or is_member):
-        print(f"❌ Permission denied for user {user.get('id')}")
+    if not allowed:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You don't have permission to delete this issue. Only project creators and members can delete issues.")
-    
-    print(f"🗑️ Deleting issue: {issue.title}")
-    db.delete(issue)
-    db.commit()
-    print(f"✅ Issue deleted successfully")
+
+    issue = await db.get(Issue, issue_id)
+    if not issue:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Issue Not found")
+
+    await record_issue_changes(db, project_id, [((issue.status, issue.priority), None)])
+    await bump(db, Project.issues_revision, project_id)
+    await delete_issue_rows(db, issue_id)
+    await db.commit()
+    invalidate_issue(issue_id)
+    await publish(project_id, "issue.deleted", {"id": issue_id})
 
     return {"message": "Issue deleted successfully."}
 
 
 
 @issues_route.put("/update/{issue_id}/", status_code=status.HTTP_200_OK, response_model=IssuesOut)
-def update_issue(issue_id: str, up_issue: UpdateIssues, db: Session = Depends(get_db), user: dict = Depends(decode_access_token)):
-    
-    issue = db.query(Issue).filter(Issue.id == issue_id).first()
+async def update_issue(issue_id: str, up_issue: UpdateIssues, db: AsyncSession = Depends(get_db), user: dict = Depends(decode_access_token)):
+    """Update an issue. Reopening an archived issue (any status but closed or
+    resolved) moves it and its comments back out of the archive first."""
 
-    if not issue:
+    project_id, allowed = await issue_access(db, issue_id, user.get("id"), include_archived=True)
+
+    if not project_id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Issue Not found")
-    
-    project = db.query(Project).filter(Project.id == issue.project_id).first()
 
-    if not project:
+    if allowed is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="There is no project found with this issue.")
 
-    create_by = project.created_by == user.get("id")
-    is_member = any(member.id == user.get("id") for member in project.members)
-    if not (create_by or is_member):
+    if not allowed:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="You are not able to see the issue or bug report for this project")
-    
+
+    issue = await db.get(Issue, issue_id)
+
+    if not issue and up_issue.status and up_issue.status not in ARCHIVED_STATUSES:
+        if await restore_issue(db, issue_id):
+            issue = await db.get(Issue, issue_id)
+
+    if not issue:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Issue Not found")
+
 
     updates_fields = up_issue.model_dump(exclude_unset=True)
+    before = (issue.status, issue.priority)
 
     for key, value in updates_fields.items():
         setattr(issue, key, value)
 
+    await record_issue_changes(db, project_id, [(before, (issue.status, issue.priority))])
+    await bump(db, Issue.revision, issue_id)
+    await bump(db, Project.issues_revision, project_id)
+
+    await db.commit()
+    await db.refresh(issue)
+    await publish(project_id, "issue.updated", issue_event(issue))
+
+    return issue
+
+
+# ----------------- bulk create / update ---------------------------------
+
+def _check_bulk_size(items: list):
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=f"At most {BULK_MAX_ITEMS} issues per request.")
+
+
+def _validate_items(items: List[dict], schema) -> tuple[list, List[BulkItemError]]:
+    """Validate each payload on its own so one bad row doesn't fail the batch."""
+    valid, errors = [], []
+    for index, item in enumerate(items):
+        data, error = parse_issue_payload(item, schema)
+        if error:
+            errors.append(BulkItemError(index=index, id=item.get("id") if isinstance(item, dict) else None, detail=error))
+        else:
+            valid.append((index, data))
+    return valid, errors
+
+
+async def _unknown_solvers(db: AsyncSession, items: list) -> set:
+    solver_ids = {data.solver_id for _, data in items if getattr(data, "solver_id", None)}
+    if not solver_ids:
+        return set()
+    found = (await db.scalars(select(User.id).where(User.id.in_(solver_ids)))).all()
+    return solver_ids - set(found)
+
 
-    db.commit()
-    db.refresh(issue)
+@issues_route.post("/bulk_add_issues/{project_id}/", status_code=status.HTTP_200_OK, response_model=BulkIssuesOut)
+async def bulk_create_issues(project_id: str, items: List[dict] = Body(...), db: AsyncSession = Depends(get_db), user: dict = Depends(decode_access_token)):
+    """Create many issues in one transaction; invalid items are reported, not fatal."""
+    _check_bulk_size(items)
+
+    allowed = await can_access_project(db, project_id, user.get("id"))
+
+    if allowed is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project Not found")
+
+    if not allowed:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="You are not able to create the issue or bug report for this project")
+
+    valid, errors = _validate_items(items, IssuesIn)
+
+    issues = []
+    if valid:
+        rows = [
+            {**data.model_dump(exclude_none=True), "reporter_id": user.get("id"), "project_id": project_id}
+            for _, data in valid
+        ]
+        # one multi-row INSERT ... RETURNING
+        issues = (await db.scalars(insert(Issue).returning(Issue, sort_by_parameter_order=True), rows)).all()
+        await record_issue_changes(db, project_id, [(None, (issue.status, issue.priority)) for issue in issues])
+        await bump(db, Project.issues_revision, project_id)
+        await db.commit()
+        # one event per batch; clients refetch the list
+        await publish(project_id, "issues.created", {"count": len(issues), "ids": [issue.id for issue in issues]})
+
+    return {"issues": issues, "errors": errors}
+
+
+@issues_route.put("/bulk_update/{project_id}/", status_code=status.HTTP_200_OK, response_model=BulkIssuesOut)
+async def bulk_update_issues(project_id: str, items: List[dict] = Body(...), db: AsyncSession = Depends(get_db), user: dict = Depends(decode_access_token)):
+    """Update many issues of one project in one transaction."""
+    _check_bulk_size(items)
+
+    allowed = await can_access_project(db, project_id, user.get("id"))
+
+    if allowed is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project Not found")
+
+    if not allowed:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="You are not able to see the issue or bug report for this project")
 
-    return issue
\ No newline at end of file
+    valid, errors = _validate_items(items, BulkUpdateIssues)
+
+    ids = {data.id for _, data in valid}
+    # id -> (status, priority) before the update, for the stats summary
+    existing = {
+        row.id: (row.status, row.priority)
+        for row in await db.execute(select(Issue.id, Issue.status, Issue.priority).where(Issue.id.in_(ids), Issue.project_id == project_id))
+    } if ids else {}
+    unknown_solvers = await _unknown_solvers(db, valid)
+
+    rows, seen = [], set()
+    for index, data in valid:
+        if data.id not in existing:
+            errors.append(BulkItemError(index=index, id=data.id, detail="Issue Not found in this project"))
+        elif data.id in seen:
+            errors.append(BulkItemError(index=index, id=data.id, detail="Issue appears more than once in this batch"))
+        elif data.solver_id in unknown_solvers:
+            errors.append(BulkItemError(index=index, id=data.id, detail=f"User '{data.solver_id}' not found"))
+        else:
+            seen.add(data.id)
+            rows.append(data.model_dump(exclude_unset=True))
+
+    issues = []
+    if rows:
+        # ORM bulk UPDATE by primary key (executemany), then read the rows back once
+        await db.execute(update(Issue), rows)
+        await record_issue_changes(db, project_id, [
+            (existing[row["id"]], (row.get("status", existing[row["id"]][0]), row.get("priority", existing[row["id"]][1])))
+            for row in rows
+        ])
+        await bump(db, Issue.revision, seen)
+        await bump(db, Project.issues_revision, project_id)
+        await db.commit()
+        issues = (await db.scalars(
+            select(Issue).where(Issue.id.in_(seen)).execution_options(populate_existing=True)
+        )).all()
+        await publish(project_id, "issues.updated", {"count": len(issues), "ids": [issue.id for issue in issues]})
+
+    errors.sort(key=lambda error: error.index)
+    return {"issues": issues, "errors": errors}
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from config.db import get_db
+from models.models import Job
+from schemas.jobs import JobOut
+from utility.token_genrater import decode_access_token
+from utility.jobs import get_job
+
+job_route = APIRouter()
+
+
+@job_route.get("/", response_model=List[JobOut], status_code=status.HTTP_200_OK)
+async def show_my_jobs(limit: int = Query(20, ge=1, le=100), db: AsyncSession = Depends(get_db), user: dict = Depends(decode_access_token)):
+    """The caller's most recent background jobs, newest first."""
+    result = await db.scalars(
+        select(Job).where(Job.owner_id == user.get("id")).order_by(Job.id.desc()).limit(limit)
+    )
+    return result.all()
+
+
+@job_route.get("/{job_id}/", response_model=JobOut, status_code=status.HTTP_200_OK)
+async def show_job(job_id: str, db: AsyncSession = Depends(get_db), user: dict = Depends(decode_access_token)):
+    """Status, progress and result of a background job started by the caller."""
+    job = await get_job(db, job_id)
+
+    if job is None or (job.owner_id != user.get("id") and user.get("role") != "admin"):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found.")
+
+    return job
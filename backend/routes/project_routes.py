@@ -1,26 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from models.models import Project, User, Issue
-from schemas.project import ProjectIn, ProjectOut, UpdateProjectIn
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import select, func
+from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.models import Project, User, Issue, project_members
+from schemas.project import ProjectIn, ProjectOut, ProjectSummaryOut, ProjectStatsOut, ActivityOut, UpdateProjectIn
 from schemas.issues import IssuesIn, IssuesOut, UpdateIssues
-from config.db import SessionLocal
+from config.db import get_db
+from config.replicas import get_read_db
 from utility.token_genrater import decode_access_token
-from typing import List
+from utility.project_access import can_access_project, invalidate_member, invalidate_project, user_project_ids
+from utility.issue_stats import issue_counts
+from utility.deletion import delete_project_rows
+from utility.jobs import enqueue
+from utility.events import publish
+from utility.etag import bump, make_etag, not_modified
+from utility.activity import as_utc, recent_activity
+from utility.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, encode_cursor, decode_cursor
+from datetime import datetime, timezone
+from typing import List, Optional
 
 
 project_route = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+
+async def get_project(db: AsyncSession, project_id: str):
+    # members are always serialized through ProjectOut, so load them up front
+    return await db.scalar(
+        select(Project).where(Project.id == project_id).options(selectinload(Project.members))
+    )
 
 # ------------- Project --------------
 
 @project_route.post("/add_project/", response_model=ProjectOut, status_code=status.HTTP_201_CREATED)    
-def create_project(project: ProjectIn, db: Session = Depends(get_db), user: dict = Depends(decode_access_token)):
+async def create_project(project: ProjectIn, db: AsyncSession = Depends(get_db), user: dict = Depends(decode_access_token)):
 
     if user.get("role") not in ["admin", "project_manager"] :
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Your are not able to add a project.")
@@ -28,35 +40,125 @@ def create_project(project: ProjectIn, db: Session = Depends(get_db), user: dict
     create_project = Project(title=project.title, description=project.description, created_by=user.get("id"))
 
     db.add(create_project)
-    db.commit()
-    db.refresh(create_project)
+    await db.commit()
+    await db.refresh(create_project, ["members"])
 
     return create_project
 
 
 @project_route.get("/show_all_project/", response_model=List[ProjectOut], status_code=status.HTTP_200_OK)
-def show_all_projects(db: Session = Depends(get_db), user: dict = Depends(decode_access_token)):
-    # Get projects created by the user
-    created_projects = db.query(Project).filter(Project.created_by == user.get("id")).all()
-    
-    # Get projects where the user is a member
-    user_obj = db.query(User).filter(User.id == user.get("id")).first()
-    member_projects = user_obj.projects if user_obj else []
-    
-    # Combine both lists and remove duplicates
-    all_projects = list({p.id: p for p in created_projects + member_projects}.values())
-
-    if not all_projects:
+async def show_all_projects(db: AsyncSession = Depends(get_read_db), user: dict = Depends(decode_access_token)):
+    # one query for the projects, one selectin query for all of their members
+    projects = (await db.scalars(
+        select(Project)
+        .where(Project.id.in_(user_project_ids(user.get("id"))))
+        .options(selectinload(Project.members))
+        .order_by(Project.created_at, Project.id)
+    )).all()
+
+    if not projects:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="You are not associated with any projects.")
     
-    return all_projects
+    return projects
+
+
+@project_route.get("/show_all_project/summary/", response_model=List[ProjectSummaryOut], status_code=status.HTTP_200_OK)
+async def show_all_projects_summary(db: AsyncSession = Depends(get_read_db), user: dict = Depends(decode_access_token)):
+    """Same projects as show_all_project, with a member count instead of the member list."""
+    member_count = (
+        select(func.count())
+        .where(project_members.c.project_id == Project.id)
+        .correlate(Project)
+        .scalar_subquery()
+    )
+    rows = (await db.execute(
+        select(Project.id, Project.title, Project.description, Project.created_by, Project.created_at, member_count.label("member_count"))
+        .where(Project.id.in_(user_project_ids(user.get("id"))))
+        .order_by(Project.created_at, Project.id)
+    )).mappings().all()
+
+    if not rows:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="You are not associated with any projects.")
+
+    return rows
+
+
+
+@project_route.get("/stats/", response_model=List[ProjectStatsOut], status_code=status.HTTP_200_OK)
+async def project_stats(project_id: Optional[str] = None, db: AsyncSession = Depends(get_read_db), user: dict = Depends(decode_access_token)):
+    """Issue counts by status and priority for one project, or all of the caller's projects."""
+    if project_id:
+        allowed = await can_access_project(db, project_id, user.get("id"))
+
+        if allowed is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project Not found")
+
+        if not allowed:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="You are not able to see the issue or bug report for this project")
+
+        return await issue_counts(db, [project_id])
+
+    return await issue_counts(db, user_project_ids(user.get("id")))
+
+
+@project_route.get("/activity/", response_model=List[ActivityOut], status_code=status.HTTP_200_OK)
+async def project_activity(
+    response: Response,
+    since: datetime,
+    until: Optional[datetime] = None,
+    project_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db),
+    user: dict = Depends(decode_access_token),
+):
+    """Issues and comments created or changed in [since, until), newest first.
+
+    Covers one project, or all of the caller's projects. Naive times are UTC;
+    ``until`` defaults to now. The cursor for the next page is returned in
+    the X-Next-Cursor header.
+    """
+    since, until = as_utc(since), as_utc(until or datetime.now(timezone.utc))
+    if since >= until:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="since must be earlier than until.")
+
+    if project_id:
+        allowed = await can_access_project(db, project_id, user.get("id"))
+
+        if allowed is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project Not found")
+
+        if not allowed:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="You are not able to see the issue or bug report for this project")
+
+        project_ids = [project_id]
+    else:
+        project_ids = user_project_ids(user.get("id"))
+
+    after = decode_cursor(cursor) if cursor else None
+    items = await recent_activity(db, project_ids, since, until, limit + 1, after)
+
+    if len(items) > limit:
+        items = items[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(items[-1]["changed_at"], items[-1]["id"])
+
+    return items
 
 
 
 @project_route.get("/show_project/{project_id}/", response_model=ProjectOut, status_code=status.HTTP_200_OK)
-def show_project(project_id: str, db: Session = Depends(get_db), user: dict = Depends(decode_access_token)):
+async def show_project(project_id: str, request: Request, response: Response, db: AsyncSession = Depends(get_read_db), user: dict = Depends(decode_access_token)):
     
-    project = db.query(Project).filter(Project.id == project_id).first()
+    revision = await db.scalar(select(Project.revision).where(Project.id == project_id))
+
+    if revision is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found.")
+
+    cached = not_modified(request, response, make_etag("project", project_id, revision))
+    if cached:
+        return cached
+
+    project = await get_project(db, project_id)
 
     if not project:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found.")
@@ -67,10 +169,10 @@ def show_project(project_id: str, db: Session = Depends(get_db), user: dict = De
 
 
 @project_route.put("/update_project/{project_id}/", status_code=status.HTTP_200_OK, response_model=ProjectOut)
-def update_project(project_id: str, up_project: UpdateProjectIn, db: Session = Depends(get_db), user: dict = Depends(decode_access_token)):
+async def update_project(project_id: str, up_project: UpdateProjectIn, db: AsyncSession = Depends(get_db), user: dict = Depends(decode_access_token)):
     
     
-    pro = db.query(Project).filter(Project.id == project_id).first()
+    pro = await get_project(db, project_id)
 
     if user.get("role") not in ["admin", "project_manager"] and user.get("id") != pro.created_by:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not able to update project.")
@@ -84,31 +186,42 @@ def update_project(project_id: str, up_project: UpdateProjectIn, db: Session = D
     for key, value in updates_fields.items():
         setattr(pro, key, value)
 
+    await bump(db, Project.revision, project_id)
 
-    db.commit()
-    db.refresh(pro)
+    await db.commit()
+    await db.refresh(pro)
 
     return pro
 
 
 @project_route.delete("/delete_project/{project_id}/", status_code=status.HTTP_200_OK)
-def delete_project(project_id: str, db: Session = Depends(get_db), user: dict = Depends(decode_access_token)):
+async def delete_project(project_id: str, response: Response, background: bool = False, db: AsyncSession = Depends(get_db), user: dict = Depends(decode_access_token)):
+    """Delete a project with its issues, comments and members.
+
+    With ``background=true`` the delete is queued as a job that removes the
+    project in batches; the response is 202 with a handle to poll at
+    /api/jobs/{job_id}/.
+    """
+    pro = (await db.execute(select(Project.created_by).where(Project.id == project_id))).first()
+
+    if pro is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project Not Found")
 
-    pro = db.query(Project).filter(Project.id == project_id).first()
-    
     if user.get("role") not in ["admin", "project_manager"] and user.get("id") != pro.created_by:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not able to delete project.")
-    
 
-    if not pro:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project Not Found")
+    if background:
+        # the job drops cached access and announces the delete when it's done
+        job_id = await enqueue(db, "delete_project", user.get("id"), {"project_id": project_id})
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {"Message": "Project delete queued.", "job_id": job_id, "status_url": f"/api/jobs/{job_id}/"}
 
-    pro.members.clear()
-    db.commit()
-    db.delete(pro)
-    db.commit()
+    deleted = await delete_project_rows(db, project_id)
+    await db.commit()
+    invalidate_project(project_id)
+    await publish(project_id, "project.deleted", {"id": project_id})
 
-    return {"Message": "Project Delete Successfully."}
+    return {"Message": "Project Delete Successfully.", "deleted": deleted}
 
 
 
@@ -116,17 +229,17 @@ def delete_project(project_id: str, db: Session = Depends(get_db), user: dict =
 # --------- Project Members -----------
 
 @project_route.post("/{project_id}/add_member/{user_id}", response_model=ProjectOut, status_code=status.HTTP_200_OK)
-def add_member(project_id: str, user_id: str, db: Session=Depends(get_db), user: dict=Depends(decode_access_token)):
+async def add_member(project_id: str, user_id: str, db: AsyncSession=Depends(get_db), user: dict=Depends(decode_access_token)):
 
     if user.get("role") not in ["admin", "project_manager"]:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not able to add members.")
     
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await get_project(db, project_id)
 
     if not project:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project Not Found.")
     
-    pro_user = db.query(User).filter(User.id == user_id).first()
+    pro_user = await db.get(User, user_id)
 
     if not pro_user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User Not Found.")
@@ -136,23 +249,25 @@ def add_member(project_id: str, user_id: str, db: Session=Depends(get_db), user:
 
 
     project.members.append(pro_user)
-    db.commit()
-    db.refresh(project)
+    await bump(db, Project.revision, project_id)
+    await db.commit()
+    invalidate_member(project_id, user_id)
+    await db.refresh(project, ["members"])
 
     return project
 
 @project_route.delete("/{project_id}/delete_member/{user_id}", response_model=ProjectOut, status_code=status.HTTP_200_OK)
-def delete_member(project_id: str, user_id: str, db: Session=Depends(get_db), user: dict=Depends(decode_access_token)):
+async def delete_member(project_id: str, user_id: str, db: AsyncSession=Depends(get_db), user: dict=Depends(decode_access_token)):
 
     if user.get("role") not in ["admin", "project_manager"]:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not able to delete members.")
     
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await get_project(db, project_id)
 
     if not project:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project Not Found.")
     
-    pro_user = db.query(User).filter(User.id == user_id).first()
+    pro_user = await db.get(User, user_id)
 
     if not pro_user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User Not Found.")
@@ -162,8 +277,12 @@ def delete_member(project_id: str, user_id: str, db: Session=Depends(get_db), us
 
 
     project.members.remove(pro_user)
-    db.commit()
-    db.refresh(project)
+    await bump(db, Project.revision, project_id)
+    await db.commit()
+    invalidate_member(project_id, user_id)
+    # closes the removed member's open event streams
+    await publish(project_id, "member.removed", {"user_id": user_id})
+    await db.refresh(project, ["members"])
 
     return project
 
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from config.replicas import get_read_db
+from schemas.search import SearchHit
+from utility.search import search
+from utility.token_genrater import decode_access_token
+
+search_route = APIRouter()
+
+
+@search_route.get("/", status_code=status.HTTP_200_OK, response_model=List[SearchHit])
+async def search_issues(
+    q: str = Query(..., min_length=1, max_length=200),
+    project_id: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=1000),
+    db: AsyncSession = Depends(get_read_db),
+    user: dict = Depends(decode_access_token),
+):
+    """Full-text search over issue titles/descriptions and comment text.
+
+    Results are ranked and limited to projects the caller created or belongs to.
+    """
+    return await search(db, q, user.get("id"), project_id, limit, offset)
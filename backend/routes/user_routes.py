@@ -1,50 +1,56 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordRequestForm
 from models.models import User, Project, Issue
-from config.db import SessionLocal
+from config.db import get_db
+from config.replicas import get_read_db
 from schemas.users import UserCreate, UserOut, DashboardOut
 from schemas.token import Token
 # from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from utility.token_genrater import create_access_token, decode_access_token
-from utility.hashed_password import hash_password, verify_password
+from utility.hashed_password import hash_password_async, verify_password_async
+from utility.user_search import SEARCH_FIELDS, search_users as search_user_index, clear_user_search_cache
+from config.settings import USER_SEARCH_MAX_ROWS
 from typing import List
 
 user_route = APIRouter()
 
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @user_route.post("/user/register/", response_model=UserOut)
-async def register_user(user: UserCreate, db: Session = Depends(get_db)):
-    if db.query(User).filter(User.username == user.username).first():
+async def register_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
+    if await db.scalar(select(User).where(User.username == user.username)):
         raise HTTPException(status_code=400, detail="This username already exits")
-    if db.query(User).filter(User.email == user.email).first():
+    if await db.scalar(select(User).where(User.email == user.email)):
         raise HTTPException(status_code=400, detail="This email already exits")
     if len(user.hashed_password) < 6 :
         raise HTTPException(status_code=400, detail="This password is too short")
 
 
-    hashed_pwd = hash_password(user.hashed_password)
+    hashed_pwd = await hash_password_async(user.hashed_password)
 
     new_user = User(username=user.username, name=user.name, email=user.email, role=user.role, hashed_password=hashed_pwd)
 
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
+    clear_user_search_cache()
 
     return new_user
 
 @user_route.post("/user/login/", response_model=Token)
-async def login_user(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user =  db.query(User).filter(User.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+async def login_user(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(User).where(User.username == form_data.username))
+    if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid username or password.", headers={"WWW-Authenticate": "Bearer"},)
+
+    valid, new_hash = await verify_password_async(form_data.password, user.hashed_password)
+    if not valid:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid username or password.", headers={"WWW-Authenticate": "Bearer"},)
+
+    if new_hash:
+        # stored hash predates the current bcrypt cost, upgrade it
+        user.hashed_password = new_hash
+        await db.commit()
     
     access_token = create_access_token({"sub":user.username, "id":user.id, "role":user.role})
 
@@ -52,26 +58,23 @@ async def login_user(form_data: OAuth2PasswordRequestForm = Depends(), db: Sessi
 
 
 @user_route.get("/dashboard", status_code=status.HTTP_200_OK, response_model=UserOut)
-async def profile(user: dict = Depends(decode_access_token), db: Session = Depends(get_db)):
+async def profile(user: dict = Depends(decode_access_token), db: AsyncSession = Depends(get_read_db)):
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Error')
 
-    user_info = db.query(User).filter(User.id == user.get("id")).first()
-    if user_info:
-        project_info = db.query(Project).filter(Project.created_by == user_info.id).first()
-    print("This is the value of user_info: ", user_info)
+    user_info = await db.get(User, user.get("id"))
 
     return user_info
 
 @user_route.get("/user/list/", response_model=List[UserOut])
-async def list_users(user: dict = Depends(decode_access_token), db: Session = Depends(get_db)):
+async def list_users(user: dict = Depends(decode_access_token), db: AsyncSession = Depends(get_read_db)):
     """Get list of all users for adding to projects"""
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Error')
     
     # Get all users except the current user
     current_user_id = user.get("id")
-    users = db.query(User).filter(User.id != current_user_id).all()
+    users = (await db.scalars(select(User).where(User.id != current_user_id))).all()
     
     return users
 
@@ -81,42 +84,38 @@ async def search_users(
     username: str = None, 
     email: str = None, 
     id: str = None,
+    limit: int = Query(20, ge=1, le=50),
+    offset: int = Query(0, ge=0),
     user: dict = Depends(decode_access_token), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Search users by various fields"""
+    """Search users by various fields, best matches first.
+
+    Exact username beats username prefix, which beats name/email prefix,
+    which beats substring matches. Results are always paged.
+    """
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Error')
-    
-    # Build query based on provided parameters
-    query = db.query(User)
+
+    if offset + limit > USER_SEARCH_MAX_ROWS:
+        raise HTTPException(status_code=400, detail=f"Results are limited to the top {USER_SEARCH_MAX_ROWS} matches.")
     
     # Exclude current user from results
     current_user_id = user.get("id")
-    query = query.filter(User.id != current_user_id)
     
     if q:
         # General search across name, username, and email
-        search_term = f"%{q}%"
-        query = query.filter(
-            (User.name.ilike(search_term)) |
-            (User.username.ilike(search_term)) |
-            (User.email.ilike(search_term))
-        )
+        return await search_user_index(db, q, SEARCH_FIELDS, current_user_id, limit, offset)
     elif username:
-        query = query.filter(User.username.ilike(f"%{username}%"))
+        return await search_user_index(db, username, ("username",), current_user_id, limit, offset)
     elif email:
-        query = query.filter(User.email.ilike(f"%{email}%"))
+        return await search_user_index(db, email, ("email",), current_user_id, limit, offset)
     elif id:
-        try:
-            user_id = int(id)
-            query = query.filter(User.id == user_id)
-        except ValueError:
-            # If ID is not a valid integer, return empty results
+        if id == current_user_id:
             return []
+        found = await db.get(User, id)
+        return [found] if found else []
     else:
-        # If no search parameters provided, return all users (except current)
-        pass
-    
-    users = query.all()
-    return users
+        # If no search parameters provided, page through all users (except current)
+        query = select(User).where(User.id != current_user_id).order_by(User.username).offset(offset).limit(limit)
+        return (await db.scalars(query)).all()
@@ -1,6 +1,7 @@
-from pydantic import BaseModel
-from typing import Optional, Literal
+from pydantic import BaseModel, ValidationError
+from typing import List, Optional, Literal
 from datetime import datetime
+from models.models import priority_enum, status_enum
 
 
 class IssuesIn(BaseModel):
@@ -20,6 +21,8 @@ class IssuesOut(BaseModel):
     project_id: str
     reporter_id: str
     solver_id: Optional[str]
+    # set on issues read from the archive
+    archived_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -29,4 +32,36 @@ class UpdateIssues(BaseModel):
     description: Optional[str] = None
     priority: Optional[str] = None
     status: Optional[str] = None
-    solver_id: Optional[str] = None
\ No newline at end of file
+    solver_id: Optional[str] = None
+
+class BulkUpdateIssues(UpdateIssues):
+    id: str
+
+class BulkItemError(BaseModel):
+    index: int
+    id: Optional[str] = None
+    detail: str
+
+class BulkIssuesOut(BaseModel):
+    issues: List[IssuesOut]
+    errors: List[BulkItemError]
+
+
+
+def parse_issue_payload(payload, schema=IssuesIn):
+    """Validate one raw issue payload, including the priority/status choices.
+
+    Returns ``(data, None)`` or ``(None, error message)``.
+    """
+    try:
+        data = schema.model_validate(payload)
+    except ValidationError as exc:
+        error = exc.errors()[0]
+        field = ".".join(str(part) for part in error["loc"])
+        return None, f"{field}: {error['msg']}" if field else error["msg"]
+
+    if data.priority is not None and data.priority not in priority_enum.enums:
+        return None, f"Invalid priority '{data.priority}'."
+    if data.status is not None and data.status not in status_enum.enums:
+        return None, f"Invalid status '{data.status}'."
+    return data, None
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 from datetime import datetime
 from .users import UserOut
 
@@ -18,7 +18,36 @@ class ProjectOut(BaseModel):
     class Config:
         from_attributes = True
 
+class ProjectSummaryOut(BaseModel):
+    id: str
+    title: str
+    description: str
+    created_by: str
+    created_at: datetime
+    member_count: int
+
+    class Config:
+        from_attributes = True
+
+class ProjectStatsOut(BaseModel):
+    project_id: str
+    total: int
+    by_status: Dict[str, int]
+    by_priority: Dict[str, int]
+    by_status_priority: Dict[str, Dict[str, int]]
+
 class UpdateProjectIn(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
 
+
+class ActivityOut(BaseModel):
+    kind: Literal["issue", "comment"]
+    action: Literal["created", "updated"]
+    id: str
+    issue_id: str
+    project_id: str
+    title: str
+    status: Optional[str] = None
+    text: Optional[str] = None
+    changed_at: datetime
@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from typing import Literal, Optional
+
+
+class SearchHit(BaseModel):
+    kind: Literal["issue", "comment"]
+    issue_id: str
+    comment_id: Optional[str] = None
+    project_id: str
+    title: str
+    snippet: str
+    rank: float
@@ -0,0 +1,142 @@
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import create_engine, event, insert, inspect, select, update
+from config.db import engine, _sqlite_foreign_keys
+from models.models import Issue, Comment
+from utility.activity import install_timestamps
+from utility.etag import install_revisions
+from utility.search import install_search
+
+# the tables as the original models created them: no timestamp defaults, nullable
+BASELINE_DDL = [
+    "CREATE TABLE users (id VARCHAR NOT NULL, username VARCHAR(50) NOT NULL, name VARCHAR(100) NOT NULL, "
+    "email VARCHAR(100) NOT NULL, role VARCHAR(20) NOT NULL, hashed_password VARCHAR NOT NULL, PRIMARY KEY (id))",
+    "CREATE TABLE projects (id VARCHAR NOT NULL, title VARCHAR(255) NOT NULL, description TEXT NOT NULL, "
+    "created_at DATETIME, created_by VARCHAR, PRIMARY KEY (id), FOREIGN KEY(created_by) REFERENCES users (id))",
+    "CREATE TABLE issues (id VARCHAR NOT NULL, title VARCHAR(255) NOT NULL, description TEXT NOT NULL, "
+    "priority VARCHAR(8), status VARCHAR(11), created_at DATETIME, updated_at DATETIME, project_id VARCHAR, "
+    "reporter_id VARCHAR, solver_id VARCHAR, PRIMARY KEY (id), FOREIGN KEY(project_id) REFERENCES projects (id), "
+    "FOREIGN KEY(reporter_id) REFERENCES users (id), FOREIGN KEY(solver_id) REFERENCES users (id))",
+    "CREATE INDEX ix_issues_status ON issues (status)",
+    "CREATE TABLE comments (id VARCHAR NOT NULL, text TEXT NOT NULL, created_at DATETIME, created_by VARCHAR NOT NULL, "
+    "issue_id VARCHAR NOT NULL, PRIMARY KEY (id), FOREIGN KEY(created_by) REFERENCES users (id), "
+    "FOREIGN KEY(issue_id) REFERENCES issues (id))",
+]
+
+
+def _project(client, headers, title="P"):
+    return client.post("/api/project/add_project/", json={"title": title, "description": "d"}, headers=headers).json()["id"]
+
+
+def _issue(client, headers, project_id, title):
+    return client.post(f"/api/project/issue/add_issue/{project_id}/", json={"title": title, "description": "d"}, headers=headers).json()
+
+
+def test_timestamps_are_set_per_row(client, register):
+    headers, _ = register("alice")
+    project_id = _project(client, headers)
+    first = _issue(client, headers, project_id, "first")
+    time.sleep(0.01)
+    second = _issue(client, headers, project_id, "second")
+
+    assert first["created_at"] < second["created_at"]
+    assert first["updated_at"] == first["created_at"]
+
+    time.sleep(0.01)
+    updated = client.put(f"/api/project/issue/update/{first['id']}/", json={"status": "closed"}, headers=headers).json()
+    assert updated["created_at"] == first["created_at"] and updated["updated_at"] > first["updated_at"]
+
+    # writing a comment bumps the issue's revision counters but isn't an edit of the issue
+    client.post(f"/api/project/issue/comment/{second['id']}/write_comment/", json={"text": "hi"}, headers=headers)
+    assert client.get(f"/api/project/issue/show_issue/{second['id']}/", headers=headers).json()["updated_at"] == second["updated_at"]
+
+
+def test_activity_window_paging_and_access(client, register):
+    headers, _ = register("alice")
+    other_headers, _ = register("bob")
+    project_id = _project(client, headers)
+    hidden_project = _project(client, other_headers, "Q")
+
+    old = _issue(client, headers, project_id, "old")
+    issues = [_issue(client, headers, project_id, f"issue {n}") for n in range(3)]
+    comment = client.post(f"/api/project/issue/comment/{issues[0]['id']}/write_comment/", json={"text": "looks bad"}, headers=headers).json()
+    client.put(f"/api/project/issue/update/{issues[1]['id']}/", json={"status": "in_progress"}, headers=headers)
+    _issue(client, other_headers, hidden_project, "not mine")
+
+    # push one issue out of the window
+    long_ago = datetime.now(timezone.utc) - timedelta(days=2)
+    with engine.begin() as connection:
+        connection.execute(update(Issue).where(Issue.id == old["id"]).values(created_at=long_ago, updated_at=long_ago))
+
+    since = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
+    url = "/api/project/activity/"
+    everything = client.get(url, params={"since": since}, headers=headers).json()
+
+    assert {(item["kind"], item["id"]) for item in everything} == {("issue", issue["id"]) for issue in issues} | {("comment", comment["id"])}
+    assert [item["changed_at"] for item in everything] == sorted((item["changed_at"] for item in everything), reverse=True)
+    assert everything[0]["kind"] == "issue" and everything[0]["action"] == "updated" and everything[0]["status"] == "in_progress"
+    by_id = {item["id"]: item for item in everything}
+    assert by_id[comment["id"]]["issue_id"] == issues[0]["id"] and by_id[comment["id"]]["text"] == "looks bad"
+    assert by_id[issues[2]["id"]]["action"] == "created"
+
+    pages, cursor = [], None
+    while True:
+        response = client.get(url, params={"since": since, "limit": 2, **({"cursor": cursor} if cursor else {})}, headers=headers)
+        pages.append([item["id"] for item in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert [len(page) for page in pages] == [2, 2]
+    assert sum(pages, []) == [item["id"] for item in everything]
+
+    older = client.get(url, params={"since": (long_ago - timedelta(minutes=1)).isoformat(), "until": since}, headers=headers).json()
+    assert [item["id"] for item in older] == [old["id"]]
+
+    assert client.get(url, params={"since": since, "project_id": hidden_project}, headers=headers).status_code == 400
+    assert client.get(url, params={"since": since, "until": since}, headers=headers).status_code == 400
+    assert [item["title"] for item in client.get(url, params={"since": since}, headers=other_headers).json()] == ["not mine"]
+
+
+def test_sqlite_tables_from_before_server_timestamps_are_rebuilt(tmp_path):
+    old_engine = create_engine(f"sqlite:///{tmp_path}/old.db")
+    event.listen(old_engine, "connect", _sqlite_foreign_keys)
+    created = datetime(2024, 1, 1)
+    with old_engine.begin() as connection:
+        for statement in BASELINE_DDL:
+            connection.exec_driver_sql(statement)
+        connection.exec_driver_sql("INSERT INTO users VALUES ('u1', 'alice', 'alice', 'a@example.com', 'admin', 'x')")
+        connection.exec_driver_sql("INSERT INTO projects VALUES ('p1', 'P', 'd', ?, 'u1')", (created,))
+        connection.exec_driver_sql(
+            "INSERT INTO issues VALUES ('i1', 'old needle', 'd', 'low', 'open', ?, ?, 'p1', 'u1', NULL)", (created, created)
+        )
+        connection.exec_driver_sql("INSERT INTO comments VALUES ('c1', 'old comment', ?, 'u1', 'i1')", (created,))
+    # a database that already had search: its triggers hang off the old tables
+    install_revisions(old_engine)
+    install_search(old_engine)
+
+    install_timestamps(old_engine)
+    install_timestamps(old_engine)
+
+    with old_engine.begin() as connection:
+        inspector = inspect(connection)
+        issue_columns = {column["name"]: column for column in inspector.get_columns("issues")}
+        assert issue_columns["created_at"]["default"] is not None and not issue_columns["created_at"]["nullable"]
+        assert {"ix_issues_status", "ix_issues_project_created_id"} <= {index["name"] for index in inspector.get_indexes("issues")}
+
+        connection.execute(insert(Issue.__table__).values(
+            id="i2", title="new needle", description="d", project_id="p1", reporter_id="u1",
+        ))
+        connection.execute(insert(Comment.__table__).values(id="c2", text="new comment", created_by="u1", issue_id="i1"))
+
+        issues = {row.id: row for row in connection.execute(select(Issue.__table__))}
+        assert issues["i1"].created_at == created and issues["i1"].revision == 0
+        assert issues["i2"].created_at is not None and issues["i2"].updated_at == issues["i2"].created_at
+        assert all(row.created_at is not None for row in connection.execute(select(Comment.__table__)))
+        assert connection.exec_driver_sql("PRAGMA foreign_key_check").all() == []
+
+        # the FTS triggers and rowids survived the rebuild
+        matches = connection.exec_driver_sql(
+            "SELECT issues.id FROM issues_fts JOIN issues ON issues.rowid = issues_fts.rowid WHERE issues_fts MATCH 'needle'"
+        ).scalars().all()
+        assert sorted(matches) == ["i1", "i2"]
+    old_engine.dispose()
@@ -0,0 +1,126 @@
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import event, func, select, update
+from config.db import engine
+from models.models import ArchivedComment, ArchivedIssue, Issue
+from utility import issue_stats
+from utility.archive import archive_issues
+
+
+def _project(client, headers):
+    return client.post("/api/project/add_project/", json={"title": "P", "description": "d"}, headers=headers).json()["id"]
+
+
+def _issue(client, headers, project_id, title, status="open"):
+    return client.post(f"/api/project/issue/add_issue/{project_id}/", json={"title": title, "description": "d", "status": status}, headers=headers).json()
+
+
+def _age(issue_ids, days):
+    old = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=days)
+    with engine.begin() as connection:
+        connection.execute(update(Issue).where(Issue.id.in_(issue_ids)).values(updated_at=old))
+
+
+def _archived_counts():
+    with engine.connect() as connection:
+        return tuple(connection.scalar(select(func.count()).select_from(model)) for model in (ArchivedIssue, ArchivedComment))
+
+
+def test_archive_reads_and_restore_on_reopen(client, register):
+    headers, _ = register("alice")
+    project_id = _project(client, headers)
+    closed = _issue(client, headers, project_id, "closed", "closed")
+    resolved = _issue(client, headers, project_id, "resolved", "resolved")
+    recent = _issue(client, headers, project_id, "recently closed", "closed")
+    live = _issue(client, headers, project_id, "open")
+    for text in ("a", "b"):
+        client.post(f"/api/project/issue/comment/{closed['id']}/write_comment/", json={"text": text}, headers=headers)
+    _age([closed["id"], resolved["id"], recent["id"]], 40)
+    _age([recent["id"]], 5)
+
+    listing = f"/api/project/issue/show_all_issues_in_project/{project_id}/"
+    etag = client.get(listing, headers=headers).headers["ETag"]
+    assert archive_issues(older_than_days=30, batch_size=1) == {"issues": 2, "comments": 2}
+    assert _archived_counts() == (2, 2)
+
+    # archived issues leave the live reads and the stats...
+    assert client.get(listing, headers={**headers, "If-None-Match": etag}).status_code == 200
+    assert [issue["id"] for issue in client.get(listing, headers=headers).json()] == [recent["id"], live["id"]]
+    assert client.get(f"/api/project/stats/?project_id={project_id}", headers=headers).json()[0]["total"] == 2
+    assert client.get(f"/api/project/issue/show_issue/{closed['id']}/", headers=headers).status_code == 404
+    assert client.post(f"/api/project/issue/comment/{closed['id']}/write_comment/", json={"text": "c"}, headers=headers).status_code == 404
+
+    # ...and come back on request, in order, across pages
+    merged, cursor = [], None
+    while True:
+        response = client.get(listing, params={"include_archived": True, "limit": 3, **({"cursor": cursor} if cursor else {})}, headers=headers)
+        merged += response.json()
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert [issue["id"] for issue in merged] == [closed["id"], resolved["id"], recent["id"], live["id"]]
+    assert [issue["archived_at"] is not None for issue in merged] == [True, True, False, False]
+    archived = client.get(f"/api/project/issue/show_issue/{closed['id']}/", params={"include_archived": True}, headers=headers).json()
+    assert archived["status"] == "closed" and archived["archived_at"]
+    thread = client.get(f"/api/project/issue/comment/{closed['id']}/show_comment/", params={"include_archived": True}, headers=headers)
+    assert [comment["text"] for comment in thread.json()] == ["a", "b"] and thread.headers["X-Total-Count"] == "2"
+
+    # editing without reopening doesn't find it; reopening restores it with its comments
+    update_url = f"/api/project/issue/update/{closed['id']}/"
+    assert client.put(update_url, json={"title": "x"}, headers=headers).status_code == 404
+    time.sleep(0.01)
+    reopened = client.put(update_url, json={"status": "open"}, headers=headers)
+    assert reopened.status_code == 200 and reopened.json()["status"] == "open" and reopened.json()["archived_at"] is None
+    assert _archived_counts() == (1, 0)
+    assert len(client.get(f"/api/project/issue/comment/{closed['id']}/show_comment/", headers=headers).json()) == 2
+    assert client.get(f"/api/project/stats/?project_id={project_id}", headers=headers).json()[0]["total"] == 3
+
+
+def test_archive_job_and_project_delete(client, register):
+    headers, _ = register("alice")
+    dev_headers, _ = register("bob", role="developer")
+    project_id = _project(client, headers)
+    issue = _issue(client, headers, project_id, "closed", "closed")
+    client.post(f"/api/project/issue/comment/{issue['id']}/write_comment/", json={"text": "a"}, headers=headers)
+    _age([issue["id"]], 100)
+
+    assert client.post("/internal/archive/", headers=dev_headers).status_code == 403
+    response = client.post("/internal/archive/", params={"older_than_days": 30}, headers=headers)
+    assert response.status_code == 202
+    for _ in range(200):
+        job = client.get(response.json()["status_url"], headers=headers).json()
+        if job["status"] not in ("queued", "running"):
+            break
+        time.sleep(0.02)
+    assert job["status"] == "succeeded" and job["result"] == {"issues": 1, "comments": 1}
+
+    assert client.delete(f"/api/project/delete_project/{project_id}/", headers=headers).status_code == 200
+    assert _archived_counts() == (0, 0)
+
+
+def test_issue_reopened_during_the_move_stays_live(client, register, monkeypatch):
+    # the summary table is where a stale batch would leave wrong counts
+    monkeypatch.setattr(issue_stats, "ISSUE_STATS_TABLE", True)
+    headers, _ = register("alice")
+    project_id = _project(client, headers)
+    reopened, archived = (_issue(client, headers, project_id, title, "closed") for title in ("reopened", "archived"))
+    _age([reopened["id"], archived["id"]], 100)
+    reopen = []
+
+    # runs after the batch is picked, before anything is copied
+    @event.listens_for(engine, "before_cursor_execute")
+    def reopen_first(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO issues_archive") and not reopen:
+            reopen.append(client.put(f"/api/project/issue/update/{reopened['id']}/", json={"status": "open"}, headers=headers))
+
+    try:
+        assert archive_issues(older_than_days=30) == {"issues": 1, "comments": 0}
+    finally:
+        event.remove(engine, "before_cursor_execute", reopen_first)
+
+    assert reopen[0].status_code == 200
+    assert _archived_counts() == (1, 0)
+    listing = client.get(f"/api/project/issue/show_all_issues_in_project/{project_id}/", headers=headers).json()
+    assert [(issue["id"], issue["status"]) for issue in listing] == [(reopened["id"], "open")]
+    stats = client.get(f"/api/project/stats/?project_id={project_id}", headers=headers).json()[0]
+    assert stats["total"] == 1 and stats["by_status"]["open"] == 1 and stats["by_status"]["closed"] == 0
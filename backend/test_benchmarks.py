@@ -0,0 +1,27 @@
+import asyncio
+from benchmarks.driver import percentile
+from benchmarks.run import compare, run
+from benchmarks.seed import plan, seed
+
+
+def test_percentile_uses_nearest_rank():
+    ordered = [float(value) for value in range(1, 101)]
+
+    assert (percentile(ordered, 50), percentile(ordered, 95), percentile(ordered, 99)) == (50.0, 95.0, 99.0)
+    assert percentile([], 99) == 0.0
+
+
+def test_small_benchmark_run_reports_every_selected_route():
+    timings = seed(300, batch_size=100, reset=True)
+    assert {name: table["rows"] for name, table in timings.items()}["issues"] == plan(300)["issues"]
+
+    report = asyncio.run(run(requests=4, concurrency=2, warmup=1, patterns=["project:show", "issue:show", "comment:"]))
+
+    routes = report["routes"]
+    assert set(routes) == {
+        "project:show_all_project", "project:show_all_project_summary", "project:show_project",
+        "issue:show_all_issues_in_project", "issue:show_issue",
+        "comment:write_comment", "comment:show_comment", "comment:delete_comment",
+    }
+    assert all(summary["requests"] == 4 and summary["errors"] == 0 for summary in routes.values())
+    assert compare(report, report)["issue:show_issue"]["p50_ms"] == 0.0
@@ -0,0 +1,39 @@
+def _project(client, headers):
+    return client.post("/api/project/add_project/", json={"title": "P", "description": "d"}, headers=headers).json()["id"]
+
+
+def test_bulk_create_reports_bad_items_and_keeps_the_rest(client, register):
+    headers, _ = register("alice")
+    project_id = _project(client, headers)
+
+    response = client.post(f"/api/project/issue/bulk_add_issues/{project_id}/", json=[
+        {"title": "a", "description": "x", "priority": "high"},
+        {"description": "missing title"},
+        {"title": "c", "description": "x", "status": "bogus"},
+        {"title": "d", "description": "x"},
+    ], headers=headers)
+
+    body = response.json()
+    assert response.status_code == 200
+    assert [issue["title"] for issue in body["issues"]] == ["a", "d"]
+    assert body["issues"][1]["priority"] == "low"
+    assert [error["index"] for error in body["errors"]] == [1, 2]
+
+
+def test_bulk_update_only_touches_issues_of_the_project(client, register):
+    headers, user_id = register("alice")
+    project_id, other_id = _project(client, headers), _project(client, headers)
+    created = client.post(f"/api/project/issue/bulk_add_issues/{project_id}/", json=[
+        {"title": "a", "description": "x"}, {"title": "b", "description": "x"},
+    ], headers=headers).json()["issues"]
+    foreign = client.post(f"/api/project/issue/add_issue/{other_id}/", json={"title": "z", "description": "x"}, headers=headers).json()
+
+    response = client.put(f"/api/project/issue/bulk_update/{project_id}/", json=[
+        {"id": created[0]["id"], "status": "resolved", "solver_id": user_id},
+        {"id": created[1]["id"], "solver_id": "nobody"},
+        {"id": foreign["id"], "status": "closed"},
+    ], headers=headers)
+
+    body = response.json()
+    assert [(issue["id"], issue["status"], issue["solver_id"]) for issue in body["issues"]] == [(created[0]["id"], "resolved", user_id)]
+    assert [error["index"] for error in body["errors"]] == [1, 2]
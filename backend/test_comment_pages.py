@@ -0,0 +1,52 @@
+import json
+
+
+def _thread(client, register, count):
+    headers, _ = register("alice")
+    project_id = client.post("/api/project/add_project/", json={"title": "P", "description": "d"}, headers=headers).json()["id"]
+    issue_id = client.post(f"/api/project/issue/add_issue/{project_id}/", json={"title": "t", "description": "d"}, headers=headers).json()["id"]
+    ids = [
+        client.post(f"/api/project/issue/comment/{issue_id}/write_comment/", json={"text": f"c{n}"}, headers=headers).json()["id"]
+        for n in range(count)
+    ]
+    return headers, f"/api/project/issue/comment/{issue_id}/show_comment/", ids
+
+
+def _walk(client, url, headers, **params):
+    seen, cursor = [], None
+    while True:
+        response = client.get(url, params={**params, **({"cursor": cursor} if cursor else {})}, headers=headers)
+        assert response.headers["X-Total-Count"] == "7"
+        seen.append([comment["id"] for comment in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return seen
+
+
+def test_comment_pages_both_orders(client, register):
+    headers, url, ids = _thread(client, register, 7)
+
+    oldest = _walk(client, url, headers, limit=3)
+    newest = _walk(client, url, headers, limit=3, order="newest")
+
+    assert [len(page) for page in oldest] == [3, 3, 1]
+    assert sum(oldest, []) == ids
+    assert sum(newest, []) == ids[::-1]
+
+    # an empty thread is an empty page, not a 404
+    _, empty_url, _ = _thread(client, register, 0)
+    response = client.get(empty_url, headers=headers)
+    assert response.status_code == 200 and response.json() == [] and response.headers["X-Total-Count"] == "0"
+
+
+def test_comment_thread_ndjson_stream(client, register):
+    headers, url, ids = _thread(client, register, 7)
+    cursor = client.get(url, params={"limit": 2}, headers=headers).headers["X-Next-Cursor"]
+
+    response = client.get(url, params={"format": "ndjson", "cursor": cursor}, headers=headers)
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert response.headers["X-Total-Count"] == "7"
+    assert [line["id"] for line in lines] == ids[2:]
+    assert lines[0]["text"] == "c2" and lines[0]["issue_id"] and lines[0]["created_at"]
@@ -0,0 +1,95 @@
+import time
+from sqlalchemy import event, func, select, delete
+from config.db import engine, async_engine
+from models.models import Project, Issue, Comment, project_members
+from utility.deletion import delete_project_in_batches
+
+
+def _counts():
+    with engine.connect() as connection:
+        return {
+            table.name: connection.scalar(select(func.count()).select_from(table))
+            for table in (Project.__table__, Issue.__table__, Comment.__table__, project_members)
+        }
+
+
+def _project_with_issues(client, headers, member_id, issues: int):
+    project_id = client.post("/api/project/add_project/", json={"title": "P", "description": "d"}, headers=headers).json()["id"]
+    client.post(f"/api/project/{project_id}/add_member/{member_id}", headers=headers)
+    created = client.post(f"/api/project/issue/bulk_add_issues/{project_id}/", json=[
+        {"title": f"t{n}", "description": "d"} for n in range(issues)
+    ], headers=headers).json()["issues"]
+    for issue in created[:3]:
+        client.post(f"/api/project/issue/comment/{issue['id']}/write_comment/", json={"text": "c"}, headers=headers)
+    return project_id, [issue["id"] for issue in created]
+
+
+def test_delete_project_is_set_based(client, register):
+    headers, _ = register("alice")
+    _, dev_id = register("bob", role="developer")
+    kept_id, _ = _project_with_issues(client, headers, dev_id, 2)
+    before = _counts()
+
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engines = [engine] + ([async_engine.sync_engine] if async_engine is not None else [])
+    for target in engines:
+        event.listen(target, "before_cursor_execute", count)
+    try:
+        sizes = []
+        for issues in (5, 50):
+            project_id, _ = _project_with_issues(client, headers, dev_id, issues)
+            statements.clear()
+            response = client.delete(f"/api/project/delete_project/{project_id}/", headers=headers)
+            sizes.append(len(statements))
+            assert response.status_code == 200
+            assert response.json()["deleted"] == {"comments": 3, "issues": issues, "members": 1, "stats": 0, "projects": 1}
+    finally:
+        for target in engines:
+            event.remove(target, "before_cursor_execute", count)
+
+    # the same handful of statements for 5 or 50 issues: nothing is loaded row by row
+    assert sizes[0] == sizes[1]
+    assert _counts() == before
+    assert client.get(f"/api/project/show_project/{kept_id}/", headers=headers).status_code == 200
+    assert client.delete("/api/project/delete_project/missing/", headers=headers).status_code == 404
+
+    # the foreign keys cascade on their own too
+    with engine.begin() as connection:
+        connection.execute(delete(Project).where(Project.id == kept_id))
+    assert _counts() == {"projects": 0, "issues": 0, "comments": 0, "project_members": 0}
+
+
+def test_background_project_delete_job(client, register):
+    headers, _ = register("alice")
+    other_headers, dev_id = register("bob", role="developer")
+    project_id, _ = _project_with_issues(client, headers, dev_id, 7)
+
+    progress = []
+    batched_id, _ = _project_with_issues(client, headers, dev_id, 7)
+    # a member's cached access must not outlive the project
+    member_issues_url = f"/api/project/issue/show_all_issues_in_project/{batched_id}/"
+    assert client.get(member_issues_url, headers=other_headers).status_code == 200
+    assert delete_project_in_batches(batched_id, batch_size=3, on_progress=progress.append) == {
+        "comments": 3, "issues": 7, "members": 1, "stats": 0, "projects": 1,
+    }
+    assert [step["issues"] for step in progress] == [3, 6, 7]
+    assert client.get(member_issues_url, headers=other_headers).status_code == 404
+
+    response = client.delete(f"/api/project/delete_project/{project_id}/", params={"background": True}, headers=headers)
+    assert response.status_code == 202
+    job_url = response.json()["status_url"]
+
+    for _ in range(100):
+        job = client.get(job_url, headers=headers).json()
+        if job["status"] not in ("queued", "running"):
+            break
+        time.sleep(0.05)
+
+    assert job["status"] == "succeeded" and job["kind"] == "delete_project"
+    assert job["result"]["issues"] == 7 and job["result"]["projects"] == 1
+    assert client.get(f"/api/project/show_project/{project_id}/", headers=headers).status_code == 404
+    assert client.get(job_url, headers=other_headers).status_code == 404
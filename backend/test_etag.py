@@ -0,0 +1,61 @@
+def _get(client, url, headers, etag=None):
+    return client.get(url, headers={**headers, **({"If-None-Match": etag} if etag else {})})
+
+
+def test_issue_etag_changes_only_on_write(client, register):
+    headers, _ = register("alice")
+    project_id = client.post("/api/project/add_project/", json={"title": "P", "description": "d"}, headers=headers).json()["id"]
+    issue_id = client.post(f"/api/project/issue/add_issue/{project_id}/", json={"title": "t", "description": "d"}, headers=headers).json()["id"]
+    url = f"/api/project/issue/show_issue/{issue_id}/"
+
+    first = _get(client, url, headers)
+    etag = first.headers["ETag"]
+    cached = _get(client, url, headers, etag)
+
+    assert cached.status_code == 304 and cached.content == b"" and cached.headers["ETag"] == etag
+    assert _get(client, url, headers, f"W/{etag}").status_code == 304
+
+    client.put(f"/api/project/issue/update/{issue_id}/", json={"status": "closed"}, headers=headers)
+    changed = _get(client, url, headers, etag)
+
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+    assert changed.json()["status"] == "closed"
+
+
+def test_list_etags_follow_issue_comment_and_member_writes(client, register):
+    headers, _ = register("alice")
+    _, dev_id = register("bob", role="developer")
+    project_id = client.post("/api/project/add_project/", json={"title": "P", "description": "d"}, headers=headers).json()["id"]
+    issue_id = client.post(f"/api/project/issue/add_issue/{project_id}/", json={"title": "t", "description": "d"}, headers=headers).json()["id"]
+    client.post(f"/api/project/issue/comment/{issue_id}/write_comment/", json={"text": "first"}, headers=headers)
+
+    urls = {
+        "project": f"/api/project/show_project/{project_id}/",
+        "issues": f"/api/project/issue/show_all_issues_in_project/{project_id}/",
+        "comments": f"/api/project/issue/comment/{issue_id}/show_comment/",
+    }
+    etags = {name: _get(client, url, headers).headers["ETag"] for name, url in urls.items()}
+
+    def changed():
+        return {name for name, url in urls.items() if _get(client, url, headers, etags[name]).status_code == 200}
+
+    assert changed() == set()
+
+    client.post(f"/api/project/issue/comment/{issue_id}/write_comment/", json={"text": "second"}, headers=headers)
+    assert changed() == {"comments"}
+
+    client.post(f"/api/project/issue/add_issue/{project_id}/", json={"title": "u", "description": "d"}, headers=headers)
+    assert changed() == {"comments", "issues"}
+
+    client.post(f"/api/project/{project_id}/add_member/{dev_id}", headers=headers)
+    assert changed() == {"comments", "issues", "project"}
+
+
+def test_not_modified_still_checks_access(client, register):
+    admin, _ = register("alice")
+    outsider, _ = register("bob", role="developer")
+    project_id = client.post("/api/project/add_project/", json={"title": "P", "description": "d"}, headers=admin).json()["id"]
+    url = f"/api/project/issue/show_all_issues_in_project/{project_id}/"
+    etag = _get(client, url, admin).headers["ETag"]
+
+    assert _get(client, url, outsider, etag).status_code == 400
@@ -0,0 +1,120 @@
+import asyncio
+import json
+from utility.events import Broker, broker
+
+
+def test_slow_subscriber_is_dropped_without_blocking_others():
+    async def scenario():
+        local = Broker(queue_size=2)
+        slow, fast = local.subscribe("p1"), local.subscribe("p1")
+        other = local.subscribe("p2")
+
+        for n in range(3):
+            local.deliver({"type": "issue.created", "project_id": "p1", "id": str(n)})
+            await fast.queue.get()
+
+        assert slow.dropped and slow.queue.get_nowait() is None and slow.queue.empty()
+        assert not fast.dropped and other.queue.empty()
+        assert local.stats() == {"projects": 2, "subscribers": 2, "delivered": 5, "dropped_subscribers": 1}
+
+    asyncio.run(scenario())
+
+
+async def _open_stream(app, url: str, headers: dict):
+    """Drive a streaming GET by hand; TestClient would wait for the body to end."""
+    chunks, disconnected = asyncio.Queue(), asyncio.Event()
+
+    async def receive():
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            await chunks.put(message["status"])
+        elif message.get("body"):
+            await chunks.put(message["body"].decode())
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": url, "raw_path": url.encode(), "root_path": "", "query_string": b"",
+        "headers": [(key.lower().encode(), value.encode()) for key, value in headers.items()],
+        "server": ("testserver", 80), "client": ("testclient", 50000),
+    }
+    task = asyncio.create_task(app(scope, receive, send))
+    return chunks, disconnected, task
+
+
+def test_project_stream_receives_issue_and_comment_events(client, register):
+    headers, _ = register("alice")
+    project_id = client.post("/api/project/add_project/", json={"title": "P", "description": "d"}, headers=headers).json()["id"]
+    # warms the access cache, so the stream's own check doesn't need the database
+    client.get(f"/api/project/issue/show_all_issues_in_project/{project_id}/", headers=headers)
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        chunks, disconnected, task = await _open_stream(client.app, f"/api/project/events/{project_id}/", headers)
+        assert await chunks.get() == 200
+        assert (await chunks.get()).startswith("retry:")
+
+        def write():
+            issue = client.post(f"/api/project/issue/add_issue/{project_id}/", json={"title": "t", "description": "d"}, headers=headers).json()
+            client.put(f"/api/project/issue/update/{issue['id']}/", json={"status": "closed"}, headers=headers)
+            client.post(f"/api/project/issue/comment/{issue['id']}/write_comment/", json={"text": "hi"}, headers=headers)
+            return issue
+
+        issue = await loop.run_in_executor(None, write)
+        events = []
+        while len(events) < 3:
+            chunk = await asyncio.wait_for(chunks.get(), 5)
+            name, data = chunk.strip().split("\n")
+            events.append((name.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+
+        disconnected.set()
+        await asyncio.wait_for(task, 5)
+        return issue, events
+
+    issue, events = asyncio.run(scenario())
+
+    assert [name for name, _ in events] == ["issue.created", "issue.updated", "comment.created"]
+    assert events[0][1]["id"] == issue["id"] and events[0][1]["project_id"] == project_id
+    assert events[1][1]["status"] == "closed"
+    assert events[2][1]["issue_id"] == issue["id"] and events[2][1]["text"] == "hi"
+    assert broker.stats()["subscribers"] == 0
+
+    other_headers, _ = register("bob")
+    assert client.get(f"/api/project/events/{project_id}/", headers=other_headers).status_code == 400
+
+
+def test_streams_end_when_access_is_revoked(client, register):
+    admin, _ = register("alice")
+    dev, dev_id = register("bob", role="developer")
+    project_id = client.post("/api/project/add_project/", json={"title": "P", "description": "d"}, headers=admin).json()["id"]
+    client.post(f"/api/project/{project_id}/add_member/{dev_id}", headers=admin)
+    for headers in (admin, dev):
+        client.get(f"/api/project/issue/show_all_issues_in_project/{project_id}/", headers=headers)
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        streams = {}
+        for name, headers in (("alice", admin), ("bob", dev)):
+            chunks, _, task = await _open_stream(client.app, f"/api/project/events/{project_id}/", headers)
+            assert await chunks.get() == 200
+            assert (await chunks.get()).startswith("retry:")
+            streams[name] = (chunks, task)
+
+        await loop.run_in_executor(None, lambda: client.delete(f"/api/project/{project_id}/delete_member/{dev_id}", headers=admin))
+        chunks, task = streams["bob"]
+        assert (await asyncio.wait_for(chunks.get(), 5)).startswith("event: member.removed")
+        await asyncio.wait_for(task, 5)
+
+        # the creator's stream outlives the member removal, but not the project
+        chunks, task = streams["alice"]
+        assert (await asyncio.wait_for(chunks.get(), 5)).startswith("event: member.removed")
+        assert not task.done()
+        await loop.run_in_executor(None, lambda: client.delete(f"/api/project/delete_project/{project_id}/", headers=admin))
+        assert (await asyncio.wait_for(chunks.get(), 5)).startswith("event: project.deleted")
+        await asyncio.wait_for(task, 5)
+
+    asyncio.run(scenario())
+
+    assert broker.stats()["subscribers"] == 0
@@ -0,0 +1,122 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import update
+from config.db import engine
+from models.models import Issue
+from routes import export_routes
+
+
+def _project(client, headers, title="P"):
+    return client.post("/api/project/add_project/", json={"title": title, "description": "d"}, headers=headers).json()["id"]
+
+
+def _issues(client, headers, project_id, items):
+    return client.post(f"/api/project/issue/bulk_add_issues/{project_id}/", json=items, headers=headers).json()["issues"]
+
+
+def _ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_ndjson_export_with_comments(client, register):
+    headers, _ = register("alice")
+    project_id = _project(client, headers)
+    first, second = _issues(client, headers, project_id, [
+        {"title": "a", "description": "x"}, {"title": "b", "description": "y", "priority": "high"},
+    ])
+    client.post(f"/api/project/issue/comment/{first['id']}/write_comment/", json={"text": "hi"}, headers=headers)
+
+    plain = client.get(f"/api/project/export/{project_id}/", headers=headers)
+    assert plain.status_code == 200
+    assert plain.headers["content-type"] == "application/x-ndjson"
+    assert plain.headers["content-disposition"] == f'attachment; filename="project-{project_id}-issues.ndjson"'
+    records = _ndjson(plain)
+    assert [(record["id"], record["title"], record["priority"]) for record in records] == [
+        (first["id"], "a", "low"), (second["id"], "b", "high"),
+    ]
+    assert "comments" not in records[0]
+
+    records = _ndjson(client.get(f"/api/project/export/{project_id}/?include_comments=true", headers=headers))
+    assert [comment["text"] for comment in records[0]["comments"]] == ["hi"]
+    assert records[1]["comments"] == []
+
+
+def test_csv_export_with_comments(client, register):
+    headers, _ = register("alice")
+    project_id = _project(client, headers)
+    issue, = _issues(client, headers, project_id, [{"title": "a, with comma", "description": "line\nbreak"}])
+    client.post(f"/api/project/issue/comment/{issue['id']}/write_comment/", json={"text": "hi"}, headers=headers)
+
+    response = client.get(f"/api/project/export/{project_id}/?format=csv&include_comments=true", headers=headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [(row["id"], row["title"], row["description"]) for row in rows] == [(issue["id"], "a, with comma", "line\nbreak")]
+    assert [comment["text"] for comment in json.loads(rows[0]["comments"])] == ["hi"]
+    assert list(rows[0])[-1] == "comments"
+
+
+def test_export_filters_by_status_and_created_window(client, register):
+    headers, _ = register("alice")
+    project_id = _project(client, headers)
+    old, recent, closed = _issues(client, headers, project_id, [
+        {"title": "old", "description": "x"},
+        {"title": "recent", "description": "x"},
+        {"title": "closed", "description": "x", "status": "closed"},
+    ])
+    long_ago = datetime.now(timezone.utc) - timedelta(days=10)
+    with engine.begin() as connection:
+        connection.execute(update(Issue).where(Issue.id == old["id"]).values(created_at=long_ago))
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+
+    def titles(query):
+        response = client.get(f"/api/project/export/{project_id}/", params=query, headers=headers)
+        assert response.status_code == 200
+        return [record["title"] for record in _ndjson(response)]
+
+    assert titles({"status": "closed"}) == ["closed"]
+    assert titles({"status": ["open", "closed"]}) == ["old", "recent", "closed"]
+    assert titles({"since": cutoff}) == ["recent", "closed"]
+    assert titles({"until": cutoff}) == ["old"]
+    assert titles({"since": cutoff, "status": "open"}) == ["recent"]
+
+    response = client.get(f"/api/project/export/{project_id}/?status=bogus", headers=headers)
+    assert response.status_code == 400
+
+
+def test_export_streams_in_partitions(client, register, monkeypatch):
+    headers, _ = register("alice")
+    project_id = _project(client, headers)
+    issues = _issues(client, headers, project_id, [{"title": f"issue {n}", "description": "x"} for n in range(5)])
+    for issue in issues:
+        client.post(f"/api/project/issue/comment/{issue['id']}/write_comment/", json={"text": issue["title"]}, headers=headers)
+
+    partitions = []
+    stream_partitions = export_routes.stream_partitions
+
+    async def recording(db, statement, size):
+        async for rows in stream_partitions(db, statement, size):
+            partitions.append(len(rows))
+            yield rows
+
+    monkeypatch.setattr(export_routes, "EXPORT_CHUNK_SIZE", 2)
+    monkeypatch.setattr(export_routes, "stream_partitions", recording)
+
+    records = _ndjson(client.get(f"/api/project/export/{project_id}/?include_comments=true", headers=headers))
+
+    assert partitions == [2, 2, 1]
+    assert [record["id"] for record in records] == [issue["id"] for issue in issues]
+    assert all([comment["text"] for comment in record["comments"]] == [record["title"]] for record in records)
+
+
+def test_export_access(client, register):
+    headers, _ = register("alice")
+    outsider, _ = register("bob")
+    project_id = _project(client, headers)
+
+    assert client.get("/api/project/export/missing/", headers=headers).status_code == 404
+    assert client.get(f"/api/project/export/{project_id}/", headers=outsider).status_code == 400
+    assert client.get(f"/api/project/export/{project_id}/").status_code == 401
@@ -0,0 +1,79 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from passlib.context import CryptContext
+from sqlalchemy import select
+from config.db import engine
+from config.settings import PASSWORD_HASH_MAX_PENDING
+from models.models import User
+from utility import hashed_password
+from utility.hashed_password import hash_password_async, hashing_stats, verify_password_async
+
+
+@pytest.fixture()
+def threadpool_hashing(monkeypatch):
+    # keep hashing in this process so a patched CryptContext is the one used
+    monkeypatch.setattr(hashed_password, "_get_pool", lambda: None)
+
+
+def _count(operation: str) -> int:
+    return hashing_stats()["operations"].get(operation, {}).get("count", 0)
+
+
+def test_saturated_hashing_fails_fast_with_503(monkeypatch):
+    monkeypatch.setattr(hashed_password, "_pending", PASSWORD_HASH_MAX_PENDING)
+    rejected = _count("hash_rejected")
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(hash_password_async("secret123"))
+
+    assert exc.value.status_code == 503
+    assert exc.value.headers == {"Retry-After": "1"}
+    assert _count("hash_rejected") == rejected + 1
+    assert hashing_stats()["pending"] == PASSWORD_HASH_MAX_PENDING
+
+
+def test_saturated_login_returns_503(client, register, monkeypatch):
+    register("alice")
+    monkeypatch.setattr(hashed_password, "_pending", PASSWORD_HASH_MAX_PENDING)
+
+    response = client.post("/api/user/login/", data={"username": "alice", "password": "secret123"})
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+def test_hashing_stats_count_each_operation(threadpool_hashing):
+    hashes, verifies = _count("hash"), _count("verify")
+
+    hashed = asyncio.run(hash_password_async("secret123"))
+    assert asyncio.run(verify_password_async("secret123", hashed)) == (True, None)
+    assert asyncio.run(verify_password_async("wrong", hashed)) == (False, None)
+
+    stats = hashing_stats()
+    assert (_count("hash"), _count("verify")) == (hashes + 1, verifies + 2)
+    assert stats["pending"] == 0
+    assert stats["operations"]["verify"]["max_seconds"] <= stats["operations"]["verify"]["total_seconds"]
+
+
+def test_login_rehashes_passwords_below_the_current_cost(client, register, threadpool_hashing, monkeypatch):
+    register("alice")
+
+    def stored_hash():
+        with engine.connect() as connection:
+            return connection.scalar(select(User.hashed_password).where(User.username == "alice"))
+
+    old_hash = stored_hash()
+    assert old_hash.startswith("$2b$04$")
+
+    # the configured cost goes up: the next login upgrades the stored hash
+    monkeypatch.setattr(hashed_password, "pwd_crypt", CryptContext(
+        schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=5, bcrypt__min_rounds=5,
+    ))
+    assert client.post("/api/user/login/", data={"username": "alice", "password": "secret123"}).status_code == 200
+    new_hash = stored_hash()
+    assert new_hash.startswith("$2b$05$")
+
+    # already at the current cost: later logins leave it alone
+    assert client.post("/api/user/login/", data={"username": "alice", "password": "secret123"}).status_code == 200
+    assert stored_hash() == new_hash
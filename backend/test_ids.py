@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import insert, select
+from config.db import engine
+from models.models import Issue, Comment, ArchivedIssue, ArchivedComment
+from utility.id_genrater import ID_LENGTH, new_id, id_timestamp
+from utility.id_migration import MIGRATABLE, legacy_count, migrate_ids
+
+
+def test_ids_are_unique_and_time_ordered():
+    ids = [new_id() for _ in range(20000)]
+
+    assert len(set(ids)) == len(ids)
+    assert all(len(value) == ID_LENGTH for value in ids)
+    assert ids == sorted(ids)
+
+    moment = datetime(2024, 5, 1, 12, 30, 15, 250000, tzinfo=timezone.utc)
+    assert id_timestamp(new_id(moment)) == moment
+    assert new_id(moment) < new_id(moment + timedelta(milliseconds=1))
+    assert id_timestamp("a1b2") is None
+
+
+def test_migrate_ids_rewrites_legacy_rows_and_references(client, register):
+    headers, user_id = register("alice")
+    project_id = client.post("/api/project/add_project/", json={"title": "P", "description": "d"}, headers=headers).json()["id"]
+    kept = client.post(f"/api/project/issue/add_issue/{project_id}/", json={"title": "new", "description": "d"}, headers=headers).json()["id"]
+
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    with engine.begin() as connection:
+        connection.execute(insert(Issue.__table__), [{
+            "id": f"a{n:03x}", "title": f"old {n}", "description": "d", "priority": "low", "status": "open",
+            "created_at": base + timedelta(hours=n), "updated_at": base, "project_id": project_id, "reporter_id": user_id,
+        } for n in range(5)])
+        connection.execute(insert(Comment.__table__), [{
+            "id": f"c{n:03x}", "text": f"comment {n}", "created_at": base + timedelta(hours=n, minutes=1),
+            "created_by": user_id, "issue_id": f"a{n % 2:03x}",
+        } for n in range(4)])
+        # archived before the migration ran
+        connection.execute(insert(ArchivedIssue.__table__), [{
+            "id": f"b{n:03x}", "title": f"archived {n}", "description": "d", "priority": "low", "status": "closed",
+            "created_at": base + timedelta(hours=n, minutes=30), "updated_at": base, "project_id": project_id, "reporter_id": user_id,
+        } for n in range(2)])
+        connection.execute(insert(ArchivedComment.__table__), [{
+            "id": f"d{n:03x}", "text": f"archived comment {n}", "created_at": base + timedelta(hours=n, minutes=31),
+            "created_by": user_id, "issue_id": f"b{n:03x}", "project_id": project_id,
+        } for n in range(2)])
+
+    with engine.connect() as connection:
+        assert legacy_count(connection, MIGRATABLE["issues"][0]) == 5
+
+    assert migrate_ids(batch_size=2) == {"issues": 5, "comments": 4, "issues_archive": 2, "comments_archive": 2}
+    assert migrate_ids() == {"issues": 0, "comments": 0, "issues_archive": 0, "comments_archive": 0}
+
+    with engine.connect() as connection:
+        issues = {row.title: row.id for row in connection.execute(select(Issue.id, Issue.title))}
+        comments = connection.execute(select(Comment.text, Comment.issue_id, Comment.id)).all()
+
+    assert issues["new"] == kept
+    assert all(len(value) == ID_LENGTH for value in issues.values())
+    assert [issues[f"old {n}"] for n in range(5)] == sorted(issues[f"old {n}"] for n in range(5))
+    assert id_timestamp(issues["old 3"]) == base + timedelta(hours=3)
+    assert {text: issue_id for text, issue_id, _ in comments} == {f"comment {n}": issues[f"old {n % 2}"] for n in range(4)}
+    assert all(len(comment_id) == ID_LENGTH for _, _, comment_id in comments)
+
+    shown = client.get(f"/api/project/issue/comment/{issues['old 1']}/show_comment/", headers=headers).json()
+    assert sorted(comment["text"] for comment in shown) == ["comment 1", "comment 3"]
+
+    # live and archived issues list in one (created_at, id) order
+    with engine.connect() as connection:
+        archived = {row.title: row.id for row in connection.execute(select(ArchivedIssue.id, ArchivedIssue.title))}
+        archived_comments = dict(connection.execute(select(ArchivedComment.text, ArchivedComment.issue_id)).all())
+    assert all(len(value) == ID_LENGTH for value in archived.values())
+    assert archived_comments == {f"archived comment {n}": archived[f"archived {n}"] for n in range(2)}
+    listing = client.get(
+        f"/api/project/issue/show_all_issues_in_project/{project_id}/", params={"include_archived": True}, headers=headers,
+    ).json()
+    ids = [issue["id"] for issue in listing]
+    assert ids == sorted(ids) and ids[:3] == [issues["old 0"], archived["archived 0"], issues["old 1"]]
@@ -0,0 +1,133 @@
+import csv
+import io
+import json
+from types import SimpleNamespace
+from utility import issue_import
+from utility.issue_import import IMPORT_COLUMNS, _copy_rows, import_issues
+
+
+def _project(client, headers):
+    return client.post("/api/project/add_project/", json={"title": "P", "description": "d"}, headers=headers).json()["id"]
+
+
+def _import(client, headers, project_id, name, content, content_type="text/csv", **params):
+    return client.post(
+        f"/api/project/import/{project_id}/", params=params,
+        files={"file": (name, content, content_type)}, headers=headers,
+    )
+
+
+def _issues(client, headers, project_id):
+    return client.get(f"/api/project/issue/show_all_issues_in_project/{project_id}/", headers=headers).json()
+
+
+def test_csv_import_reports_rejected_rows(client, register):
+    headers, user_id = register("alice")
+    project_id = _project(client, headers)
+    content = "title,description,priority,status\nfirst,d,high,\n,missing title,low,\nsecond,d,,closed\nthird,d,urgent,\n"
+
+    report = _import(client, headers, project_id, "issues.csv", content).json()
+
+    assert (report["processed"], report["inserted"], report["rejected"]) == (4, 2, 2)
+    assert [reject["line"] for reject in report["rejects"]] == [3, 5]
+    assert report["rejects"][0]["error"].startswith("title")
+    assert report["rejects"][1]["error"] == "Invalid priority 'urgent'."
+    issues = {issue["title"]: issue for issue in _issues(client, headers, project_id)}
+    assert set(issues) == {"first", "second"}
+    assert (issues["first"]["priority"], issues["first"]["status"]) == ("high", "open")
+    assert (issues["second"]["priority"], issues["second"]["status"]) == ("low", "closed")
+    assert issues["first"]["reporter_id"] == user_id
+
+
+def test_ndjson_import_reports_rejected_rows(client, register):
+    headers, _ = register("alice")
+    project_id = _project(client, headers)
+    content = "\n".join([
+        json.dumps({"title": "first", "description": ""}),
+        "{not json",
+        json.dumps(["a", "list"]),
+        "",
+        json.dumps({"title": "second", "description": "d", "status": "bogus"}),
+        json.dumps({"title": "third", "description": "d", "priority": "critical"}),
+    ])
+
+    # the .ndjson name picks the format without ?format=
+    report = _import(client, headers, project_id, "issues.ndjson", content, "application/octet-stream").json()
+
+    assert (report["processed"], report["inserted"], report["rejected"]) == (5, 2, 3)
+    assert [reject["line"] for reject in report["rejects"]] == [2, 3, 5]
+    assert report["rejects"][1]["error"] == "Expected a JSON object."
+    issues = {issue["title"]: issue for issue in _issues(client, headers, project_id)}
+    assert issues["first"]["description"] == "" and issues["third"]["priority"] == "critical"
+
+
+def test_rejects_echoed_back_are_capped(client, register, monkeypatch):
+    headers, _ = register("alice")
+    project_id = _project(client, headers)
+    monkeypatch.setattr(issue_import, "IMPORT_MAX_REJECTS", 2)
+    content = "title,description\n" + ",no title\n" * 5 + "kept,d\n"
+
+    report = _import(client, headers, project_id, "issues.csv", content, format="csv").json()
+
+    assert (report["processed"], report["inserted"], report["rejected"]) == (6, 1, 5)
+    assert [reject["line"] for reject in report["rejects"]] == [2, 3]
+
+
+def test_import_flushes_in_chunks(client, register):
+    headers, user_id = register("alice")
+    project_id = _project(client, headers)
+    content = "title,description\n" + "".join(f"issue {n},d\n" for n in range(5)) + ",bad\n"
+    progress = []
+
+    report = import_issues(io.StringIO(content), "csv", project_id, user_id, chunk_size=2, on_progress=progress.append)
+
+    assert [(step["processed"], step["inserted"]) for step in progress] == [(2, 2), (4, 4), (6, 5)]
+    assert (report["inserted"], report["rejected"]) == (5, 1)
+    assert len(_issues(client, headers, project_id)) == 5
+
+
+def test_import_rejects_files_that_are_not_utf8(client, register):
+    headers, _ = register("alice")
+    project_id = _project(client, headers)
+
+    response = _import(client, headers, project_id, "issues.csv", "title,description\ncafé,d\n".encode("latin-1"))
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "File must be UTF-8 encoded."
+    assert _issues(client, headers, project_id) == []
+
+
+def test_import_access(client, register):
+    headers, _ = register("alice")
+    outsider, _ = register("bob")
+    project_id = _project(client, headers)
+    content = "title,description\nfirst,d\n"
+
+    assert _import(client, headers, "missing", "issues.csv", content).status_code == 404
+    assert _import(client, outsider, project_id, "issues.csv", content).status_code == 400
+    assert _issues(client, headers, project_id) == []
+
+
+def test_copy_payload_keeps_empty_strings():
+    copied = []
+
+    class Cursor:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def copy_expert(self, sql, buffer):
+            copied.append((sql, buffer.read()))
+
+    connection = SimpleNamespace(connection=SimpleNamespace(dbapi_connection=SimpleNamespace(cursor=Cursor)))
+    row = {column: column for column in IMPORT_COLUMNS} | {"description": ""}
+
+    _copy_rows(connection, [row])
+
+    sql, payload = copied[0]
+    assert sql == f"COPY issues ({', '.join(IMPORT_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+    # an unquoted empty field would be loaded as NULL
+    assert '""' in payload.split(",")
+    assert next(csv.reader(io.StringIO(payload))) == [row[column] for column in IMPORT_COLUMNS]
@@ -0,0 +1,49 @@
+from utility.pagination import NEXT_CURSOR_HEADER
+
+
+def test_cursor_pages_cover_every_issue_once(client, register):
+    headers, _ = register("alice")
+    project_id = client.post("/api/project/add_project/", json={"title": "P", "description": "d"}, headers=headers).json()["id"]
+    created = {
+        client.post(f"/api/project/issue/add_issue/{project_id}/", json={"title": f"bug {i}", "description": "x"}, headers=headers).json()["id"]
+        for i in range(7)
+    }
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        response = client.get(f"/api/project/issue/show_all_issues_in_project/{project_id}/", params=params, headers=headers)
+        assert response.status_code == 200
+        seen += [issue["id"] for issue in response.json()]
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+
+    assert len(seen) == 7 and set(seen) == created
+
+
+def test_invalid_cursor_is_rejected(client, register):
+    headers, _ = register("alice")
+    project_id = client.post("/api/project/add_project/", json={"title": "P", "description": "d"}, headers=headers).json()["id"]
+
+    response = client.get(f"/api/project/issue/show_all_issues_in_project/{project_id}/", params={"cursor": "nope"}, headers=headers)
+
+    assert response.status_code == 400
+
+
+def test_unpaged_requests_return_every_issue(client, register):
+    headers, _ = register("alice")
+    project_id = client.post("/api/project/add_project/", json={"title": "P", "description": "d"}, headers=headers).json()["id"]
+    client.post(f"/api/project/issue/bulk_add_issues/{project_id}/", json=[
+        {"title": f"bug {i}", "description": "x"} for i in range(105)
+    ], headers=headers)
+    url = f"/api/project/issue/show_all_issues_in_project/{project_id}/"
+
+    # clients from before paging send no limit and read no cursor
+    response = client.get(url, headers=headers)
+    assert len(response.json()) == 105 and NEXT_CURSOR_HEADER not in response.headers
+
+    # a cursor without a limit pages at the default size
+    cursor = client.get(url, params={"limit": 2}, headers=headers).headers[NEXT_CURSOR_HEADER]
+    response = client.get(url, params={"cursor": cursor}, headers=headers)
+    assert len(response.json()) == 100 and NEXT_CURSOR_HEADER in response.headers
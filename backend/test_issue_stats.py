@@ -0,0 +1,77 @@
+import time
+import pytest
+from sqlalchemy import delete
+from config.db import engine
+from models.models import IssueStats
+from routes import internal_routes
+import utility.issue_stats as issue_stats
+
+
+@pytest.mark.parametrize("summary_table", ["off", "upsert", "update_then_insert"])
+def test_stats_follow_issue_writes(client, register, monkeypatch, summary_table):
+    monkeypatch.setattr(issue_stats, "ISSUE_STATS_TABLE", summary_table != "off")
+    if summary_table == "update_then_insert":
+        # the path taken on backends without INSERT ... ON CONFLICT
+        monkeypatch.setattr(issue_stats, "_upsert", lambda dialect: None)
+    headers, _ = register("alice")
+    project_id = client.post("/api/project/add_project/", json={"title": "P", "description": "d"}, headers=headers).json()["id"]
+    empty_id = client.post("/api/project/add_project/", json={"title": "E", "description": "d"}, headers=headers).json()["id"]
+    issue_url = "/api/project/issue"
+
+    first = client.post(f"{issue_url}/add_issue/{project_id}/", json={"title": "a", "description": "d", "priority": "critical"}, headers=headers).json()["id"]
+    second = client.post(f"{issue_url}/add_issue/{project_id}/", json={"title": "b", "description": "d"}, headers=headers).json()["id"]
+    client.post(f"{issue_url}/bulk_add_issues/{project_id}/", json=[{"title": "c", "description": "d", "status": "resolved"}] * 3, headers=headers)
+    client.put(f"{issue_url}/update/{first}/", json={"status": "in_progress"}, headers=headers)
+    client.put(f"{issue_url}/bulk_update/{project_id}/", json=[{"id": second, "priority": "high"}], headers=headers)
+    client.delete(f"{issue_url}/delete/{second}/", headers=headers)
+
+    stats = client.get("/api/project/stats/", headers=headers).json()
+    by_project = {entry["project_id"]: entry for entry in stats}
+
+    assert by_project[empty_id]["total"] == 0
+    project = by_project[project_id]
+    assert project["total"] == 4
+    assert project["by_status"] == {"open": 0, "in_progress": 1, "resolved": 3, "closed": 0}
+    assert project["by_priority"] == {"low": 3, "medium": 0, "high": 0, "critical": 1}
+    assert project["by_status_priority"]["in_progress"]["critical"] == 1
+
+    single = client.get("/api/project/stats/", params={"project_id": project_id}, headers=headers).json()
+    assert single == [project]
+
+
+def test_stats_require_project_access(client, register):
+    admin, _ = register("alice")
+    outsider, _ = register("bob", role="developer")
+    project_id = client.post("/api/project/add_project/", json={"title": "P", "description": "d"}, headers=admin).json()["id"]
+
+    assert client.get("/api/project/stats/", params={"project_id": project_id}, headers=outsider).status_code == 400
+    assert client.get("/api/project/stats/", params={"project_id": "missing"}, headers=outsider).status_code == 404
+    assert client.get("/api/project/stats/", headers=outsider).json() == []
+
+
+def test_recount_job_rebuilds_the_summary(client, register, monkeypatch):
+    monkeypatch.setattr(issue_stats, "ISSUE_STATS_TABLE", True)
+    monkeypatch.setattr(internal_routes, "ISSUE_STATS_TABLE", True)
+    headers, _ = register("alice")
+    dev_headers, _ = register("bob", role="developer")
+    project_id = client.post("/api/project/add_project/", json={"title": "P", "description": "d"}, headers=headers).json()["id"]
+    client.post(f"/api/project/issue/bulk_add_issues/{project_id}/", json=[{"title": "t", "description": "d"}] * 3, headers=headers)
+    # rows written behind the app's back leave the summary stale
+    with engine.begin() as connection:
+        connection.execute(delete(IssueStats))
+    assert client.get("/api/project/stats/", params={"project_id": project_id}, headers=headers).json()[0]["total"] == 0
+
+    assert client.post("/internal/issue_stats/", headers=dev_headers).status_code == 403
+    response = client.post("/internal/issue_stats/", headers=headers)
+    assert response.status_code == 202
+    for _ in range(200):
+        job = client.get(response.json()["status_url"], headers=headers).json()
+        if job["status"] not in ("queued", "running"):
+            break
+        time.sleep(0.02)
+
+    assert job["status"] == "succeeded" and job["kind"] == "recount_issue_stats"
+    assert client.get("/api/project/stats/", params={"project_id": project_id}, headers=headers).json()[0]["total"] == 3
+
+    monkeypatch.setattr(internal_routes, "ISSUE_STATS_TABLE", False)
+    assert client.post("/internal/issue_stats/", headers=headers).status_code == 400
@@ -0,0 +1,104 @@
+import threading
+import time
+from datetime import timedelta
+from sqlalchemy import insert, select
+from config.db import engine
+from models.models import Job
+from utility import jobs
+from utility.id_genrater import new_id
+from utility.jobs import JOB_TYPES, enqueue_sync, job_type, runner
+
+
+def _wait(job_id: str, timeout: float = 10) -> Job:
+    deadline = time.monotonic() + timeout
+    with engine.connect() as connection:
+        while True:
+            job = connection.execute(select(Job.__table__).where(Job.id == job_id)).first()
+            if job.status in ("succeeded", "failed") or time.monotonic() > deadline:
+                return job
+            time.sleep(0.02)
+            connection.rollback()
+
+
+def test_retries_with_backoff_and_per_kind_limits(client, monkeypatch):
+    monkeypatch.setattr(jobs, "JOBS_RETRY_BASE_SECONDS", 0.05)
+    calls, running, peak = [], [0], [0]
+    lock = threading.Lock()
+
+    @job_type("test_flaky", max_attempts=3)
+    def flaky(n: int, on_progress=None):
+        calls.append(time.monotonic())
+        if len(calls) < 3:
+            raise RuntimeError(f"attempt {len(calls)} failed")
+        on_progress({"done": n})
+        return {"n": n}
+
+    @job_type("test_broken", max_attempts=2)
+    def broken(on_progress=None):
+        raise ValueError("always broken")
+
+    @job_type("test_single", concurrency=1)
+    def single(on_progress=None):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+
+    try:
+        flaky_id = enqueue_sync("test_flaky", None, {"n": 7})
+        broken_id = enqueue_sync("test_broken", None, {})
+        single_ids = [enqueue_sync("test_single", None, {}) for _ in range(4)]
+
+        job = _wait(flaky_id)
+        assert job.status == "succeeded" and job.attempts == 3
+        assert job.result == {"n": 7} and job.progress == {"done": 7} and job.error is None
+        # 0.05s then 0.1s between attempts
+        assert calls[1] - calls[0] >= 0.05 and calls[2] - calls[1] >= 0.1
+
+        job = _wait(broken_id)
+        assert job.status == "failed" and job.attempts == 2 and job.error == "always broken"
+
+        assert all(_wait(job_id).status == "succeeded" for job_id in single_ids)
+        # four worker threads, but one job of this kind at a time
+        assert jobs.JOBS_WORKERS > 1 and peak[0] == 1
+    finally:
+        for kind in ("test_flaky", "test_broken", "test_single"):
+            JOB_TYPES.pop(kind, None)
+
+
+def test_stale_jobs_are_requeued_and_status_is_owner_only(client, register):
+    headers, _ = register("alice")
+    other_headers, _ = register("bob", role="developer")
+    project_id = client.post("/api/project/add_project/", json={"title": "P", "description": "d"}, headers=headers).json()["id"]
+
+    # a job claimed by a worker that died mid-import
+    stale = jobs._now() - timedelta(seconds=jobs.JOBS_STALE_SECONDS + 1)
+    job_id = new_id()
+    with engine.begin() as connection:
+        connection.execute(insert(Job.__table__).values(
+            id=job_id, kind="delete_project", payload={"project_id": project_id}, status="running",
+            locked_by="gone:1", attempts=1, max_attempts=3, heartbeat_at=stale, run_after=stale,
+        ))
+    runner.housekeep()
+    job = _wait(job_id)
+    assert job.status == "succeeded" and job.attempts == 2 and job.result["projects"] == 1
+
+    csv = "title,description,priority\nfirst,d,high\n,missing title,low\nsecond,d,\n"
+    project_id = client.post("/api/project/add_project/", json={"title": "P", "description": "d"}, headers=headers).json()["id"]
+    response = client.post(
+        f"/api/project/import/{project_id}/", params={"background": True},
+        files={"file": ("issues.csv", csv, "text/csv")}, headers=headers,
+    )
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    job = _wait(job_id)
+    assert job.status == "succeeded" and job.result["inserted"] == 2 and job.result["rejected"] == 1
+    body = client.get(response.json()["status_url"], headers=headers).json()
+    assert body["kind"] == "import_issues" and body["progress"]["inserted"] == 2
+    assert [item["id"] for item in client.get("/api/jobs/", headers=headers).json()] == [job_id]
+    assert client.get(f"/api/jobs/{job_id}/", headers=other_headers).status_code == 404
+    assert client.get("/api/jobs/", headers=other_headers).json() == []
+    assert len(client.get(f"/api/project/issue/show_all_issues_in_project/{project_id}/", headers=headers).json()) == 2
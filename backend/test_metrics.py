@@ -0,0 +1,38 @@
+import re
+from utility.metrics import registry
+
+
+def _sample(text: str, name: str, **labels) -> float:
+    for line in text.splitlines():
+        if line.startswith(name + "{") and all(f'{key}="{value}"' in line for key, value in labels.items()):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_metrics_count_requests_per_route_and_sql_statements(client, register):
+    registry.reset()
+    headers, _ = register("alice")
+    project_id = client.post("/api/project/add_project/", json={"title": "P", "description": "d"}, headers=headers).json()["id"]
+    for _ in range(3):
+        client.get(f"/api/project/show_project/{project_id}/", headers=headers)
+    client.get("/api/project/show_project/missing/", headers=headers)
+
+    text = client.get("/metrics").text
+    route = "/api/project/show_project/{project_id}/"
+
+    assert _sample(text, "http_requests_total", router="project", route=route, status="200") == 3
+    assert _sample(text, "http_requests_total", router="project", route=route, status="404") == 1
+    assert _sample(text, "http_request_duration_seconds_count", router="project", route=route) == 4
+    assert _sample(text, "http_request_duration_seconds_bucket", router="project", route=route, le="+Inf") == 4
+    assert _sample(text, "db_statements_total", operation="SELECT") >= 4
+    assert _sample(text, "db_statements_total", operation="INSERT") >= 2
+    assert re.search(r"^http_requests_in_flight 1$", text, re.M)
+    assert "# TYPE db_pool_wait_seconds histogram" in text
+
+
+def test_unmatched_paths_share_one_label(client):
+    registry.reset()
+    client.get("/nope/1")
+    client.get("/nope/2")
+
+    assert _sample(client.get("/metrics").text, "http_requests_total", route="unmatched", status="404") == 2
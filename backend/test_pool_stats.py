@@ -0,0 +1,35 @@
+import pytest
+from sqlalchemy import create_engine, exc
+from config.pool import InstrumentedQueuePool, pool_status
+
+
+def test_pool_records_waits_and_checkout_timeouts(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05,
+    )
+    held = engine.connect()
+
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+
+    status = pool_status(engine.pool)
+    assert status["checked_out"] == 1 and status["overflow"] == 0
+    assert status["checkouts"] == 2 and status["checkout_timeouts"] == 1
+    assert status["wait_seconds_max"] >= 0.05
+    assert status["wait_seconds_buckets"]["+Inf"] == 2
+
+    held.close()
+    engine.dispose()
+    assert pool_status(engine.pool)["checkouts"] == 2
+
+
+def test_pool_endpoint_is_admin_only(client, register):
+    admin, _ = register("alice")
+    dev, _ = register("bob", role="developer")
+
+    response = client.get("/internal/pool/", headers=admin)
+
+    assert response.status_code == 200
+    assert {"checked_out", "overflow", "checkout_timeouts", "wait_seconds_buckets"} <= set(response.json()["sync"])
+    assert client.get("/internal/pool/", headers=dev).status_code == 403
@@ -0,0 +1,25 @@
+def test_membership_changes_take_effect_immediately(client, register):
+    admin, _ = register("alice")
+    dev, dev_id = register("bob", role="developer")
+    project_id = client.post("/api/project/add_project/", json={"title": "P", "description": "d"}, headers=admin).json()["id"]
+    issues_url = f"/api/project/issue/show_all_issues_in_project/{project_id}/"
+
+    assert client.get(issues_url, headers=dev).status_code == 400
+
+    client.post(f"/api/project/{project_id}/add_member/{dev_id}", headers=admin)
+    assert client.get(issues_url, headers=dev).status_code == 200
+
+    client.delete(f"/api/project/{project_id}/delete_member/{dev_id}", headers=admin)
+    assert client.get(issues_url, headers=dev).status_code == 400
+
+
+def test_members_can_comment_on_issues(client, register):
+    admin, _ = register("alice")
+    dev, dev_id = register("bob", role="developer")
+    project_id = client.post("/api/project/add_project/", json={"title": "P", "description": "d"}, headers=admin).json()["id"]
+    client.post(f"/api/project/{project_id}/add_member/{dev_id}", headers=admin)
+    issue_id = client.post(f"/api/project/issue/add_issue/{project_id}/", json={"title": "t", "description": "d"}, headers=admin).json()["id"]
+
+    response = client.post(f"/api/project/issue/comment/{issue_id}/write_comment/", json={"text": "on it"}, headers=dev)
+
+    assert response.status_code == 201
@@ -0,0 +1,62 @@
+import pytest
+from sqlalchemy import event
+from config.db import engine, async_engine
+
+
+@pytest.fixture()
+def statements():
+    engines = [engine] + ([async_engine.sync_engine] if async_engine is not None else [])
+    seen = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        seen.append(statement)
+
+    for target in engines:
+        event.listen(target, "before_cursor_execute", record)
+    yield seen
+    for target in engines:
+        event.remove(target, "before_cursor_execute", record)
+
+
+def _add_projects(client, admin, member_id, count):
+    for index in range(count):
+        project_id = client.post("/api/project/add_project/", json={"title": f"P{index}", "description": "d"}, headers=admin).json()["id"]
+        client.post(f"/api/project/{project_id}/add_member/{member_id}", headers=admin)
+
+
+@pytest.mark.parametrize("url, expected_queries", [
+    ("/api/project/show_all_project/", 2),
+    ("/api/project/show_all_project/summary/", 1),
+])
+def test_project_listing_query_count_does_not_grow(client, register, statements, url, expected_queries):
+    admin, _ = register("alice")
+    dev, dev_id = register("bob", role="developer")
+
+    counts = []
+    for batch in (2, 18):
+        _add_projects(client, admin, dev_id, batch)
+        for headers in (admin, dev):
+            statements.clear()
+            response = client.get(url, headers=headers)
+            assert response.status_code == 200
+            counts.append((len(response.json()), len(statements)))
+
+    assert counts == [(2, expected_queries)] * 2 + [(20, expected_queries)] * 2
+
+
+def test_project_listing_unions_created_and_member_projects(client, register):
+    admin, admin_id = register("alice")
+    dev, dev_id = register("bob", role="developer")
+    own = client.post("/api/project/add_project/", json={"title": "mine", "description": "d"}, headers=admin).json()["id"]
+    shared = client.post("/api/project/add_project/", json={"title": "shared", "description": "d"}, headers=admin).json()["id"]
+    client.post(f"/api/project/{shared}/add_member/{dev_id}", headers=admin)
+    client.post(f"/api/project/{shared}/add_member/{admin_id}", headers=admin)
+
+    mine = client.get("/api/project/show_all_project/", headers=admin).json()
+    summary = client.get("/api/project/show_all_project/summary/", headers=admin).json()
+    theirs = client.get("/api/project/show_all_project/", headers=dev).json()
+
+    assert {project["id"] for project in mine} == {own, shared}
+    assert {project["id"]: project["member_count"] for project in summary} == {own: 0, shared: 2}
+    assert [project["id"] for project in theirs] == [shared]
+    assert {member["id"] for member in theirs[0]["members"]} == {admin_id, dev_id}
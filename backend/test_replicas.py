@@ -0,0 +1,148 @@
+import asyncio
+import sqlite3
+import pytest
+from sqlalchemy import update
+from config.db import engine, open_session
+from config.replicas import replicas
+from models.models import Issue
+
+
+@pytest.fixture()
+def replica(client, tmp_path):
+    """A second SQLite file standing in for a replica; ``sync()`` replicates."""
+    path = tmp_path / "replica.db"
+
+    def sync():
+        source, target = sqlite3.connect(engine.url.database), sqlite3.connect(path)
+        source.backup(target)
+        source.close()
+        target.close()
+
+    replicas.configure([f"sqlite:///{path}"])
+    try:
+        yield sync
+    finally:
+        replicas.configure([])
+
+
+def _titles(client, headers, project_id):
+    issues = client.get(f"/api/project/issue/show_all_issues_in_project/{project_id}/", headers=headers).json()
+    return [issue["title"] for issue in issues]
+
+
+def test_reads_use_replica_with_read_your_writes_and_fallback(client, register, replica, monkeypatch):
+    headers, _ = register("alice")
+    reader_headers, reader_id = register("bob")
+    project_id = client.post("/api/project/add_project/", json={"title": "P", "description": "d"}, headers=headers).json()["id"]
+    client.post(f"/api/project/{project_id}/add_member/{reader_id}", headers=headers)
+    client.post(f"/api/project/issue/add_issue/{project_id}/", json={"title": "first", "description": "d"}, headers=headers)
+
+    # no heartbeat has reached the replica yet: everything reads the primary
+    replica()
+    replicas.check()
+    assert replicas.pick() is None
+    replica()
+    replicas.check()
+    assert replicas.stats()["replicas"][0]["lag_seconds"] == 0.0
+
+    client.post(f"/api/project/issue/add_issue/{project_id}/", json={"title": "second", "description": "d"}, headers=headers)
+    # the writer sees its own write; another client reads the replica, which hasn't got it yet
+    assert _titles(client, headers, project_id) == ["first", "second"]
+    assert _titles(client, reader_headers, project_id) == ["first"]
+    stats = replicas.stats()
+    assert stats["sticky_reads"] == 1 and stats["replicas"][0]["reads"] == 1
+
+    # once it lags more than allowed, reads go back to the primary
+    monkeypatch.setattr(replicas, "max_lag", 0)
+    replicas.check()
+    assert _titles(client, reader_headers, project_id) == ["first", "second"]
+    monkeypatch.undo()
+
+    # and when it breaks
+    replica()
+    replicas.check()
+    assert _titles(client, reader_headers, project_id) == ["first", "second"]
+    with sqlite3.connect(replicas.replicas[0].engine.url.database) as connection:
+        connection.execute("DROP TABLE replica_heartbeat")
+    replicas.check()
+    assert replicas.pick() is None and replicas.stats()["replicas"][0]["error"]
+
+
+def test_replica_sessions_refuse_writes(client, replica):
+    replica()
+    replicas.check()
+    replica()
+    replicas.check()
+
+    async def write():
+        async with open_session(replicas.pick()) as db:
+            db.sync_session.info["replica"] = "replica0"
+            await db.execute(update(Issue).values(title="x"))
+
+    with pytest.raises(RuntimeError, match="read-only"):
+        asyncio.run(write())
+
+
+
+def test_synchronous_import_makes_the_importer_read_the_primary(client, register, replica):
+    headers, _ = register("alice")
+    importer_headers, importer_id = register("bob")
+    project_id = client.post("/api/project/add_project/", json={"title": "P", "description": "d"}, headers=headers).json()["id"]
+    client.post(f"/api/project/{project_id}/add_member/{importer_id}", headers=headers)
+    replica()
+    replicas.check()
+    replica()
+    replicas.check()
+    # bob hasn't written yet, so he reads the replica
+    assert _titles(client, importer_headers, project_id) == []
+    assert replicas.stats()["replicas"][0]["reads"] == 1
+
+    report = client.post(
+        f"/api/project/import/{project_id}/", files={"file": ("issues.csv", "title,description\nimported,d\n", "text/csv")},
+        headers=importer_headers,
+    ).json()
+
+    # the replica doesn't have the rows yet; bob's reads go to the primary
+    assert report["inserted"] == 1
+    assert _titles(client, importer_headers, project_id) == ["imported"]
+    stats = replicas.stats()
+    assert stats["sticky_reads"] == 1 and stats["replicas"][0]["reads"] == 1
+
+
+def test_failed_replica_read_is_retried_on_the_primary(client, register, replica):
+    headers, _ = register("alice")
+    reader_headers, reader_id = register("bob")
+    project_id = client.post("/api/project/add_project/", json={"title": "P", "description": "d"}, headers=headers).json()["id"]
+    client.post(f"/api/project/{project_id}/add_member/{reader_id}", headers=headers)
+    client.post(f"/api/project/issue/add_issue/{project_id}/", json={"title": "first", "description": "d"}, headers=headers)
+    replica()
+    replicas.check()
+    replica()
+    replicas.check()
+    with sqlite3.connect(replicas.replicas[0].engine.url.database) as connection:
+        connection.execute("DROP TABLE issues")
+
+    assert _titles(client, reader_headers, project_id) == ["first"]
+    stats = replicas.stats()
+    assert stats["failovers"] == 1 and stats["replicas"][0]["error"]
+    assert replicas.pick() is None
+
+
+def test_replica_reads_do_not_cache_access(client, register, replica):
+    headers, _ = register("alice")
+    reader_headers, reader_id = register("bob")
+    project_id = client.post("/api/project/add_project/", json={"title": "P", "description": "d"}, headers=headers).json()["id"]
+    replica()
+    replicas.check()
+    replica()
+    replicas.check()
+    # the replica hasn't seen bob join yet, so it turns him away...
+    client.post(f"/api/project/{project_id}/add_member/{reader_id}", headers=headers)
+    listing = f"/api/project/issue/show_all_issues_in_project/{project_id}/"
+    assert client.get(listing, headers=reader_headers).status_code == 400
+
+    # ...but that answer isn't remembered once it catches up
+    replica()
+    replicas.check()
+    assert client.get(listing, headers=reader_headers).status_code == 200
+    assert replicas.stats()["replicas"][0]["reads"] == 2
@@ -0,0 +1,50 @@
+from types import SimpleNamespace
+from utility import search
+
+
+def test_search_ranks_issues_and_comments_within_member_projects(client, register):
+    alice, _ = register("alice")
+    mallory, _ = register("mallory")
+    project_id = client.post("/api/project/add_project/", json={"title": "P", "description": "d"}, headers=alice).json()["id"]
+    other_id = client.post("/api/project/add_project/", json={"title": "Q", "description": "d"}, headers=mallory).json()["id"]
+
+    crash = client.post(f"/api/project/issue/add_issue/{project_id}/", json={"title": "Login crash", "description": "App crashes on login"}, headers=alice).json()
+    slow = client.post(f"/api/project/issue/add_issue/{project_id}/", json={"title": "Slow dashboard", "description": "Takes ages"}, headers=alice).json()
+    client.post(f"/api/project/issue/comment/{slow['id']}/write_comment/", json={"text": "maybe the crash reporter is slow"}, headers=alice)
+    client.post(f"/api/project/issue/add_issue/{other_id}/", json={"title": "crash elsewhere", "description": "x"}, headers=mallory)
+
+    hits = client.get("/api/search/", params={"q": "crash"}, headers=alice).json()
+
+    assert [(hit["kind"], hit["issue_id"]) for hit in hits] == [("issue", crash["id"]), ("comment", slow["id"])]
+    assert "<b>" in hits[0]["snippet"]
+
+
+def test_search_survives_edits_and_query_syntax(client, register):
+    alice, _ = register("alice")
+    project_id = client.post("/api/project/add_project/", json={"title": "P", "description": "d"}, headers=alice).json()["id"]
+    issue = client.post(f"/api/project/issue/add_issue/{project_id}/", json={"title": "old words", "description": "x"}, headers=alice).json()
+    client.put(f"/api/project/issue/update/{issue['id']}/", json={"title": "renamed"}, headers=alice)
+
+    assert client.get("/api/search/", params={"q": "old"}, headers=alice).json() == []
+    assert len(client.get("/api/search/", params={"q": 'renamed" -(:*'}, headers=alice).json()) == 1
+
+
+def test_search_falls_back_to_substring_matches_without_full_text(client, register, monkeypatch):
+    alice, _ = register("alice")
+    mallory, _ = register("mallory")
+    project_id = client.post("/api/project/add_project/", json={"title": "P", "description": "d"}, headers=alice).json()["id"]
+    other_id = client.post("/api/project/add_project/", json={"title": "Q", "description": "d"}, headers=mallory).json()["id"]
+    in_body = client.post(f"/api/project/issue/add_issue/{project_id}/", json={"title": "Slow", "description": "100% CPU on login"}, headers=alice).json()
+    in_title = client.post(f"/api/project/issue/add_issue/{project_id}/", json={"title": "Login crash", "description": "x"}, headers=alice).json()
+    client.post(f"/api/project/issue/comment/{in_body['id']}/write_comment/", json={"text": "after LOGIN too"}, headers=alice)
+    client.post(f"/api/project/issue/add_issue/{other_id}/", json={"title": "login elsewhere", "description": "x"}, headers=mallory)
+    # a backend with neither tsvector nor FTS5
+    monkeypatch.setattr(search, "engine", SimpleNamespace(dialect=SimpleNamespace(name="mysql")))
+
+    hits = client.get("/api/search/", params={"q": "Login"}, headers=alice).json()
+
+    assert [(hit["kind"], hit["issue_id"]) for hit in hits][0] == ("issue", in_title["id"])
+    assert sorted((hit["kind"], hit["issue_id"]) for hit in hits[1:]) == [("comment", in_body["id"]), ("issue", in_body["id"])]
+    # LIKE wildcards in the query are matched literally
+    assert [hit["issue_id"] for hit in client.get("/api/search/", params={"q": "100%"}, headers=alice).json()] == [in_body["id"]]
+    assert client.get("/api/search/", params={"q": "1_0"}, headers=alice).json() == []
@@ -0,0 +1,42 @@
+import logging
+from sqlalchemy import select
+from config.db import engine
+from models.models import User
+import utility.sql_profiler as sql_profiler
+
+
+def test_profiled_requests_report_query_count_and_db_time(client, register, monkeypatch):
+    headers, _ = register("alice")
+    project_id = client.post("/api/project/add_project/", json={"title": "P", "description": "d"}, headers=headers).json()["id"]
+
+    monkeypatch.setattr(sql_profiler, "SQL_PROFILE_MODE", "off")
+    assert sql_profiler.QUERY_COUNT_HEADER not in client.get(f"/api/project/show_project/{project_id}/", headers=headers).headers
+
+    monkeypatch.setattr(sql_profiler, "SQL_PROFILE_MODE", "sample")
+    monkeypatch.setattr(sql_profiler, "SQL_PROFILE_SAMPLE_RATE", 0.0)
+    forced = client.get(f"/api/project/show_project/{project_id}/", headers={**headers, "X-Profile-SQL": "1"})
+
+    assert int(forced.headers[sql_profiler.QUERY_COUNT_HEADER]) >= 2
+    assert float(forced.headers[sql_profiler.DB_TIME_HEADER]) > 0
+    assert sql_profiler.N_PLUS_ONE_HEADER not in forced.headers
+
+
+def test_repeated_statement_shapes_are_flagged(client, caplog):
+    profile = sql_profiler.RequestProfile()
+    token = sql_profiler._current.set(profile)
+    try:
+        with engine.connect() as connection:
+            for user_id in range(6):
+                connection.execute(select(User).where(User.id == str(user_id)))
+            connection.execute(select(User).where(User.id.in_(["a", "b"])))
+            connection.execute(select(User).where(User.id.in_(["a", "b", "c"])))
+    finally:
+        sql_profiler._current.reset(token)
+
+    suspects = profile.repeated(threshold=2)
+    assert profile.query_count == 8
+    assert [count for _, count in suspects] == [6, 2]
+
+    with caplog.at_level(logging.WARNING, logger=sql_profiler.__name__):
+        sql_profiler._report({"method": "GET", "path": "/x"}, profile)
+    assert "N+1 suspect x6" in caplog.text
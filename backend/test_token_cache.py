@@ -0,0 +1,25 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from utility import token_genrater
+from utility.token_genrater import create_access_token, decode_access_token, token_cache_stats
+
+
+def test_repeat_tokens_are_served_from_cache():
+    token = create_access_token({"sub": "alice", "id": "A1", "role": "admin"})
+    before = token_cache_stats()
+
+    first = asyncio.run(decode_access_token(token))
+    second = asyncio.run(decode_access_token(token))
+
+    after = token_cache_stats()
+    assert first == second == {"username": "alice", "id": "A1", "role": "admin"}
+    assert after["hits"] == before["hits"] + 1
+
+
+def test_invalid_tokens_are_never_cached():
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(decode_access_token("not-a-token"))
+        assert exc.value.status_code == 401
+    assert token_genrater._token_cache.get(token_genrater._token_key("not-a-token")) is None
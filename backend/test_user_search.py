@@ -0,0 +1,22 @@
+def test_user_search_ranks_exact_then_prefix_then_substring(client, register):
+    headers, _ = register("searcher")
+    for username in ("xsam", "samuel", "sam", "bob"):
+        register(username, role="developer")
+
+    response = client.get("/api/user/search/", params={"q": "sam"}, headers=headers)
+
+    assert [user["username"] for user in response.json()] == ["sam", "samuel", "xsam"]
+
+
+def test_user_search_pages_and_narrows_cached_prefixes(client, register):
+    headers, _ = register("searcher")
+    for username in ("anna", "andrew", "andy", "amy"):
+        register(username, role="developer")
+
+    first = client.get("/api/user/search/", params={"q": "a", "limit": 2}, headers=headers).json()
+    second = client.get("/api/user/search/", params={"q": "a", "limit": 2, "offset": 2}, headers=headers).json()
+    narrowed = client.get("/api/user/search/", params={"q": "and"}, headers=headers).json()
+
+    assert [user["username"] for user in first + second] == ["amy", "andrew", "andy", "anna"]
+    assert [user["username"] for user in narrowed] == ["andrew", "andy"]
+    assert client.get("/api/user/search/", params={"q": "a", "offset": 500}, headers=headers).status_code == 400
@@ -0,0 +1,168 @@
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import select, inspect, literal, null, tuple_, union_all, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.schema import CreateIndex, CreateTable
+from config.db import engine
+from models.models import Project, Issue, Comment, utc_now
+
+logger = logging.getLogger(__name__)
+
+# columns filled by utc_now() on the database side
+TIMESTAMP_COLUMNS = {
+    Project.__table__: ("created_at",),
+    Issue.__table__: ("created_at", "updated_at"),
+    Comment.__table__: ("created_at",),
+}
+
+
+def install_timestamps(bind=engine):
+    """Bring tables created before server-side timestamps up to date.
+
+    Adds the time indexes that are missing and gives the timestamp columns
+    their database default: in place on Postgres, by rebuilding the table on
+    SQLite, which can't change a column default.
+    """
+    with bind.begin() as connection:
+        inspector = inspect(connection)
+        default = str(utc_now().compile(dialect=connection.dialect))
+        stale = []
+        for table, columns in TIMESTAMP_COLUMNS.items():
+            existing = {column["name"]: column for column in inspector.get_columns(table.name)}
+            missing = [column for column in columns if existing[column]["default"] is None]
+            if missing and connection.dialect.name == "postgresql":
+                for column in missing:
+                    connection.exec_driver_sql(f"ALTER TABLE {table.name} ALTER COLUMN {column} SET DEFAULT {default}")
+            elif missing:
+                stale.append(table)
+
+    if stale and bind.dialect.name == "sqlite":
+        _rebuild_sqlite_tables(bind, stale)
+    elif stale:
+        logger.warning("%s have no timestamp defaults on %s", ", ".join(table.name for table in stale), bind.dialect.name)
+
+    with bind.begin() as connection:
+        for table in TIMESTAMP_COLUMNS:
+            for index in table.indexes:
+                connection.execute(CreateIndex(index, if_not_exists=True))
+
+
+def _rebuild_sqlite_tables(bind, tables):
+    """Recreate ``tables`` from the models, keeping their rows, rowids, indexes and triggers.
+
+    SQLite's recipe for schema changes ALTER TABLE can't make: create the new
+    table, copy the rows, drop the old one, rename. Foreign keys are off
+    meanwhile so dropping a parent doesn't touch its children; it all runs in
+    one transaction.
+    """
+    with bind.connect() as connection:
+        # only takes effect outside a transaction
+        connection.exec_driver_sql("PRAGMA foreign_keys=OFF")
+        connection.commit()
+        try:
+            connection.exec_driver_sql("BEGIN")
+            for table in tables:
+                _rebuild_sqlite_table(connection, table)
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.exec_driver_sql("PRAGMA foreign_keys=ON")
+            connection.commit()
+        logger.info("rebuilt %s with timestamp defaults", ", ".join(table.name for table in tables))
+
+
+def _rebuild_sqlite_table(connection, table):
+    name, temporary = table.name, f"_rebuild_{table.name}"
+    # dropping the table drops these too (FTS triggers, user-made indexes); autoindexes have no sql
+    dependents = connection.exec_driver_sql(
+        "SELECT sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL", (name,)
+    ).scalars().all()
+    existing = {column["name"] for column in inspect(connection).get_columns(name)}
+
+    ddl = str(CreateTable(table).compile(dialect=connection.dialect))
+    connection.exec_driver_sql(ddl.replace(f"CREATE TABLE {name} ", f"CREATE TABLE {temporary} ", 1))
+
+    default = str(utc_now().compile(dialect=connection.dialect))
+    columns = [column.name for column in table.columns if column.name in existing]
+    values = [f"coalesce({column}, {default})" if column in TIMESTAMP_COLUMNS[table] else column for column in columns]
+    # rowids are kept: the FTS index refers to rows by rowid
+    connection.exec_driver_sql(
+        f"INSERT INTO {temporary} (rowid, {', '.join(columns)}) SELECT rowid, {', '.join(values)} FROM {name}"
+    )
+    connection.exec_driver_sql(f"DROP TABLE {name}")
+    connection.exec_driver_sql(f"ALTER TABLE {temporary} RENAME TO {name}")
+    for statement in dependents:
+        connection.exec_driver_sql(statement)
+
+
+# ------------- Activity feed --------------
+
+def as_utc(value: datetime) -> datetime:
+    """Naive UTC, the form the timestamp columns are stored in."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _window(query, column, row_id, since: datetime, until: datetime, after: Optional[tuple[datetime, str]], limit: int):
+    query = query.where(column >= since, column < until)
+    if after:
+        query = query.where(tuple_(column, row_id) < tuple_(*after))
+    # newest first; each side stops at one page so the merge stays small
+    return query.order_by(column.desc(), row_id.desc()).limit(limit).subquery()
+
+
+async def recent_activity(
+    db: AsyncSession,
+    project_ids,
+    since: datetime,
+    until: datetime,
+    limit: int,
+    after: Optional[tuple[datetime, str]] = None,
+) -> list[dict]:
+    """Issues and comments created or changed in ``[since, until)``, newest first.
+
+    ``project_ids`` is a list or a subquery of ids. Issues are ranged on
+    updated_at (which starts at created_at) and comments on created_at, each
+    side read from its time index and cut to ``limit`` rows before they are
+    merged. ``after`` is the ``(changed_at, id)`` of the last row of the
+    previous page.
+    """
+    since, until = as_utc(since), as_utc(until)
+    after = (as_utc(after[0]), after[1]) if after else None
+
+    issues = _window(
+        select(
+            literal("issue").label("kind"),
+            case((Issue.updated_at > Issue.created_at, "updated"), else_="created").label("action"),
+            Issue.id.label("id"),
+            Issue.id.label("issue_id"),
+            Issue.project_id.label("project_id"),
+            Issue.title.label("title"),
+            Issue.status.label("status"),
+            null().label("text"),
+            Issue.updated_at.label("changed_at"),
+        ).where(Issue.project_id.in_(project_ids)),
+        Issue.updated_at, Issue.id, since, until, after, limit,
+    )
+    comments = _window(
+        select(
+            literal("comment").label("kind"),
+            literal("created").label("action"),
+            Comment.id.label("id"),
+            Comment.issue_id.label("issue_id"),
+            Issue.project_id.label("project_id"),
+            Issue.title.label("title"),
+            null().label("status"),
+            Comment.text.label("text"),
+            Comment.created_at.label("changed_at"),
+        ).join(Issue, Issue.id == Comment.issue_id).where(Issue.project_id.in_(project_ids)),
+        Comment.created_at, Comment.id, since, until, after, limit,
+    )
+
+    merged = union_all(select(issues), select(comments)).subquery()
+    rows = await db.execute(select(merged).order_by(merged.c.changed_at.desc(), merged.c.id.desc()).limit(limit))
+    return [dict(row) for row in rows.mappings()]
@@ -0,0 +1,154 @@
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+from sqlalchemy import DateTime, and_, cast, delete, insert, null, select, tuple_, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from config.db import engine
+from config.settings import ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE, ARCHIVE_PARTITIONS
+from models.models import ArchivedComment, ArchivedIssue, Comment, Issue, Project
+from utility.etag import bump, bump_sync
+from utility.issue_stats import record_issue_changes, record_issue_changes_sync
+from utility.jobs import job_type
+from utility.project_access import invalidate_issue
+
+ARCHIVED_STATUSES = ("closed", "resolved")
+
+issues, comments = Issue.__table__, Comment.__table__
+issues_archive, comments_archive = ArchivedIssue.__table__, ArchivedComment.__table__
+
+# the live tables' columns, in table order, as the archive tables share them
+ISSUE_COLUMNS = [column.name for column in issues.columns]
+COMMENT_COLUMNS = [column.name for column in comments.columns]
+
+
+def install_archive(bind=engine):
+    """Create the archive tables' hash partitions on Postgres."""
+    with bind.begin() as connection:
+        if connection.dialect.name != "postgresql":
+            return
+        for table in (issues_archive, comments_archive):
+            for remainder in range(ARCHIVE_PARTITIONS):
+                connection.exec_driver_sql(
+                    f"CREATE TABLE IF NOT EXISTS {table.name}_p{remainder} PARTITION OF {table.name} "
+                    f"FOR VALUES WITH (MODULUS {ARCHIVE_PARTITIONS}, REMAINDER {remainder})"
+                )
+
+
+# ------------- Moving rows --------------
+# INSERT ... SELECT then DELETE, so rows never travel through the app.
+
+def _archivable(issue_ids, cutoff: datetime):
+    """``issue_ids`` that still qualify, re-checked by every statement of the
+    move: an issue reopened after its batch was picked stays live."""
+    return and_(issues.c.id.in_(issue_ids), issues.c.status.in_(ARCHIVED_STATUSES), issues.c.updated_at < cutoff)
+
+
+def _archive_statements(issue_ids, cutoff: datetime):
+    archivable = _archivable(issue_ids, cutoff)
+    return [
+        insert(issues_archive).from_select(ISSUE_COLUMNS, select(issues).where(archivable)),
+        insert(comments_archive).from_select(
+            COMMENT_COLUMNS + ["project_id"],
+            select(comments, issues.c.project_id).join(issues, issues.c.id == comments.c.issue_id).where(archivable),
+        ),
+        delete(comments).where(comments.c.issue_id.in_(select(issues.c.id).where(archivable))),
+        delete(issues).where(archivable).returning(issues.c.id, issues.c.project_id, issues.c.status, issues.c.priority),
+    ]
+
+
+def _restore_statements(issue_id: str):
+    return [
+        insert(issues).from_select(
+            ISSUE_COLUMNS, select(*(issues_archive.c[name] for name in ISSUE_COLUMNS)).where(issues_archive.c.id == issue_id)
+        ),
+        insert(comments).from_select(
+            COMMENT_COLUMNS, select(*(comments_archive.c[name] for name in COMMENT_COLUMNS)).where(comments_archive.c.issue_id == issue_id)
+        ),
+        delete(comments_archive).where(comments_archive.c.issue_id == issue_id),
+        delete(issues_archive).where(issues_archive.c.id == issue_id),
+    ]
+
+
+@job_type("archive_issues", concurrency=1)
+def archive_issues(
+    older_than_days: float = ARCHIVE_AFTER_DAYS,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+    bind=engine,
+    on_progress: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """Move closed/resolved issues untouched for ``older_than_days``, with
+    their comments, to the archive tables ``batch_size`` issues per transaction.
+
+    Archived issues leave issue_stats and the live listings; their projects'
+    list ETags change.
+    """
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=older_than_days)
+    moved = {"issues": 0, "comments": 0}
+    while True:
+        with bind.begin() as connection:
+            # row locks keep the batch from changing under the move on
+            # Postgres; elsewhere the repeated predicate skips what changed
+            batch = connection.scalars(
+                select(issues.c.id)
+                .where(issues.c.status.in_(ARCHIVED_STATUSES), issues.c.updated_at < cutoff, issues.c.project_id.is_not(None))
+                .order_by(issues.c.updated_at, issues.c.id)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            ).all()
+            if not batch:
+                break
+            statements = _archive_statements(batch, cutoff)
+            connection.execute(statements[0])
+            moved["comments"] += connection.execute(statements[1]).rowcount
+            connection.execute(statements[2])
+            # counts and stats follow the rows actually deleted
+            archived = connection.execute(statements[3]).all()
+            issue_ids = [row.id for row in archived]
+            moved["issues"] += len(issue_ids)
+
+            by_project = defaultdict(list)
+            for row in archived:
+                by_project[row.project_id].append(((row.status, row.priority), None))
+            for project_id, changes in by_project.items():
+                record_issue_changes_sync(connection, project_id, changes)
+            if by_project:
+                bump_sync(connection, Project.issues_revision, list(by_project))
+
+        for issue_id in issue_ids:
+            invalidate_issue(issue_id)
+        if on_progress:
+            on_progress(dict(moved))
+    return moved
+
+
+async def restore_issue(db: AsyncSession, issue_id: str) -> bool:
+    """Move an archived issue and its comments back to the live tables; the
+    caller commits. False when the issue isn't archived."""
+    row = (await db.execute(
+        select(issues_archive.c.project_id, issues_archive.c.status, issues_archive.c.priority)
+        .where(issues_archive.c.id == issue_id)
+    )).first()
+
+    if row is None:
+        return False
+
+    for statement in _restore_statements(issue_id):
+        await db.execute(statement)
+    await record_issue_changes(db, row.project_id, [(None, (row.status, row.priority))])
+    await bump(db, Project.issues_revision, row.project_id)
+    return True
+
+
+# ------------- Reads --------------
+
+def project_issues_query(project_id: str, cursor_key: Optional[tuple], limit: Optional[int]):
+    """Live and archived issues of a project as one (created_at, id) ordered
+    listing; each side seeks on its own (project_id, created_at, id) index."""
+    sides = []
+    for table, archived_at in ((issues, cast(null(), DateTime)), (issues_archive, issues_archive.c.archived_at)):
+        side = select(*(table.c[name] for name in ISSUE_COLUMNS), archived_at.label("archived_at")).where(table.c.project_id == project_id)
+        if cursor_key:
+            side = side.where(tuple_(table.c.created_at, table.c.id) > tuple_(*cursor_key))
+        sides.append(side.order_by(table.c.created_at, table.c.id).limit(limit).subquery().select())
+    listing = union_all(*sides).subquery()
+    return select(listing).order_by(listing.c.created_at, listing.c.id).limit(limit)
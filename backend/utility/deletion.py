@@ -0,0 +1,108 @@
+from typing import Callable, Optional
+from sqlalchemy import delete, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from config.db import engine
+from config.settings import DELETE_BATCH_SIZE
+from models.models import Project, Issue, Comment, IssueStats, project_members
+from utility.events import publish_sync
+from utility.jobs import job_type
+from utility.project_access import invalidate_project
+
+# foreign keys that cascade from a deleted project/issue to its children
+CASCADE_FOREIGN_KEYS = [
+    (Issue.__table__, "project_id"),
+    (Comment.__table__, "issue_id"),
+    (project_members, "project_id"),
+    (project_members, "user_id"),
+    (IssueStats.__table__, "project_id"),
+]
+
+
+def install_cascades(bind=engine):
+    """Recreate the foreign keys above with ON DELETE CASCADE on Postgres.
+
+    Tables created before the cascades existed keep plain foreign keys on
+    SQLite (it can't alter them); the set-based deletes below remove the
+    children explicitly, so deletes work either way.
+    """
+    with bind.begin() as connection:
+        if connection.dialect.name != "postgresql":
+            return
+        inspector = inspect(connection)
+        for table, column in CASCADE_FOREIGN_KEYS:
+            for foreign_key in inspector.get_foreign_keys(table.name):
+                if foreign_key["constrained_columns"] != [column] or foreign_key["options"].get("ondelete") == "CASCADE":
+                    continue
+                referred = f"{foreign_key['referred_table']}({', '.join(foreign_key['referred_columns'])})"
+                connection.exec_driver_sql(
+                    f'ALTER TABLE {table.name} DROP CONSTRAINT "{foreign_key["name"]}", '
+                    f'ADD CONSTRAINT "{foreign_key["name"]}" FOREIGN KEY ({column}) REFERENCES {referred} ON DELETE CASCADE'
+                )
+
+
+# ------------- Set-based deletes --------------
+# Plain table DELETEs: nothing is loaded into the session, and each level is
+# one statement however many rows it matches.
+
+def _issue_statements(issue_ids):
+    return [
+        ("comments", delete(Comment.__table__).where(Comment.__table__.c.issue_id.in_(issue_ids))),
+        ("issues", delete(Issue.__table__).where(Issue.__table__.c.id.in_(issue_ids))),
+    ]
+
+
+def _project_statements(project_id: str):
+    # archived issues and comments go with the project row (ON DELETE CASCADE)
+    project_issue_ids = select(Issue.__table__.c.id).where(Issue.__table__.c.project_id == project_id)
+    return _issue_statements(project_issue_ids) + [
+        ("members", delete(project_members).where(project_members.c.project_id == project_id)),
+        ("stats", delete(IssueStats.__table__).where(IssueStats.__table__.c.project_id == project_id)),
+        ("projects", delete(Project.__table__).where(Project.__table__.c.id == project_id)),
+    ]
+
+
+async def delete_issue_rows(db: AsyncSession, issue_id: str) -> dict:
+    """Delete an issue and its comments; the caller commits."""
+    return {name: (await db.execute(statement)).rowcount for name, statement in _issue_statements([issue_id])}
+
+
+async def delete_project_rows(db: AsyncSession, project_id: str) -> dict:
+    """Delete a project with its issues, comments, members and stats; the caller commits."""
+    return {name: (await db.execute(statement)).rowcount for name, statement in _project_statements(project_id)}
+
+
+@job_type("delete_project", concurrency=1)
+def delete_project_in_batches(
+    project_id: str,
+    batch_size: int = DELETE_BATCH_SIZE,
+    bind=engine,
+    on_progress: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """Delete a large project ``batch_size`` issues per transaction.
+
+    Short transactions keep locks and WAL/undo small; issues added while it
+    runs are picked up by the next batch. The project row goes last, with
+    whatever is left, in one final transaction. Cached access to the
+    project is dropped only then, so a lookup made while it runs can't
+    cache a grant that outlives it.
+    """
+    deleted = {"comments": 0, "issues": 0}
+    issues = Issue.__table__
+    while True:
+        with bind.begin() as connection:
+            batch = connection.scalars(
+                select(issues.c.id).where(issues.c.project_id == project_id).order_by(issues.c.id).limit(batch_size)
+            ).all()
+            if not batch:
+                break
+            for name, statement in _issue_statements(batch):
+                deleted[name] += connection.execute(statement).rowcount
+        if on_progress:
+            on_progress(dict(deleted))
+
+    with bind.begin() as connection:
+        for name, statement in _project_statements(project_id):
+            deleted[name] = deleted.get(name, 0) + connection.execute(statement).rowcount
+    invalidate_project(project_id)
+    publish_sync(project_id, "project.deleted", {"id": project_id})
+    return deleted
@@ -0,0 +1,81 @@
+import hashlib
+from typing import Optional
+from fastapi import Request, Response, status
+from sqlalchemy import inspect, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from config.db import engine
+
+# Revision counters behind the ETags. Each is bumped in the same transaction
+# as the write it tracks:
+#   projects.revision           project fields and members      (show_project)
+#   projects.issues_revision    any issue created/changed/deleted (show_all_issues_in_project)
+#   issues.revision             the issue row                   (show_issue)
+#   issues.comments_revision    comments written/deleted        (show_comment)
+REVISION_COLUMNS = {
+    "projects": ("revision", "issues_revision"),
+    "issues": ("revision", "comments_revision"),
+}
+
+
+def install_revisions(bind=engine):
+    """Add the revision columns to tables created before they existed."""
+    with bind.begin() as connection:
+        inspector = inspect(connection)
+        for table, columns in REVISION_COLUMNS.items():
+            existing = {column["name"] for column in inspector.get_columns(table)}
+            for column in columns:
+                if column not in existing:
+                    connection.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+
+
+# ------------- Bumping --------------
+
+def _bump_statement(column, row_ids):
+    model = column.class_
+    ids = row_ids if isinstance(row_ids, (list, set, tuple)) else [row_ids]
+    values = {column.key: column + 1}
+    if "updated_at" in model.__table__.c:
+        # a bump is bookkeeping, not an edit: keep updated_at's onupdate from firing
+        values["updated_at"] = model.updated_at
+    return (
+        update(model)
+        .where(model.id.in_(ids))
+        .values(values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def bump(db: AsyncSession, column, row_ids):
+    """Increment a revision column (e.g. ``Issue.revision``) for one or more rows."""
+    await db.execute(_bump_statement(column, row_ids))
+
+
+def bump_sync(connection, column, row_ids):
+    connection.execute(_bump_statement(column, row_ids))
+
+
+# ------------- Conditional responses --------------
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def _matches(if_none_match: Optional[str], tag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    # If-None-Match uses weak comparison
+    return "*" in candidates or tag in (candidate.removeprefix("W/") for candidate in candidates)
+
+
+def not_modified(request: Request, response: Response, tag: str) -> Optional[Response]:
+    """Return a 304 if the client already has ``tag``, else tag the response.
+
+    Handlers call this with the version token alone, before loading the body.
+    """
+    headers = {"ETag": tag, "Cache-Control": "private, no-cache"}
+    if _matches(request.headers.get("if-none-match"), tag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,264 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+from config.db import engine
+from config.settings import EVENTS_BACKEND, EVENTS_CHANNEL, EVENTS_QUEUE_SIZE
+
+logger = logging.getLogger(__name__)
+
+# NOTIFY payloads must stay under 8000 bytes
+NOTIFY_MAX_BYTES = 7900
+# fields kept when an event is too large to NOTIFY; clients refetch the rest
+_SLIM_FIELDS = ("type", "project_id", "id", "issue_id", "count")
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def encode_event(event: dict) -> str:
+    return json.dumps(event, default=_json_default, separators=(",", ":"))
+
+
+# ------------- In-process fan-out --------------
+
+class Subscription:
+    """One listener on a project's events, read from its own bounded queue.
+
+    A ``None`` in the queue means the subscriber fell behind and was dropped;
+    it should reconnect and refetch.
+    """
+
+    def __init__(self, project_id: str, queue_size: int):
+        self.project_id = project_id
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.loop = asyncio.get_running_loop()
+        self.dropped = False
+
+    def offer(self, event: dict) -> bool:
+        if self.dropped:
+            return False
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            # a slow consumer is cut off instead of stalling publishers or growing without bound
+            self.dropped = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+            return False
+
+
+class Broker:
+    """Delivers events to the subscribers of their project in this process.
+
+    Publishers never wait: each subscriber has its own bounded queue, and
+    events published from another thread are handed to the subscriber's
+    event loop.
+    """
+
+    def __init__(self, queue_size: int = EVENTS_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+        self.delivered = 0
+        self.dropped = 0
+
+    def subscribe(self, project_id: str) -> Subscription:
+        subscription = Subscription(project_id, self.queue_size)
+        with self._lock:
+            self._subscribers[project_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.project_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.project_id]
+
+    def deliver(self, event: dict):
+        with self._lock:
+            subscribers = list(self._subscribers.get(event["project_id"], ()))
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        for subscription in subscribers:
+            if subscription.loop is current:
+                self._offer(subscription, event)
+            else:
+                try:
+                    subscription.loop.call_soon_threadsafe(self._offer, subscription, event)
+                except RuntimeError:
+                    # its loop is gone
+                    self.unsubscribe(subscription)
+
+    def _offer(self, subscription: Subscription, event: dict):
+        if subscription.offer(event):
+            self.delivered += 1
+        elif subscription.dropped:
+            self.unsubscribe(subscription)
+            self.dropped += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            subscribers = {project_id: len(subs) for project_id, subs in self._subscribers.items()}
+        return {
+            "projects": len(subscribers),
+            "subscribers": sum(subscribers.values()),
+            "delivered": self.delivered,
+            "dropped_subscribers": self.dropped,
+        }
+
+
+# ------------- Backends --------------
+
+class LocalBackend:
+    """Publishes straight to this process's broker (a single worker, tests)."""
+    name = "local"
+
+    def __init__(self, broker: Broker):
+        self.broker = broker
+
+    async def publish(self, event: dict):
+        self.broker.deliver(event)
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+class PostgresBackend:
+    """Fans events out to every worker through Postgres LISTEN/NOTIFY.
+
+    Publishing sends a NOTIFY; each worker keeps one connection LISTENing in
+    a background thread and hands what arrives to its local broker, so the
+    publishing worker receives its own events the same way.
+    """
+    name = "postgres"
+
+    def __init__(self, broker: Broker, bind=engine, channel: str = EVENTS_CHANNEL):
+        self.broker = broker
+        self.bind = bind
+        self.channel = channel
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    async def publish(self, event: dict):
+        await run_in_threadpool(self._notify, self._payload(event))
+
+    def _payload(self, event: dict) -> str:
+        payload = encode_event(event)
+        if len(payload.encode()) > NOTIFY_MAX_BYTES:
+            payload = encode_event({**{key: event[key] for key in _SLIM_FIELDS if key in event}, "truncated": True})
+        return payload
+
+    def _notify(self, payload: str):
+        with self.bind.begin() as connection:
+            connection.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": self.channel, "payload": payload})
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._listen, name="events-listener", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _listen(self):
+        while not self._stop.is_set():
+            raw = None
+            try:
+                raw = self.bind.raw_connection()
+                connection = raw.dbapi_connection
+                connection.autocommit = True
+                with connection.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.channel}"')
+                while not self._stop.is_set():
+                    if select.select([connection], [], [], 1.0) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        self.broker.deliver(json.loads(connection.notifies.pop(0).payload))
+            except Exception:
+                logger.exception("event listener lost its connection; reconnecting")
+                self._stop.wait(1.0)
+            finally:
+                if raw is not None:
+                    # the session is left LISTENing, so never hand it back to the pool
+                    raw.invalidate()
+
+
+broker = Broker()
+_backend = None
+
+
+def events_backend():
+    global _backend
+    if _backend is None:
+        if EVENTS_BACKEND == "postgres":
+            _backend = PostgresBackend(broker)
+        elif EVENTS_BACKEND == "local":
+            _backend = LocalBackend(broker)
+        else:
+            raise ValueError(f"Unknown EVENTS_BACKEND {EVENTS_BACKEND!r}; use 'local' or 'postgres'")
+    return _backend
+
+
+def start_events():
+    events_backend().start()
+
+
+def stop_events():
+    events_backend().stop()
+
+
+async def publish(project_id: str, event_type: str, data: dict):
+    """Announce a change to a project's subscribers, after it is committed.
+
+    A failure is logged rather than raised: the write already succeeded, and
+    clients recover by refetching when they reconnect.
+    """
+    try:
+        await events_backend().publish({"type": event_type, "project_id": project_id, **data})
+    except Exception:
+        logger.exception("could not publish %s for project %s", event_type, project_id)
+
+
+def publish_sync(project_id: str, event_type: str, data: dict):
+    """``publish`` for job threads, which have no event loop of their own."""
+    asyncio.run(publish(project_id, event_type, data))
+
+
+# ------------- Payloads --------------
+
+def issue_event(issue) -> dict:
+    return {
+        "id": issue.id, "title": issue.title, "status": issue.status, "priority": issue.priority,
+        "reporter_id": issue.reporter_id, "solver_id": issue.solver_id, "updated_at": issue.updated_at,
+    }
+
+
+def comment_event(comment) -> dict:
+    return {
+        "id": comment.id, "issue_id": comment.issue_id, "text": comment.text,
+        "created_by": comment.created_by, "created_at": comment.created_at,
+    }
@@ -1,6 +1,17 @@
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from passlib.context import CryptContext
+from config.settings import BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING
 
-pwd_crypt = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes below the configured cost are flagged by verify_and_update and
+# upgraded on the next successful login.
+pwd_crypt = CryptContext(
+    schemes=["bcrypt"], deprecated="auto",
+    bcrypt__rounds=BCRYPT_ROUNDS, bcrypt__min_rounds=BCRYPT_ROUNDS,
+)
 
 
 def hash_password(password: str) -> str:
@@ -8,3 +19,73 @@ def hash_password(password: str) -> str:
 
 def verify_password(plan_password: str, hash_password: str) -> bool:
     return pwd_crypt.verify(plan_password, hash_password)
+
+def verify_and_update(plan_password: str, hashed: str):
+    return pwd_crypt.verify_and_update(plan_password, hashed)
+
+
+# ------------- Off-loop hashing service --------------
+
+_pool = None
+_pending = 0
+_stats = {}
+
+
+def _get_pool():
+    global _pool
+    if _pool is None and PASSWORD_HASH_WORKERS > 0:
+        _pool = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS)
+    return _pool
+
+
+def _record(operation: str, seconds: float):
+    entry = _stats.setdefault(operation, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+    entry["count"] += 1
+    entry["total_seconds"] += seconds
+    entry["max_seconds"] = max(entry["max_seconds"], seconds)
+
+
+async def _run(operation: str, func, *args):
+    global _pending
+    if _pending >= PASSWORD_HASH_MAX_PENDING:
+        _record(f"{operation}_rejected", 0.0)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please try again.",
+            headers={"Retry-After": "1"},
+        )
+
+    _pending += 1
+    started = time.perf_counter()
+    try:
+        pool = _get_pool()
+        if pool is None:
+            return await run_in_threadpool(func, *args)
+        return await asyncio.get_running_loop().run_in_executor(pool, func, *args)
+    finally:
+        _pending -= 1
+        _record(operation, time.perf_counter() - started)
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run("hash", hash_password, password)
+
+
+async def verify_password_async(plan_password: str, hashed: str):
+    """Verify off the event loop.
+
+    Returns ``(valid, new_hash)``; ``new_hash`` is set when the stored hash
+    uses outdated cost parameters and should be replaced.
+    """
+    return await _run("verify", verify_and_update, plan_password, hashed)
+
+
+def hashing_stats() -> dict:
+    return {"pending": _pending, "workers": PASSWORD_HASH_WORKERS, "operations": {k: dict(v) for k, v in _stats.items()}}
+
+
+def shutdown_hashing():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
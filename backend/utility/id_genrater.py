@@ -1,20 +1,88 @@
-import uuid
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
 
-def idGenrate():
-    id = str(uuid.uuid4()).split("-")[0].upper()
-    return id
+# ULID layout: 48-bit millisecond timestamp + 80 random bits, written as 26
+# Crockford base32 characters. Ids sort by creation time as plain strings, so
+# new rows land at the right-hand edge of the primary key index instead of
+# being scattered across it, and 80 random bits per millisecond won't collide.
+ID_LENGTH = 26
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_RANDOM_BITS = 80
+_RANDOM_MAX = (1 << _RANDOM_BITS) - 1
+
+_lock = threading.Lock()
+_last_ms = 0
+_last_random = 0
+
+
+def _encode(value: int) -> str:
+    chars = []
+    for _ in range(ID_LENGTH):
+        value, digit = divmod(value, 32)
+        chars.append(_ALPHABET[digit])
+    return "".join(reversed(chars))
+
+
+def _random() -> int:
+    return int.from_bytes(os.urandom(10), "big")
+
+
+def new_id(created_at: Optional[datetime] = None) -> str:
+    """Time-ordered, collision-free id.
 
+    Ids made in the same millisecond by this process keep increasing (the
+    random part is incremented), so they sort in creation order. Passing
+    ``created_at`` builds an id for that moment instead, e.g. when migrating
+    existing rows.
+    """
+    global _last_ms, _last_random
+
+    if created_at is not None:
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        return _encode((int(created_at.timestamp() * 1000) << _RANDOM_BITS) | _random())
+
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms <= _last_ms:
+            now_ms = _last_ms
+            _last_random += 1
+            if _last_random > _RANDOM_MAX:
+                now_ms += 1
+                _last_random = _random()
+        else:
+            _last_random = _random()
+        _last_ms = now_ms
+        return _encode((now_ms << _RANDOM_BITS) | _last_random)
+
+
+def id_timestamp(value: str) -> Optional[datetime]:
+    """Creation time encoded in an id, or None for ids from the old scheme."""
+    if len(value) != ID_LENGTH:
+        return None
+    number = 0
+    for char in value.upper():
+        index = _ALPHABET.find(char)
+        if index < 0:
+            return None
+        number = number * 32 + index
+    return datetime.fromtimestamp((number >> _RANDOM_BITS) / 1000, timezone.utc)
+
+
+def idGenrate():
+    return new_id()
 
 
 def projectIdGenrator():
-    id = str(uuid.uuid4()).split("-")[4].upper()
-    return id
+    return new_id()
 
 
 def issuesIdGenrator():
-    id = str(uuid.uuid4()).split("-")[1]
-    return id
+    return new_id()
+
 
 def commentIdGenrator():
-    id = str(uuid.uuid4()).split("-")[2]
-    return id
+    return new_id()
@@ -0,0 +1,66 @@
+from typing import Callable, Optional
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from config.db import engine
+from models.models import Issue, Comment, ArchivedIssue, ArchivedComment
+from utility.id_genrater import ID_LENGTH, new_id
+
+# table -> columns in other tables that reference its id
+MIGRATABLE = {
+    "issues": (Issue.__table__, [Comment.__table__.c.issue_id]),
+    "comments": (Comment.__table__, []),
+    # archived rows are listed alongside live ones, so they need the same ids
+    "issues_archive": (ArchivedIssue.__table__, [ArchivedComment.__table__.c.issue_id]),
+    "comments_archive": (ArchivedComment.__table__, []),
+}
+
+
+def legacy_count(connection, table) -> int:
+    return connection.scalar(select(func.count()).select_from(table).where(func.length(table.c.id) != ID_LENGTH))
+
+
+def _migrate_batch(connection, table, references, batch_size: int) -> int:
+    rows = connection.execute(
+        select(table).where(func.length(table.c.id) != ID_LENGTH).order_by(table.c.created_at, table.c.id).limit(batch_size)
+    ).mappings().all()
+    if not rows:
+        return 0
+
+    mapping = [{"old_id": row["id"], "new_id": new_id(row["created_at"])} for row in rows]
+    new_ids = {item["old_id"]: item["new_id"] for item in mapping}
+
+    # copy, repoint, delete: foreign keys stay valid at every step
+    connection.execute(insert(table), [{**row, "id": new_ids[row["id"]]} for row in rows])
+    for column in references:
+        connection.execute(
+            update(column.table).where(column == bindparam("old_id")).values({column.key: bindparam("new_id")}),
+            mapping,
+        )
+    connection.execute(delete(table).where(table.c.id.in_(list(new_ids))))
+    return len(rows)
+
+
+def migrate_ids(
+    tables=tuple(MIGRATABLE),
+    batch_size: int = 1000,
+    bind=engine,
+    on_progress: Optional[Callable[[str, int], None]] = None,
+) -> dict:
+    """Give rows with old-style ids a time-ordered id built from created_at.
+
+    Runs in one transaction; rows that already have a new id are skipped,
+    so it can be rerun safely. Stop the app first: cached lookups and
+    clients holding the old ids won't follow the change.
+    """
+    migrated = {}
+    with bind.begin() as connection:
+        for name in tables:
+            table, references = MIGRATABLE[name]
+            migrated[name] = 0
+            while True:
+                count = _migrate_batch(connection, table, references, batch_size)
+                if not count:
+                    break
+                migrated[name] += count
+                if on_progress:
+                    on_progress(name, migrated[name])
+    return migrated
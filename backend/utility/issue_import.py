@@ -0,0 +1,141 @@
+import csv
+import io
+import json
+import os
+from typing import Callable, Iterator, Optional, TextIO
+from sqlalchemy import insert
+from config.db import engine
+from config.settings import IMPORT_CHUNK_SIZE, IMPORT_MAX_REJECTS
+from models.models import Issue, Project
+from schemas.issues import parse_issue_payload
+from utility.id_genrater import issuesIdGenrator
+from utility.issue_stats import record_issue_changes_sync
+from utility.etag import bump_sync
+from utility.jobs import job_type
+
+IMPORT_COLUMNS = ["id", "title", "description", "priority", "status", "project_id", "reporter_id"]
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str] = None) -> str:
+    name = (filename or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or (content_type or "").endswith("ndjson"):
+        return "ndjson"
+    return "csv"
+
+
+def iter_records(text: TextIO, fmt: str) -> Iterator[tuple[int, Optional[dict], Optional[str]]]:
+    """Yield ``(line_number, record, error)`` one row at a time."""
+    if fmt == "ndjson":
+        for line_no, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                yield line_no, None, f"Invalid JSON: {exc}"
+                continue
+            if not isinstance(record, dict):
+                yield line_no, None, "Expected a JSON object."
+                continue
+            yield line_no, record, None
+    else:
+        reader = csv.DictReader(text)
+        for record in reader:
+            # drop empty cells so optional fields fall back to their defaults
+            yield reader.line_num, {key: value for key, value in record.items() if key and value not in ("", None)}, None
+
+
+def _copy_rows(connection, rows: list[dict]):
+    """Load rows with COPY ... FROM STDIN through the psycopg2 connection."""
+    buffer = io.StringIO()
+    # COPY reads an unquoted empty field as NULL; quote every field so an
+    # empty description stays an empty string
+    writer = csv.writer(buffer, quoting=csv.QUOTE_ALL)
+    for row in rows:
+        writer.writerow([row[column] for column in IMPORT_COLUMNS])
+    buffer.seek(0)
+
+    with connection.connection.dbapi_connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY issues ({', '.join(IMPORT_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def _write_rows(connection, rows: list[dict]):
+    if connection.dialect.name == "postgresql" and connection.dialect.driver == "psycopg2":
+        _copy_rows(connection, rows)
+    else:
+        connection.execute(insert(Issue.__table__), rows)
+
+
+def import_issues(
+    text: TextIO,
+    fmt: str,
+    project_id: str,
+    reporter_id: str,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    on_progress: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """Stream-import issues into a project in one transaction.
+
+    Rows are validated against ``IssuesIn`` and written ``chunk_size`` at a time,
+    so only one chunk is ever held in memory. Invalid rows are reported back,
+    up to ``IMPORT_MAX_REJECTS`` of them, without stopping the import.
+    """
+    report = {"processed": 0, "inserted": 0, "rejected": 0, "rejects": []}
+
+    def reject(line_no: int, error: str):
+        report["rejected"] += 1
+        if len(report["rejects"]) < IMPORT_MAX_REJECTS:
+            report["rejects"].append({"line": line_no, "error": error})
+
+    with engine.begin() as connection:
+        chunk = []
+        for line_no, record, error in iter_records(text, fmt):
+            report["processed"] += 1
+            if error is None:
+                data, error = parse_issue_payload(record)
+            if error:
+                reject(line_no, error)
+                continue
+
+            chunk.append(data)
+            if len(chunk) >= chunk_size:
+                _flush(connection, chunk, project_id, reporter_id, report, on_progress)
+                chunk = []
+
+        _flush(connection, chunk, project_id, reporter_id, report, on_progress)
+
+    return report
+
+
+def _flush(connection, chunk: list, project_id: str, reporter_id: str, report: dict, on_progress):
+    if chunk:
+        # created_at / updated_at come from the column defaults
+        rows = [{
+            "id": issuesIdGenrator(),
+            "title": data.title,
+            "description": data.description,
+            "priority": data.priority or "low",
+            "status": data.status or "open",
+            "project_id": project_id,
+            "reporter_id": reporter_id,
+        } for data in chunk]
+        _write_rows(connection, rows)
+        record_issue_changes_sync(connection, project_id, [(None, (row["status"], row["priority"])) for row in rows])
+        bump_sync(connection, Project.issues_revision, project_id)
+        report["inserted"] += len(chunk)
+
+    if on_progress:
+        on_progress({key: value for key, value in report.items() if key != "rejects"})
+
+
+@job_type("import_issues", concurrency=2)
+def import_issues_file(path: str, fmt: str, project_id: str, reporter_id: str, on_progress=None) -> dict:
+    """Job: import an upload saved by the import route.
+
+    The file is removed once the import commits; a failed one is kept in
+    ``JOBS_FILES_DIR`` for a retry or a look.
+    """
+    with open(path, encoding="utf-8", newline="") as text:
+        report = import_issues(text, fmt, project_id, reporter_id, on_progress=on_progress)
+    os.remove(path)
+    return report
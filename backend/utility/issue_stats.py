@@ -0,0 +1,160 @@
+from collections import Counter
+from typing import Callable, Iterable, Optional
+from sqlalchemy import select, delete, insert, update, func, and_, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from config.db import engine
+from config.settings import ISSUE_STATS_TABLE
+from models.models import Project, Issue, IssueStats, status_enum, priority_enum
+from utility.jobs import job_type
+
+# (status, priority) of an issue before/after a write; None when it doesn't exist
+StatKey = Optional[tuple[str, str]]
+
+
+# ------------- Summary table maintenance --------------
+
+def _delta_rows(project_id: str, changes: Iterable[tuple[StatKey, StatKey]]) -> list[dict]:
+    deltas = Counter()
+    for old, new in changes:
+        if old:
+            deltas[old] -= 1
+        if new:
+            deltas[new] += 1
+    return [
+        {"project_id": project_id, "status": status, "priority": priority, "issue_count": delta}
+        for (status, priority), delta in deltas.items()
+        if delta and status and priority
+    ]
+
+
+def _upsert(dialect: str):
+    """One INSERT ... ON CONFLICT for all delta rows, where the dialect has it."""
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+
+    statement = dialect_insert(IssueStats.__table__)
+    return statement.on_conflict_do_update(
+        index_elements=["project_id", "status", "priority"],
+        set_={"issue_count": IssueStats.__table__.c.issue_count + statement.excluded.issue_count},
+    )
+
+
+def _add_to_count(row: dict):
+    table = IssueStats.__table__
+    return update(table).where(
+        table.c.project_id == row["project_id"], table.c.status == row["status"], table.c.priority == row["priority"],
+    ).values(issue_count=table.c.issue_count + row["issue_count"])
+
+
+async def record_issue_changes(db: AsyncSession, project_id: str, changes: Iterable[tuple[StatKey, StatKey]]):
+    """Apply issue writes to issue_stats inside the caller's transaction."""
+    if not ISSUE_STATS_TABLE:
+        return
+    rows = _delta_rows(project_id, changes)
+    if not rows:
+        return
+    statement = _upsert(engine.dialect.name)
+    if statement is not None:
+        await db.execute(statement, rows)
+        return
+    # no upsert on this backend: UPDATE the counter, INSERT it when it isn't there yet
+    for row in rows:
+        if (await db.execute(_add_to_count(row))).rowcount == 0:
+            await db.execute(insert(IssueStats.__table__), row)
+
+
+def record_issue_changes_sync(connection, project_id: str, changes: Iterable[tuple[StatKey, StatKey]]):
+    """Same as record_issue_changes, for code running on a sync connection."""
+    if not ISSUE_STATS_TABLE:
+        return
+    rows = _delta_rows(project_id, changes)
+    if not rows:
+        return
+    statement = _upsert(connection.dialect.name)
+    if statement is not None:
+        connection.execute(statement, rows)
+        return
+    for row in rows:
+        if connection.execute(_add_to_count(row)).rowcount == 0:
+            connection.execute(insert(IssueStats.__table__), row)
+
+
+_REBUILD = """
+    INSERT INTO issue_stats (project_id, status, priority, issue_count)
+    SELECT project_id, status, priority, count(*) FROM issues
+    WHERE project_id IS NOT NULL AND status IS NOT NULL AND priority IS NOT NULL
+    GROUP BY project_id, status, priority
+"""
+
+
+@job_type("recount_issue_stats", concurrency=1)
+def recount_issue_stats(bind=engine, on_progress: Optional[Callable[[dict], None]] = None) -> dict:
+    """Rebuild issue_stats from the issues table in one transaction."""
+    with bind.begin() as connection:
+        connection.execute(delete(IssueStats))
+        rows = connection.execute(text(_REBUILD)).rowcount
+    return {"rows": rows}
+
+
+def install_issue_stats(bind=engine):
+    """Recount issue_stats from the issues table when the summary is enabled.
+
+    Runs once at startup so counts are right even if the table was switched
+    off for a while or rows were written behind the app's back; admins can
+    queue the same recount as a job later.
+    """
+    if not ISSUE_STATS_TABLE:
+        return
+    recount_issue_stats(bind)
+
+
+# ------------- Reads --------------
+
+def _empty_stats(project_id: str) -> dict:
+    return {
+        "project_id": project_id,
+        "total": 0,
+        "by_status": dict.fromkeys(status_enum.enums, 0),
+        "by_priority": dict.fromkeys(priority_enum.enums, 0),
+        "by_status_priority": {status: dict.fromkeys(priority_enum.enums, 0) for status in status_enum.enums},
+    }
+
+
+async def issue_counts(db: AsyncSession, project_ids) -> list[dict]:
+    """Issue counts by status and priority for each of ``project_ids``.
+
+    ``project_ids`` may be a list or a subquery of ids. One GROUP BY over the
+    issues (or one read of issue_stats), outer joined so empty projects show
+    up with zero counts.
+    """
+    if ISSUE_STATS_TABLE:
+        source = IssueStats
+        count = func.coalesce(func.sum(IssueStats.issue_count), 0)
+        join = and_(IssueStats.project_id == Project.id, IssueStats.issue_count > 0)
+    else:
+        source = Issue
+        count = func.count(Issue.id)
+        join = Issue.project_id == Project.id
+
+    rows = (await db.execute(
+        select(Project.id, source.status, source.priority, count)
+        .outerjoin(source, join)
+        .where(Project.id.in_(project_ids))
+        .group_by(Project.id, source.status, source.priority)
+        .order_by(Project.id)
+    )).all()
+
+    stats = {}
+    for project_id, status, priority, issue_count in rows:
+        entry = stats.setdefault(project_id, _empty_stats(project_id))
+        if not issue_count or status is None or priority is None:
+            continue
+        entry["total"] += issue_count
+        entry["by_status"][status] += issue_count
+        entry["by_priority"][priority] += issue_count
+        entry["by_status_priority"][status][priority] += issue_count
+    return list(stats.values())
@@ -0,0 +1,312 @@
+import logging
+import os
+import shutil
+import socket
+import tempfile
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO, Callable, Optional
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from config.db import engine
+from config.settings import (
+    JOBS_WORKERS, JOBS_POLL_SECONDS, JOBS_RETRY_BASE_SECONDS, JOBS_RETRY_MAX_SECONDS,
+    JOBS_STALE_SECONDS, JOBS_RETENTION_DAYS, JOBS_FILES_DIR,
+)
+from models.models import Job
+from utility.id_genrater import new_id
+
+logger = logging.getLogger(__name__)
+
+jobs = Job.__table__
+
+
+@dataclass
+class JobType:
+    kind: str
+    func: Callable
+    # jobs of this kind run at once in one process
+    concurrency: int = 1
+    max_attempts: int = 3
+
+
+JOB_TYPES: dict[str, JobType] = {}
+
+
+def job_type(kind: str, concurrency: int = 1, max_attempts: int = 3):
+    """Register a blocking ``func(**payload, on_progress=...)`` as a job kind.
+
+    Its return value (JSON) becomes the job's result; an exception is
+    retried with backoff until ``max_attempts`` is reached.
+    """
+    def register(func):
+        JOB_TYPES[kind] = JobType(kind, func, concurrency, max_attempts)
+        return func
+    return register
+
+
+def _now() -> datetime:
+    # naive UTC, like the timestamp columns
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+# ------------- Enqueueing --------------
+
+def _new_row(kind: str, owner_id: Optional[str], payload: dict) -> dict:
+    return {
+        "id": new_id(), "kind": kind, "owner_id": owner_id, "status": "queued", "payload": payload,
+        "attempts": 0, "max_attempts": JOB_TYPES[kind].max_attempts,
+    }
+
+
+async def enqueue(db: AsyncSession, kind: str, owner_id: Optional[str], payload: dict) -> str:
+    """Record a job and commit, so it survives a restart; returns its id."""
+    row = _new_row(kind, owner_id, payload)
+    await db.execute(insert(jobs), [row])
+    await db.commit()
+    runner.wake()
+    return row["id"]
+
+
+def enqueue_sync(kind: str, owner_id: Optional[str], payload: dict, bind=engine) -> str:
+    row = _new_row(kind, owner_id, payload)
+    with bind.begin() as connection:
+        connection.execute(insert(jobs), [row])
+    runner.wake()
+    return row["id"]
+
+
+def save_job_file(source: BinaryIO, suffix: str = "") -> str:
+    """Copy an upload somewhere a worker can read it after the request is gone."""
+    os.makedirs(JOBS_FILES_DIR, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=JOBS_FILES_DIR, suffix=suffix, delete=False) as target:
+        shutil.copyfileobj(source, target)
+    return target.name
+
+
+async def get_job(db: AsyncSession, job_id: str) -> Optional[Job]:
+    return await db.get(Job, job_id)
+
+
+# ------------- Workers --------------
+
+class JobRunner:
+    """Worker threads that claim due jobs from the jobs table and run them.
+
+    Any number of app processes can share the table: a job is claimed with a
+    conditional UPDATE, so it runs once. The per-kind concurrency limits are
+    per process. A housekeeping thread
+    heartbeats this process's running jobs, requeues jobs whose worker died
+    and prunes old finished ones.
+    """
+
+    def __init__(self, workers: int = JOBS_WORKERS, bind=engine, poll_seconds: float = JOBS_POLL_SECONDS):
+        self.workers = workers
+        self.bind = bind
+        self.poll_seconds = poll_seconds
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self._running = Counter()
+        # latest progress per running job; the housekeeping thread writes
+        # out the ones that changed
+        self._progress: dict[str, dict] = {}
+        self._changed: set[str] = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def start(self):
+        if self._threads or self.workers <= 0:
+            return
+        self._stop.clear()
+        self._threads = [threading.Thread(target=self._housekeeping, name="job-housekeeping", daemon=True)]
+        self._threads += [threading.Thread(target=self._work, name=f"job-worker-{n}", daemon=True) for n in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = 10):
+        """Stop claiming work and wait for running jobs; ones still going are
+        picked up again once their heartbeat goes stale."""
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def wake(self):
+        self._wake.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            running = {kind: count for kind, count in self._running.items() if count}
+        return {"worker": self.name, "threads": len(self._threads), "running": running}
+
+    # slots for the per-kind concurrency limit
+    def _reserve(self, kind: str) -> bool:
+        with self._lock:
+            if kind not in JOB_TYPES or self._running[kind] >= JOB_TYPES[kind].concurrency:
+                return False
+            self._running[kind] += 1
+            return True
+
+    def _release(self, kind: str):
+        with self._lock:
+            self._running[kind] -= 1
+
+    def _free_kinds(self) -> list[str]:
+        with self._lock:
+            return [kind for kind, spec in JOB_TYPES.items() if self._running[kind] < spec.concurrency]
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                job = self._claim()
+            except Exception:
+                logger.exception("could not claim a job")
+                job = None
+            if job is None:
+                self._wake.wait(self.poll_seconds)
+                self._wake.clear()
+                continue
+            try:
+                self._run(job)
+            except Exception:
+                # the outcome couldn't be recorded; the job is requeued once
+                # its heartbeat goes stale
+                logger.exception("could not record the outcome of job %s", job["id"])
+            finally:
+                self._release(job["kind"])
+
+    def _claim(self) -> Optional[dict]:
+        kinds = self._free_kinds()
+        if not kinds:
+            return None
+        now = _now()
+        with self.bind.connect() as connection:
+            due = connection.execute(
+                select(jobs.c.id, jobs.c.kind)
+                .where(jobs.c.status == "queued", jobs.c.run_after <= now, jobs.c.kind.in_(kinds))
+                .order_by(jobs.c.run_after, jobs.c.id)
+                .limit(10)
+            ).all()
+        # each claim is one conditional UPDATE of its own: whichever worker
+        # flips the row to running first owns it, and no transaction reads
+        # before it writes (which SQLite would refuse as a lock upgrade)
+        for job_id, kind in due:
+            if not self._reserve(kind):
+                continue
+            try:
+                with self.bind.begin() as connection:
+                    claimed = connection.execute(
+                        update(jobs)
+                        .where(jobs.c.id == job_id, jobs.c.status == "queued")
+                        .values(status="running", locked_by=self.name, attempts=jobs.c.attempts + 1, started_at=now, heartbeat_at=now)
+                        .returning(jobs.c.id, jobs.c.kind, jobs.c.payload, jobs.c.attempts, jobs.c.max_attempts)
+                    ).first()
+            except Exception:
+                self._release(kind)
+                raise
+            if claimed:
+                return claimed._asdict()
+            self._release(kind)
+        return None
+
+    def _finish(self, job_id: str, **values):
+        with self.bind.begin() as connection:
+            connection.execute(
+                update(jobs).where(jobs.c.id == job_id, jobs.c.locked_by == self.name).values(**values)
+            )
+
+    def _run(self, job: dict):
+        spec = JOB_TYPES[job["kind"]]
+
+        def on_progress(progress: dict):
+            # never written from here: the job may be holding a transaction
+            # open, and on SQLite a second writer would wait on it
+            with self._lock:
+                self._progress[job["id"]] = progress
+                self._changed.add(job["id"])
+
+        try:
+            result = spec.func(**job["payload"], on_progress=on_progress)
+        except Exception as exc:
+            logger.exception("job %s (%s) failed, attempt %s of %s", job["id"], job["kind"], job["attempts"], job["max_attempts"])
+            if job["attempts"] < job["max_attempts"]:
+                delay = min(JOBS_RETRY_MAX_SECONDS, JOBS_RETRY_BASE_SECONDS * 2 ** (job["attempts"] - 1))
+                self._finish(job["id"], status="queued", error=str(exc), locked_by=None, run_after=_now() + timedelta(seconds=delay))
+            else:
+                self._finish(job["id"], status="failed", error=str(exc), locked_by=None, finished_at=_now())
+        else:
+            with self._lock:
+                progress = self._progress.get(job["id"])
+            self._finish(job["id"], status="succeeded", result=result, progress=progress, error=None, locked_by=None, finished_at=_now())
+        finally:
+            with self._lock:
+                self._progress.pop(job["id"], None)
+                self._changed.discard(job["id"])
+
+    def _housekeeping(self):
+        interval = max(self.poll_seconds, min(30.0, JOBS_STALE_SECONDS / 3))
+        last = None
+        while not self._stop.is_set():
+            try:
+                self.flush_progress()
+                if last is None or (_now() - last).total_seconds() >= interval:
+                    last = _now()
+                    self.housekeep()
+            except Exception as exc:
+                logger.warning("job housekeeping failed: %s", exc)
+            self._stop.wait(self.poll_seconds)
+
+    def flush_progress(self):
+        with self._lock:
+            pending = {job_id: self._progress[job_id] for job_id in self._changed}
+            self._changed.clear()
+        if not pending:
+            return
+        now = _now()
+        with self.bind.begin() as connection:
+            for job_id, progress in pending.items():
+                connection.execute(
+                    update(jobs)
+                    .where(jobs.c.id == job_id, jobs.c.status == "running", jobs.c.locked_by == self.name)
+                    .values(progress=progress, heartbeat_at=now)
+                )
+
+    def housekeep(self):
+        now = _now()
+        stale = jobs.c.heartbeat_at < now - timedelta(seconds=JOBS_STALE_SECONDS)
+        running_elsewhere = (jobs.c.status == "running") & (jobs.c.locked_by != self.name)
+        with self.bind.begin() as connection:
+            connection.execute(
+                update(jobs).where(jobs.c.status == "running", jobs.c.locked_by == self.name).values(heartbeat_at=now)
+            )
+            requeued = connection.execute(
+                update(jobs).where(running_elsewhere, stale, jobs.c.attempts < jobs.c.max_attempts)
+                .values(status="queued", locked_by=None, run_after=now, error="worker stopped responding")
+            ).rowcount
+            connection.execute(
+                update(jobs).where(running_elsewhere, stale)
+                .values(status="failed", locked_by=None, finished_at=now, error="worker stopped responding")
+            )
+            connection.execute(
+                delete(jobs).where(
+                    jobs.c.status.in_(["succeeded", "failed"]),
+                    jobs.c.finished_at < now - timedelta(days=JOBS_RETENTION_DAYS),
+                )
+            )
+        if requeued:
+            self.wake()
+
+
+runner = JobRunner()
+
+
+def start_job_workers():
+    runner.start()
+
+
+def stop_job_workers():
+    runner.stop()
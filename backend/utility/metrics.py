@@ -0,0 +1,271 @@
+import bisect
+import threading
+import time
+from collections import defaultdict
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import event
+from config.db import pool_engines
+from config.pool import WAIT_BUCKETS, pool_status
+
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+SQL_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "BEGIN", "COMMIT", "ROLLBACK", "COPY"}
+
+
+# ------------- Registry --------------
+# Every thread writes to its own shard, so recording never takes a lock;
+# a scrape sums the shards. Shards are only registered (under a lock) the
+# first time a thread records something.
+
+class _Shard:
+    def __init__(self):
+        self.counters = defaultdict(float)
+        # (name, labels) -> [bucket counts..., +Inf count], and the running sums
+        self.histograms = {}
+        self.sums = defaultdict(float)
+
+
+class Registry:
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()
+        self.buckets = {}
+        self.help = {}
+        self.in_flight = 0
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def describe(self, name: str, help_text: str, buckets: tuple = None):
+        self.help[name] = help_text
+        if buckets is not None:
+            self.buckets[name] = buckets
+
+    def inc(self, name: str, labels: tuple, amount: float = 1):
+        self._shard().counters[(name, labels)] += amount
+
+    def observe(self, name: str, labels: tuple, value: float):
+        shard = self._shard()
+        buckets = self.buckets[name]
+        key = (name, labels)
+        counts = shard.histograms.get(key)
+        if counts is None:
+            counts = shard.histograms[key] = [0] * (len(buckets) + 1)
+        counts[bisect.bisect_left(buckets, value)] += 1
+        shard.sums[key] += value
+
+    def collect(self) -> tuple[dict, dict, dict]:
+        counters, histograms, sums = defaultdict(float), {}, defaultdict(float)
+        with self._lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for key, value in list(shard.counters.items()):
+                counters[key] += value
+            for key, counts in list(shard.histograms.items()):
+                merged = histograms.setdefault(key, [0] * len(counts))
+                for index, count in enumerate(list(counts)):
+                    merged[index] += count
+            for key, value in list(shard.sums.items()):
+                sums[key] += value
+        return counters, histograms, sums
+
+    def reset(self):
+        with self._lock:
+            for shard in self._shards:
+                shard.counters.clear()
+                shard.histograms.clear()
+                shard.sums.clear()
+
+
+registry = Registry()
+registry.describe("http_requests_total", "HTTP requests by router, route, method and status.")
+registry.describe("http_request_duration_seconds", "HTTP request latency by router, route and method.", HTTP_BUCKETS)
+registry.describe("db_statements_total", "SQL statements executed, by engine and operation.")
+registry.describe("db_statement_errors_total", "SQL statements that raised, by engine and operation.")
+registry.describe("db_statement_duration_seconds", "SQL statement execution time, by engine and operation.", DB_BUCKETS)
+
+
+# ------------- HTTP middleware --------------
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: request counts, latency and in-flight gauge.
+
+    Routes are labelled by their path template and the router's tag, so label
+    cardinality stays bounded whatever ids appear in the URLs.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        registry.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            registry.in_flight -= 1
+            router, route = route_labels(scope)
+            registry.inc("http_requests_total", (router, route, scope["method"], str(status_code)))
+            registry.observe("http_request_duration_seconds", (router, route, scope["method"]), elapsed)
+
+
+def route_labels(scope) -> tuple[str, str]:
+    route = scope.get("route")
+    if route is None:
+        return "none", "unmatched"
+    tags = getattr(route, "tags", None)
+    return (tags[0].lower() if tags else "app"), route.path
+
+
+# ------------- SQLAlchemy hooks --------------
+
+def _operation(statement: str) -> str:
+    head = statement.lstrip()[:10].split(None, 1)
+    operation = head[0].upper() if head else ""
+    return operation if operation in SQL_OPERATIONS else "OTHER"
+
+
+def _instrument_engine(name: str, engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        labels = (name, _operation(statement))
+        registry.inc("db_statements_total", labels)
+        registry.observe("db_statement_duration_seconds", labels, time.perf_counter() - context._metrics_start)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        registry.inc("db_statement_errors_total", (name, _operation(exception_context.statement or "")))
+
+
+_instrumented = set()
+
+
+def install_db_metrics():
+    for name, engine in pool_engines().items():
+        if name not in _instrumented:
+            _instrument_engine(name, engine)
+            _instrumented.add(name)
+
+
+# ------------- Exposition --------------
+
+LABEL_NAMES = {
+    "http_requests_total": ("router", "route", "method", "status"),
+    "http_request_duration_seconds": ("router", "route", "method"),
+    "db_statements_total": ("engine", "operation"),
+    "db_statement_errors_total": ("engine", "operation"),
+    "db_statement_duration_seconds": ("engine", "operation"),
+}
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+def _histogram_lines(name, label_names, labels, buckets, counts, total) -> list[str]:
+    lines, cumulative = [], 0
+    for bound, count in zip(tuple(buckets) + (float("inf"),), counts):
+        cumulative += count
+        le = 'le="%s"' % _format_bound(bound)
+        lines.append(f"{name}_bucket{_labels(label_names, labels, le)} {cumulative}")
+    lines.append(f"{name}_sum{_labels(label_names, labels)} {total}")
+    lines.append(f"{name}_count{_labels(label_names, labels)} {cumulative}")
+    return lines
+
+
+def _pool_lines() -> list[str]:
+    lines = [
+        "# HELP db_pool_checked_out Connections currently checked out of the pool.",
+        "# TYPE db_pool_checked_out gauge",
+    ]
+    pools = {name: pool_status(engine.pool) for name, engine in pool_engines().items()}
+    for name, status in pools.items():
+        if "checked_out" in status:
+            lines.append(f'db_pool_checked_out{{engine="{name}"}} {status["checked_out"]}')
+    lines += ["# HELP db_pool_overflow Connections open beyond pool_size.", "# TYPE db_pool_overflow gauge"]
+    for name, status in pools.items():
+        if "overflow" in status:
+            lines.append(f'db_pool_overflow{{engine="{name}"}} {status["overflow"]}')
+    lines += ["# HELP db_pool_checkout_timeouts_total Checkouts that gave up waiting for a connection.", "# TYPE db_pool_checkout_timeouts_total counter"]
+    for name, status in pools.items():
+        if "checkout_timeouts" in status:
+            lines.append(f'db_pool_checkout_timeouts_total{{engine="{name}"}} {status["checkout_timeouts"]}')
+    lines += ["# HELP db_pool_wait_seconds Time spent waiting to check out a connection.", "# TYPE db_pool_wait_seconds histogram"]
+    for name, status in pools.items():
+        if "wait_seconds_buckets" in status:
+            cumulative = list(status["wait_seconds_buckets"].values())
+            counts = [cumulative[0]] + [b - a for a, b in zip(cumulative, cumulative[1:])]
+            lines += _histogram_lines("db_pool_wait_seconds", ("engine",), (name,), WAIT_BUCKETS, counts, status["wait_seconds_sum"])
+    return lines
+
+
+def render() -> str:
+    """The registry, in-flight gauge and pool gauges in Prometheus text format."""
+    counters, histograms, sums = registry.collect()
+    lines = [
+        "# HELP http_requests_in_flight HTTP requests currently being served.",
+        "# TYPE http_requests_in_flight gauge",
+        f"http_requests_in_flight {registry.in_flight}",
+    ]
+
+    for name, help_text in registry.help.items():
+        label_names = LABEL_NAMES[name]
+        is_histogram = name in registry.buckets
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {'histogram' if is_histogram else 'counter'}")
+        if is_histogram:
+            for (metric, labels), counts in sorted(histograms.items()):
+                if metric == name:
+                    lines += _histogram_lines(name, label_names, labels, registry.buckets[name], counts, sums[(metric, labels)])
+        else:
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_labels(label_names, labels)} {int(value) if value.is_integer() else value}")
+
+    lines += _pool_lines()
+    return "\n".join(lines) + "\n"
+
+
+def install_metrics(app: FastAPI):
+    """Add the metrics middleware, DB hooks and ``GET /metrics`` to an app."""
+    install_db_metrics()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return PlainTextResponse(render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,111 @@
+from typing import Optional
+from sqlalchemy import select, exists, or_, and_, union
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.models import Project, Issue, ArchivedIssue, project_members
+from utility.cache import LRUCache
+from config.settings import AUTHZ_CACHE_SIZE, AUTHZ_CACHE_TTL
+
+
+# (project_id, user_id) -> bool
+_access_cache = LRUCache(AUTHZ_CACHE_SIZE, ttl=AUTHZ_CACHE_TTL)
+# issue_id -> project_id
+_issue_project_cache = LRUCache(AUTHZ_CACHE_SIZE, ttl=AUTHZ_CACHE_TTL)
+
+
+def _access_clause(user_id: str):
+    """Creator-or-member test against the project row in the enclosing query."""
+    is_member = exists().where(
+        and_(project_members.c.project_id == Project.id, project_members.c.user_id == user_id)
+    )
+    return or_(Project.created_by == user_id, is_member)
+
+
+def _cacheable(db: AsyncSession) -> bool:
+    # a lagging replica may not have the latest membership change yet
+    return not db.sync_session.info.get("replica")
+
+
+def user_project_ids(user_id: str):
+    """Ids of the projects a user created or is a member of, as one UNION."""
+    return union(
+        select(Project.id).where(Project.created_by == user_id),
+        select(project_members.c.project_id).where(project_members.c.user_id == user_id),
+    )
+
+
+async def can_access_project(db: AsyncSession, project_id: str, user_id: str) -> Optional[bool]:
+    """Return whether the user created or is a member of the project.
+
+    ``None`` means the project does not exist.
+    """
+    allowed = _access_cache.get((project_id, user_id))
+    if allowed is not None:
+        return allowed
+
+    row = (await db.execute(
+        select(_access_clause(user_id)).where(Project.id == project_id)
+    )).first()
+
+    if row is None:
+        return None
+
+    allowed = bool(row[0])
+    if _cacheable(db):
+        _access_cache.set((project_id, user_id), allowed)
+    return allowed
+
+
+async def issue_access(db: AsyncSession, issue_id: str, user_id: str, include_archived: bool = False) -> tuple[Optional[str], Optional[bool]]:
+    """Resolve an issue to its project and check access in one round trip.
+
+    Returns ``(project_id, allowed)``: ``(None, None)`` when the issue does not
+    exist and ``(project_id, None)`` when its project is missing. Archived
+    issues are found too with ``include_archived``.
+    """
+    project_id = _issue_project_cache.get(issue_id)
+    if project_id is not None:
+        allowed = _access_cache.get((project_id, user_id))
+        if allowed is not None:
+            return project_id, allowed
+
+    sources = [Issue, ArchivedIssue] if include_archived else [Issue]
+    for source in sources:
+        row = (await db.execute(
+            select(source.project_id, Project.id, _access_clause(user_id))
+            .outerjoin(Project, Project.id == source.project_id)
+            .where(source.id == issue_id)
+        )).first()
+        if row is not None:
+            break
+
+    if row is None:
+        return None, None
+
+    project_id, found_project, allowed = row
+    if found_project is None:
+        return project_id, None
+
+    allowed = bool(allowed)
+    if _cacheable(db):
+        if source is Issue:
+            # archived issues aren't cached: a cache hit means "live issue"
+            _issue_project_cache.set(issue_id, project_id)
+        _access_cache.set((project_id, user_id), allowed)
+    return project_id, allowed
+
+
+def invalidate_member(project_id: str, user_id: str):
+    _access_cache.pop((project_id, user_id))
+
+
+def invalidate_project(project_id: str):
+    _access_cache.discard_where(lambda key: key[0] == project_id)
+
+
+def invalidate_issue(issue_id: str):
+    _issue_project_cache.pop(issue_id)
+
+
+def clear_cache():
+    _access_cache.clear()
+    _issue_project_cache.clear()
@@ -0,0 +1,162 @@
+import re
+from typing import Optional
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from config.db import Base, engine
+
+
+# ------------- Schema --------------
+
+# PostgreSQL: generated tsvector columns with GIN indexes (PG 12+).
+_POSTGRES_DDL = [
+    """ALTER TABLE issues ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_issues_search_vector ON issues USING GIN (search_vector)",
+    """ALTER TABLE comments ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        to_tsvector('english', coalesce(text, ''))
+    ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_comments_search_vector ON comments USING GIN (search_vector)",
+]
+
+# SQLite: external-content FTS5 tables kept in sync by triggers.
+_SQLITE_FTS = {
+    "issues_fts": ("issues", ["title", "description"]),
+    "comments_fts": ("comments", ["text"]),
+}
+
+
+def _sqlite_ddl(fts: str, table: str, columns: list[str]) -> list[str]:
+    cols = ", ".join(columns)
+    new = ", ".join(f"new.{c}" for c in columns)
+    old = ", ".join(f"old.{c}" for c in columns)
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({cols}, content='{table}', content_rowid='rowid')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.rowid, {new}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.rowid, {old}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.rowid, {old}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.rowid, {new}); END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def install_search(bind=engine):
+    """Create the full-text search columns/indexes; safe to run on every start."""
+    with bind.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            for statement in _POSTGRES_DDL:
+                connection.exec_driver_sql(statement)
+        elif connection.dialect.name == "sqlite":
+            existing = set(connection.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'table'").scalars())
+            for fts, (table, columns) in _SQLITE_FTS.items():
+                if fts not in existing:
+                    for statement in _sqlite_ddl(fts, table, columns):
+                        connection.exec_driver_sql(statement)
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def _drop_sqlite_fts(target, connection, **kw):
+    # external-content FTS tables would otherwise outlive the tables they index
+    if connection.dialect.name == "sqlite":
+        for fts in _SQLITE_FTS:
+            connection.exec_driver_sql(f"DROP TABLE IF EXISTS {fts}")
+
+
+# ------------- Queries --------------
+
+_ACCESSIBLE_PROJECTS = """
+    SELECT p.id FROM projects p WHERE p.created_by = :user_id
+    UNION
+    SELECT pm.project_id FROM project_members pm WHERE pm.user_id = :user_id
+"""
+
+_POSTGRES_SEARCH = f"""
+    WITH q AS (SELECT websearch_to_tsquery('english', :q) AS query),
+    hits AS (
+        SELECT 'issue' AS kind, i.id AS issue_id, NULL AS comment_id, i.project_id, i.title,
+               i.description AS body, ts_rank(i.search_vector, q.query) AS rank
+        FROM issues i, q
+        WHERE i.search_vector @@ q.query AND i.project_id IN ({_ACCESSIBLE_PROJECTS}) {{project_filter}}
+        UNION ALL
+        SELECT 'comment', c.issue_id, c.id, i.project_id, i.title,
+               c.text, ts_rank(c.search_vector, q.query)
+        FROM comments c JOIN issues i ON i.id = c.issue_id, q
+        WHERE c.search_vector @@ q.query AND i.project_id IN ({_ACCESSIBLE_PROJECTS}) {{project_filter}}
+        ORDER BY rank DESC, issue_id, comment_id
+        LIMIT :limit OFFSET :offset
+    )
+    SELECT kind, issue_id, comment_id, project_id, title,
+           ts_headline('english', body, q.query, 'MaxFragments=1, MaxWords=20, MinWords=5') AS snippet, rank
+    FROM hits, q
+    ORDER BY rank DESC, issue_id, comment_id
+"""
+
+_SQLITE_SEARCH = f"""
+    SELECT 'issue' AS kind, i.id AS issue_id, NULL AS comment_id, i.project_id, i.title,
+           snippet(issues_fts, -1, '<b>', '</b>', '...', 12) AS snippet, -bm25(issues_fts, 2.0, 1.0) AS rank
+    FROM issues_fts JOIN issues i ON i.rowid = issues_fts.rowid
+    WHERE issues_fts MATCH :q AND i.project_id IN ({_ACCESSIBLE_PROJECTS}) {{project_filter}}
+    UNION ALL
+    SELECT 'comment', c.issue_id, c.id, i.project_id, i.title,
+           snippet(comments_fts, 0, '<b>', '</b>', '...', 12), -bm25(comments_fts)
+    FROM comments_fts JOIN comments c ON c.rowid = comments_fts.rowid JOIN issues i ON i.id = c.issue_id
+    WHERE comments_fts MATCH :q AND i.project_id IN ({_ACCESSIBLE_PROJECTS}) {{project_filter}}
+    ORDER BY rank DESC, issue_id, comment_id
+    LIMIT :limit OFFSET :offset
+"""
+
+
+# Anything else: no full-text index, so substring matches over the same
+# columns; issues matching on the title rank above the rest.
+_LIKE_SEARCH = f"""
+    SELECT 'issue' AS kind, i.id AS issue_id, NULL AS comment_id, i.project_id, i.title,
+           i.description AS snippet, CASE WHEN lower(i.title) LIKE :pattern ESCAPE '!' THEN 2.0 ELSE 1.0 END AS rank
+    FROM issues i
+    WHERE (lower(i.title) LIKE :pattern ESCAPE '!' OR lower(i.description) LIKE :pattern ESCAPE '!')
+      AND i.project_id IN ({_ACCESSIBLE_PROJECTS}) {{project_filter}}
+    UNION ALL
+    SELECT 'comment', c.issue_id, c.id, i.project_id, i.title, c.text, 1.0
+    FROM comments c JOIN issues i ON i.id = c.issue_id
+    WHERE lower(c.text) LIKE :pattern ESCAPE '!' AND i.project_id IN ({_ACCESSIBLE_PROJECTS}) {{project_filter}}
+    ORDER BY rank DESC, issue_id, comment_id
+    LIMIT :limit OFFSET :offset
+"""
+
+
+def _like_pattern(q: str) -> str:
+    # '!' rather than a backslash: some backends treat backslashes in literals as escapes
+    escaped = q.lower().replace("!", "!!").replace("%", "!%").replace("_", "!_")
+    return f"%{escaped}%"
+
+
+def _fts5_query(q: str) -> str:
+    # Quote every term so user input can't inject FTS5 query syntax.
+    return " ".join(f'"{term}"' for term in re.findall(r"\w+", q))
+
+
+async def search(db: AsyncSession, q: str, user_id: str, project_id: Optional[str], limit: int, offset: int) -> list[dict]:
+    """Ranked issue/comment matches within the projects the user can access."""
+    dialect = engine.dialect.name
+    params = {"q": q, "user_id": user_id, "limit": limit, "offset": offset}
+    project_filter = ""
+    if project_id:
+        project_filter = "AND i.project_id = :project_id"
+        params["project_id"] = project_id
+
+    if dialect == "postgresql":
+        sql = _POSTGRES_SEARCH
+    elif dialect == "sqlite":
+        sql = _SQLITE_SEARCH
+        params["q"] = _fts5_query(q)
+        if not params["q"]:
+            return []
+    else:
+        sql = _LIKE_SEARCH
+        params["pattern"] = _like_pattern(q)
+
+    result = await db.execute(text(sql.format(project_filter=project_filter)), params)
+    return [dict(row) for row in result.mappings()]
@@ -0,0 +1,143 @@
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from config.db import pool_engines
+from config.settings import (
+    SQL_PROFILE_MODE, SQL_PROFILE_SAMPLE_RATE, SQL_PROFILE_MAX_QUERIES,
+    SQL_PROFILE_MAX_DB_MS, SQL_PROFILE_REPEAT_THRESHOLD,
+)
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_HEADER = "X-Query-Count"
+DB_TIME_HEADER = "X-DB-Time"
+N_PLUS_ONE_HEADER = "X-Query-N1-Suspects"
+# clients can ask for a profile of one request unless the profiler is off
+FORCE_HEADER = b"x-profile-sql"
+
+# IN (?, ?, ?) lists differ in length from call to call but are one shape
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%\(\w+\)s|%s|\$\d+|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|%s|\$\d+|:\w+))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    return _PLACEHOLDER_LIST.sub("(?)", _WHITESPACE.sub(" ", statement.strip()))
+
+
+class RequestProfile:
+    """SQL issued while serving one request."""
+
+    def __init__(self):
+        self.query_count = 0
+        self.db_time = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement: str, elapsed: float):
+        self.query_count += 1
+        self.db_time += elapsed
+        self.shapes[statement] += 1
+
+    def repeated(self, threshold: int = SQL_PROFILE_REPEAT_THRESHOLD) -> list[tuple[str, int]]:
+        """Statement shapes run ``threshold`` or more times: likely N+1 loops."""
+        merged = Counter()
+        for statement, count in self.shapes.items():
+            merged[statement_shape(statement)] += count
+        return [(shape, count) for shape, count in merged.most_common() if count >= threshold]
+
+
+_current: ContextVar[Optional[RequestProfile]] = ContextVar("sql_profile", default=None)
+
+
+# ------------- SQLAlchemy hooks --------------
+# Cost when no profile is active is one ContextVar lookup per statement.
+
+def _instrument_engine(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current.get() is not None:
+            context._profile_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        profile = _current.get()
+        start = getattr(context, "_profile_start", None)
+        if profile is not None and start is not None:
+            profile.record(statement, time.perf_counter() - start)
+
+
+_instrumented = set()
+
+
+def install_sql_profiler():
+    for name, engine in pool_engines().items():
+        if name not in _instrumented:
+            _instrument_engine(engine)
+            _instrumented.add(name)
+
+
+# ------------- Middleware --------------
+
+def _should_profile(scope) -> bool:
+    if SQL_PROFILE_MODE == "all":
+        return True
+    if SQL_PROFILE_MODE == "sample":
+        return random.random() < SQL_PROFILE_SAMPLE_RATE or any(name == FORCE_HEADER for name, _ in scope["headers"])
+    return False
+
+
+class SQLProfilerMiddleware:
+    """Profile the SQL of sampled requests.
+
+    Profiled responses carry X-Query-Count and X-DB-Time (milliseconds), plus
+    X-Query-N1-Suspects when one statement shape repeats. Requests over the
+    query or time budget are logged with their most repeated statements.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _should_profile(scope):
+            return await self.app(scope, receive, send)
+
+        profile = RequestProfile()
+        token = _current.set(profile)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((QUERY_COUNT_HEADER.lower().encode(), str(profile.query_count).encode()))
+                headers.append((DB_TIME_HEADER.lower().encode(), f"{profile.db_time * 1000:.2f}".encode()))
+                suspects = profile.repeated()
+                if suspects:
+                    headers.append((N_PLUS_ONE_HEADER.lower().encode(), str(len(suspects)).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            _report(scope, profile)
+
+
+def _report(scope, profile: RequestProfile):
+    over_queries = profile.query_count > SQL_PROFILE_MAX_QUERIES
+    over_time = profile.db_time * 1000 > SQL_PROFILE_MAX_DB_MS
+    suspects = profile.repeated()
+    if not (over_queries or over_time or suspects):
+        return
+
+    logger.warning(
+        "SQL budget %s %s: %d queries, %.1f ms in the database%s",
+        scope["method"],
+        scope["path"],
+        profile.query_count,
+        profile.db_time * 1000,
+        "".join(f"\n  N+1 suspect x{count}: {shape[:300]}" for shape, count in suspects[:5]),
+    )
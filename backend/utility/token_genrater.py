@@ -2,6 +2,10 @@ from jose import jwt, JWTError
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from datetime import datetime, timedelta, timezone
+from utility.cache import LRUCache
+from config.settings import TOKEN_CACHE_SIZE
+import hashlib
+import time
 
 SECRET_KEY = "36cfbc62271b822d38deadf0db66452fb512c293dd38a37db79eafc136c9e6eb"
 ALGORITHM = "HS256"
@@ -9,13 +13,15 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 oauth2_bearer = OAuth2PasswordBearer(tokenUrl="/api/user/login/")
 
+_token_cache = LRUCache(TOKEN_CACHE_SIZE)
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp":expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-async def decode_access_token(token: str = Depends(oauth2_bearer)):
+def _verify_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username = payload.get("sub")
@@ -23,6 +29,27 @@ async def decode_access_token(token: str = Depends(oauth2_bearer)):
         user_role = payload.get("role")
         if username is None or user_id is None:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Couldn't validate user.")
-        return {'username': username, "id": user_id, "role": user_role}
+        claims = {'username': username, "id": user_id, "role": user_role}
     except JWTError:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Couldn't validate user.")
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Couldn't validate user.")
+
+    # Only verified tokens are cached, and never past their exp.
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        _token_cache.set(_token_key(token), claims, expires_at=time.monotonic() + (exp - time.time()))
+    return claims
+
+
+def _token_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+def token_cache_stats() -> dict:
+    return _token_cache.stats()
+
+
+async def decode_access_token(token: str = Depends(oauth2_bearer)):
+    claims = _token_cache.get(_token_key(token))
+    if claims is None:
+        claims = _verify_token(token)
+    return dict(claims)
@@ -0,0 +1,123 @@
+import logging
+from sqlalchemy import select, func, or_, case
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.ext.asyncio import AsyncSession
+from config.db import engine
+from config.settings import USER_SEARCH_MAX_ROWS, USER_SEARCH_CACHE_SIZE, USER_SEARCH_CACHE_TTL
+from models.models import User
+from utility.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+SEARCH_FIELDS = ("username", "name", "email")
+
+# Terms shorter than this only match prefixes; trigram indexes need 3 chars.
+SUBSTRING_MIN_LENGTH = 3
+
+_TRIGRAM_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_users_{field}_trgm ON users USING GIN (lower({field}) gin_trgm_ops)"
+    for field in SEARCH_FIELDS
+]
+
+
+def install_user_search(bind=engine):
+    """Create the user search indexes on existing databases; safe to rerun."""
+    with bind.begin() as connection:
+        # IF NOT EXISTS rather than checkfirst: SQLite reflection can't see
+        # the lower(...) expression indexes, so checkfirst would recreate them
+        for index in User.__table__.indexes:
+            connection.execute(CreateIndex(index, if_not_exists=True))
+
+    if bind.dialect.name != "postgresql":
+        return
+    try:
+        with bind.begin() as connection:
+            connection.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            for statement in _TRIGRAM_DDL:
+                connection.exec_driver_sql(statement)
+    except DBAPIError:
+        logger.warning("pg_trgm is unavailable; user search falls back to prefix indexes only")
+
+
+# ------------- Ranking --------------
+# 0 exact username, 1 username prefix, 2 other field prefix, 3 substring.
+
+def _rank_sql(term: str, fields: tuple, substring: bool):
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    columns = {field: func.lower(getattr(User, field)) for field in fields}
+
+    prefix = [column.like(f"{escaped}%", escape="\\") for column in columns.values()]
+    matches = [column.like(f"%{escaped}%", escape="\\") for column in columns.values()] if substring else prefix
+
+    whens = []
+    if "username" in columns:
+        whens += [(columns["username"] == term, 0), (columns["username"].like(f"{escaped}%", escape="\\"), 1)]
+    whens.append((or_(*prefix), 2))
+    return case(*whens, else_=3), or_(*matches)
+
+
+def _rank_row(row: dict, term: str, fields: tuple, substring: bool):
+    """Python twin of _rank_sql, used to narrow cached results."""
+    values = {field: row[field].lower() for field in fields}
+    if not any((term in value) if substring else value.startswith(term) for value in values.values()):
+        return None
+    if values.get("username") == term:
+        return 0
+    if "username" in values and values["username"].startswith(term):
+        return 1
+    if any(value.startswith(term) for value in values.values()):
+        return 2
+    return 3
+
+
+# ------------- Typeahead cache --------------
+# (fields, substring, term) -> (rows, complete). A complete result set for a
+# term also contains every match for longer terms in the same mode, so those
+# are answered by filtering in process instead of querying again.
+
+_cache = LRUCache(USER_SEARCH_CACHE_SIZE, ttl=USER_SEARCH_CACHE_TTL)
+
+
+def _from_cache(term: str, fields: tuple, substring: bool):
+    cached = _cache.get((fields, substring, term))
+    if cached is not None:
+        return cached[0]
+
+    min_length = SUBSTRING_MIN_LENGTH if substring else 1
+    for length in range(len(term) - 1, min_length - 1, -1):
+        cached = _cache.get((fields, substring, term[:length]))
+        if cached is None or not cached[1]:
+            continue
+        ranked = [(rank, row) for row in cached[0] if (rank := _rank_row(row, term, fields, substring)) is not None]
+        rows = [row for rank, row in sorted(ranked, key=lambda item: (item[0], item[1]["username"]))]
+        _cache.set((fields, substring, term), (rows, True))
+        return rows
+    return None
+
+
+def clear_user_search_cache():
+    _cache.clear()
+
+
+async def search_users(db: AsyncSession, term: str, fields: tuple, exclude_id: str, limit: int, offset: int) -> list[dict]:
+    """Ranked user matches for ``term`` across ``fields``, one page at a time."""
+    term = term.strip().lower()
+    substring = len(term) >= SUBSTRING_MIN_LENGTH
+
+    rows = _from_cache(term, fields, substring)
+    if rows is None:
+        rank, matches = _rank_sql(term, fields, substring)
+        result = await db.execute(
+            select(User.id, User.username, User.name, User.email, User.role)
+            .where(matches)
+            .order_by(rank, User.username)
+            .limit(USER_SEARCH_MAX_ROWS + 1)
+        )
+        rows = [dict(row) for row in result.mappings()]
+        complete = len(rows) <= USER_SEARCH_MAX_ROWS
+        rows = rows[:USER_SEARCH_MAX_ROWS]
+        _cache.set((fields, substring, term), (rows, complete))
+
+    rows = [row for row in rows if row["id"] != exclude_id]
+    return rows[offset:offset + limit]